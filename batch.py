@@ -0,0 +1,81 @@
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+import re
+from date_validator import get_date, validate_date
+
+
+def parse_ranges(lines):
+    """
+    Parses date ranges, one per line as 'START END' in the DD-MM-YYYY format.
+
+    The dates may be separated by spaces, tabs or a comma. Blank lines and lines
+    starting with '#' are skipped. Every line is validated before any error is
+    reported, so a bad file can be fixed in one go.
+
+    Parameters:
+        lines (iterable): The lines to parse, e.g. an open file.
+
+    Returns:
+        list: The ranges as (start, end) pairs of datetime.date objects, in input order.
+
+    Raises:
+        ValueError: If any line is not a valid range, listing every invalid line.
+    """
+    ranges = []
+    errors = []
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        dates = [date for date in re.split(r"[\s,]+", line) if date]
+        if len(dates) != 2 or not all(validate_date(date) for date in dates):
+            errors.append(f"line {number}: expected 'DD-MM-YYYY DD-MM-YYYY', got {line!r}")
+            continue
+        start, end = map(get_date, dates)
+        if start > end:
+            errors.append(f"line {number}: the start date is after the end date")
+            continue
+        ranges.append((start, end))
+    if errors:
+        raise ValueError("Invalid date ranges:\n " + "\n ".join(errors))
+    return ranges
+
+
+def coalesce(ranges):
+    """
+    Merges overlapping or adjacent date ranges, so each day is only queried once.
+
+    Parameters:
+        ranges (iterable): The (start, end) pairs of datetime.date objects, both days included.
+
+    Returns:
+        list: The merged ranges sorted by start date.
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def fan_out(events, ranges):
+    """
+    Splits the events fetched for the merged ranges back into the requested ranges.
+    An event is returned for every requested range its day falls in.
+
+    Parameters:
+        events (list): The events in JSON format.
+        ranges (list): The requested (start, end) pairs of datetime.date objects, both days included.
+
+    Returns:
+        list: The events of each range ordered by date, in the order of `ranges`.
+    """
+    events = sorted(events, key=lambda event: event["date"])
+    days = [event["date"][:10] for event in events]
+    return [
+        events[bisect_left(days, start.isoformat()) : bisect_right(days, end.isoformat())]
+        for start, end in ranges
+    ]
@@ -0,0 +1,203 @@
+"""
+Benchmarks the fetch-parse-render pipeline on recorded API payloads.
+
+Usage:
+    python benchmark.py [--sizes 10 100 1000 10000] [--output benchmark.json] [--compare previous.json]
+
+The events of fixtures/events_page.json are replicated with fresh ids to build
+pages of each size. Every benchmark reports the best and median time of several
+runs in milliseconds. With --compare, benchmarks slower than the previous results
+by more than --threshold are reported and the script exits with status 1.
+"""
+
+import argparse
+import copy
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from unittest import mock
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "events_page.json")
+SIZES = (10, 100, 1000, 10000)
+
+
+def load_payload(size, fixture=FIXTURE):
+    """
+    Builds an API payload with the given number of events from the recorded fixture.
+
+    Parameters:
+        size (int): The number of events.
+        fixture (str): The path of the recorded payload.
+
+    Returns:
+        dict: The payload with count, next, previous and results keys.
+    """
+    with open(fixture) as f:
+        recorded = json.load(f)
+    events = recorded["results"]
+    results = []
+    for i in range(size):
+        event = copy.deepcopy(events[i % len(events)])
+        event["id"] = i + 1
+        results.append(event)
+    return dict(recorded, count=size, results=results)
+
+
+def measure(func, repeat=5):
+    """
+    Runs a function several times and times each run.
+
+    Parameters:
+        func (callable): The function to benchmark.
+        repeat (int): The number of runs.
+
+    Returns:
+        dict: The best and median run times in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"best_ms": min(timings), "median_ms": statistics.median(timings), "runs": repeat}
+
+
+class FakeScreen:
+    """
+    A stand-in for the curses standard screen that replays a list of key presses.
+    """
+
+    def __init__(self, keys, size=(50, 200)):
+        self.keys = list(keys)
+        self.size = size
+
+    def getmaxyx(self):
+        return self.size
+
+    def getch(self):
+        return self.keys.pop(0) if self.keys else ord("q")
+
+    def __getattr__(self, name):
+        # addstr, refresh, clear, ... are no-ops
+        return lambda *args, **kwargs: None
+
+
+def run_cli_loop(page, keys):
+    """
+    Runs cli_loop headlessly on a page of table data, replaying the given keys.
+
+    Parameters:
+        page (tuple): The (count, next, previous, table_lines) tuple to display.
+        keys (list): The key codes to press before 'q'.
+    """
+    import project
+
+    with mock.patch("sys.argv", ["project.py", "--prefetch-depth", "0"]):
+        args = project.get_args()
+    with mock.patch("project.get_table_data", return_value=page), mock.patch(
+        "curses.curs_set"
+    ), mock.patch("curses.newpad", return_value=FakeScreen([])), mock.patch(
+        "curses.doupdate"
+    ), mock.patch("signal.signal"):
+        project.cli_loop(FakeScreen(keys), args)
+
+
+def run_benchmarks(sizes=SIZES, repeat=5):
+    """
+    Runs every benchmark for every page size.
+
+    Parameters:
+        sizes (iterable): The numbers of events per page.
+        repeat (int): The number of runs of each benchmark.
+
+    Returns:
+        dict: The results keyed by benchmark name.
+    """
+    import curses
+    from date_validator import get_date, validate_date
+    from events import events_to_dataframe, parse_events
+    from tools import create_df
+    import project
+
+    results = {}
+    dates = [f"{day:02}-{month:02}-2024" for month in range(1, 13) for day in range(1, 29)]
+    results["validate_date"] = measure(lambda: [validate_date(d) for d in dates], repeat)
+    results["get_date"] = measure(lambda: [get_date(d) for d in dates], repeat)
+    results["get_events_url"] = measure(
+        lambda: [project.get_events_url("01-01-2024", "31-12-2024") for _ in range(100)],
+        repeat,
+    )
+
+    for size in sizes:
+        payload = load_payload(size)
+        page = create_df(payload)
+        results[f"create_df[{size}]"] = measure(lambda: create_df(payload), repeat)
+        results[f"first_screen[{size}]"] = measure(lambda: create_df(payload)[3][:50], repeat)
+        events = parse_events(payload["results"])
+        try:
+            events_to_dataframe(events)
+        except ImportError:
+            pass  # pandas is optional
+        else:
+            results[f"events_to_dataframe[{size}]"] = measure(
+                lambda: events_to_dataframe(events), repeat
+            )
+        keys = [curses.KEY_DOWN] * 100 + [curses.KEY_RIGHT] * 20
+        results[f"cli_loop[{size}]"] = measure(lambda: run_cli_loop(page, keys), repeat)
+    return results
+
+
+def compare(results, previous, threshold):
+    """
+    Finds the benchmarks that got slower than in previous results.
+
+    Parameters:
+        results (dict): The current results.
+        previous (dict): The previous results.
+        threshold (float): The tolerated slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+        list: The (name, previous_ms, current_ms) tuples of the regressions.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in previous:
+            continue
+        before = previous[name]["best_ms"]
+        if result["best_ms"] > before * (1 + threshold):
+            regressions.append((name, before, result["best_ms"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the fetch-parse-render pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", help="Previous results to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.repeat)
+    for name, result in results.items():
+        print(f"{name:<28} best {result['best_ms']:10.3f} ms   median {result['median_ms']:10.3f} ms")
+    with open(args.output, "w") as f:
+        json.dump(
+            {"python": platform.python_version(), "results": results}, f, indent=2
+        )
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)["results"]
+        regressions = compare(results, previous, args.threshold)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before:.3f} ms -> {after:.3f} ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+CACHE_DIR = os.environ.get(
+    "SPACEFLIGHT_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "spaceflight-events"),
+)
+DEFAULT_TTL = 300
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+CacheEntry = namedtuple("CacheEntry", ["body", "etag", "last_modified", "expires_at"])
+
+
+def is_fresh(entry, now=None):
+    """
+    Checks whether a cache entry can be served without revalidation.
+
+    Parameters:
+        entry (CacheEntry): The cached entry.
+        now (float)(optional): The current time in seconds since the epoch.
+
+    Returns:
+        bool: True if the entry has not expired yet, False otherwise.
+    """
+    if now is None:
+        now = time.time()
+    return entry.expires_at > now
+
+
+def conditional_headers(entry):
+    """
+    Builds the headers for a conditional request revalidating the given entry.
+
+    Parameters:
+        entry (CacheEntry): The stale cache entry, or None.
+
+    Returns:
+        dict: The If-None-Match / If-Modified-Since headers to send.
+    """
+    headers = {}
+    if entry is None:
+        return headers
+    if entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+
+class ResponseCache:
+    """
+    An on-disk cache of API response bodies keyed by the query URL.
+
+    Entries expire after a per-entry TTL and keep their ETag / Last-Modified
+    validators so that stale entries can be revalidated with a conditional request.
+    When the total size of the stored bodies exceeds max_bytes the least recently
+    used entries are evicted.
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Parameters:
+            path (str)(optional): The SQLite database file. Defaults to responses.sqlite in CACHE_DIR.
+            ttl (int): The default time to live of an entry in seconds.
+            max_bytes (int): The maximum total size of the cached bodies in bytes.
+        """
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "responses.sqlite")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )"""
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)"
+        )
+        self._db.commit()
+
+    def lookup(self, url):
+        """
+        Looks up the cached response for a URL and marks it as recently used.
+
+        Parameters:
+            url (str): The query URL.
+
+        Returns:
+            CacheEntry: The cached entry, or None if the URL is not cached.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url)
+            )
+            self._db.commit()
+        return CacheEntry(*row)
+
+    def store(self, url, body, etag=None, last_modified=None, ttl=None):
+        """
+        Stores a response body for a URL, evicting least recently used entries if needed.
+
+        Parameters:
+            url (str): The query URL.
+            body (str): The response body.
+            etag (str)(optional): The ETag header of the response.
+            last_modified (str)(optional): The Last-Modified header of the response.
+            ttl (int)(optional): The time to live of this entry. Defaults to the cache TTL.
+        """
+        now = time.time()
+        if ttl is None:
+            ttl = self.ttl
+        size = len(body.encode())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, now + ttl, now, size),
+            )
+            self._evict()
+            self._db.commit()
+
+    def refresh(self, url, ttl=None):
+        """
+        Extends the lifetime of an entry after the server confirmed it is unchanged (304).
+
+        Parameters:
+            url (str): The query URL.
+            ttl (int)(optional): The new time to live of the entry. Defaults to the cache TTL.
+        """
+        now = time.time()
+        if ttl is None:
+            ttl = self.ttl
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE url = ?",
+                (now + ttl, now, url),
+            )
+            self._db.commit()
+
+    def size(self):
+        """
+        Returns:
+            int: The total size of the cached bodies in bytes.
+        """
+        with self._lock:
+            return self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+
+    def clear(self):
+        """
+        Removes every entry from the cache.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def close(self):
+        """
+        Closes the underlying database connection.
+        """
+        with self._lock:
+            self._db.close()
+
+    def _evict(self):
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT url, size FROM responses ORDER BY accessed_at"
+        ).fetchall()
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
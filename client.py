@@ -0,0 +1,199 @@
+from datetime import datetime, UTC
+import random
+import threading
+import time
+from scheduler import TokenBucket, current_priority
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+REQUEST_TIMEOUT = 30
+THROTTLE_LOW_WATERMARK = 2
+
+session = None
+_session_lock = threading.Lock()
+_throttle_lock = threading.Lock()
+_throttle_until = 0.0
+budget = TokenBucket()  # The API quota, learned from the rate limit headers
+
+
+def get_session():
+    """
+    Returns the shared HTTP session, creating it on first use.
+
+    The session keeps a pool of keep-alive connections so that consecutive pages
+    reuse the same TCP and TLS connection.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global session
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    with _session_lock:
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = "spaceflight-events-cli"
+            session.headers["Accept-Encoding"] = "gzip"
+        return session
+
+
+def backoff_delay(attempt):
+    """
+    Computes the delay before a retry using exponential backoff with full jitter.
+
+    Parameters:
+        attempt (int): The number of the retry, starting from 0.
+
+    Returns:
+        float: The number of seconds to wait.
+    """
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt))
+
+
+def retry_after(response):
+    """
+    Reads the Retry-After header of a response.
+
+    Parameters:
+        response (requests.Response): The response.
+
+    Returns:
+        float: The number of seconds to wait, or None if the header is missing or invalid.
+    """
+    from email.utils import parsedate_to_datetime
+
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(UTC)).total_seconds())
+
+
+def rate_limit(response):
+    """
+    Reads the rate limit headers of a response.
+
+    Both the X-RateLimit-* and the RateLimit-* header families are understood.
+
+    Parameters:
+        response (requests.Response): The response.
+
+    Returns:
+        tuple: The limit (None if not sent), the remaining requests and the number of
+               seconds until the window resets, or None if the headers are missing.
+    """
+    headers = response.headers
+    limit = headers.get("X-RateLimit-Limit", headers.get("RateLimit-Limit"))
+    remaining = headers.get("X-RateLimit-Remaining", headers.get("RateLimit-Remaining"))
+    reset = headers.get("X-RateLimit-Reset", headers.get("RateLimit-Reset"))
+    try:
+        remaining = int(remaining)
+        reset = float(reset)
+    except (TypeError, ValueError):
+        return None
+    # Some servers send the reset as an epoch timestamp instead of a number of seconds
+    if reset > time.time():
+        reset -= time.time()
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        limit = None
+    return limit, remaining, max(0.0, reset)
+
+
+def throttle_delay(response):
+    """
+    Reads the rate limit headers of a response and computes how long to pause before
+    the next request so that the remaining quota lasts until the window resets.
+
+    Parameters:
+        response (requests.Response): The response.
+
+    Returns:
+        float: The number of seconds to pause, 0 if there is quota to spare.
+    """
+    quota = rate_limit(response)
+    if quota is None:
+        return 0.0
+    _, remaining, reset = quota
+    if remaining > THROTTLE_LOW_WATERMARK:
+        return 0.0
+    return reset / (remaining + 1)
+
+
+def get(url, headers=None, stream=False):
+    """
+    Sends a GET request through the shared session.
+
+    Connection errors, timeouts, 429 and 5xx responses are retried with exponential
+    backoff, waiting for Retry-After when the server sends it. When the rate limit
+    headers show the quota is running low, later requests are spaced out.
+
+    Every attempt takes a token from the shared budget at the priority of the calling
+    thread, see scheduler.priority.
+
+    Parameters:
+        url (str): The URL to fetch.
+        headers (dict)(optional): Extra request headers.
+        stream (bool)(optional): If True, the body is not downloaded until it is read.
+
+    Returns:
+        requests.Response: The final response, which may still have an error status.
+
+    Raises:
+        ConnectionError: If the API can't be reached after all the retries.
+        BudgetExhausted: If the request is speculative and the quota is running out.
+    """
+    global _throttle_until
+    import requests
+
+    http = get_session()
+    for attempt in range(MAX_RETRIES + 1):
+        budget.acquire(current_priority())
+        with _throttle_lock:
+            pause = _throttle_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+
+        try:
+            response = http.get(url, headers=headers, timeout=REQUEST_TIMEOUT, stream=stream)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == MAX_RETRIES:
+                raise ConnectionError(f"Error : couldn't reach the API\n {e}")
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        quota = rate_limit(response)
+        if quota and quota[0] is not None:
+            budget.sync(*quota)
+        delay = throttle_delay(response)
+        if delay:
+            with _throttle_lock:
+                _throttle_until = max(_throttle_until, time.monotonic() + delay)
+
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        response.close()
+        wait = retry_after(response)
+        if wait is None:
+            wait = backoff_delay(attempt)
+        if response.status_code == 429:
+            with _throttle_lock:
+                _throttle_until = max(_throttle_until, time.monotonic() + wait)
+            if budget.capacity and not quota:
+                budget.sync(budget.capacity, 0, wait)
+        else:
+            time.sleep(wait)
@@ -0,0 +1,134 @@
+import codecs
+import json
+
+_decoder = json.JSONDecoder()
+WHITESPACE = " \t\n\r"
+
+
+class IncompleteJSON(Exception):
+    """
+    Raised when the response stream ends in the middle of the JSON document.
+    """
+
+
+class _Stream:
+    """
+    A text buffer over an iterable of chunks that only keeps the part not parsed yet.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """
+        Appends the next chunk to the buffer, dropping the parsed prefix.
+
+        Returns:
+            bool: False if the stream is exhausted.
+        """
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                chunk = self._utf8.decode(chunk)
+            if chunk:
+                self.text = self.text[self.pos :] + chunk
+                self.pos = 0
+                return True
+        self.eof = True
+        return False
+
+    def peek(self):
+        """
+        Skips whitespace and returns the next character without consuming it.
+
+        Returns:
+            str: The next character, or "" at the end of the stream.
+        """
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise IncompleteJSON(f"Expected {char!r} at position {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """
+        Decodes the next JSON value, reading more chunks until it is complete.
+
+        Returns:
+            object: The decoded value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise IncompleteJSON("The response ended in the middle of a value")
+                continue
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_results(chunks, meta, fields=None):
+    """
+    Decodes an API page incrementally, yielding each entry of its `results` list as
+    soon as it has been received.
+
+    Only one result is held in memory at a time, and results are projected to the
+    given fields so the rest of each event is dropped right away.
+
+    Parameters:
+        chunks (iterable): The response body as str or bytes chunks.
+        meta (dict): Filled with the other top-level keys (count, next, previous). The
+                     results key is set to an empty list, the results are only yielded.
+        fields (iterable)(optional): The fields kept in each result. Keeps all if None.
+
+    Yields:
+        dict: The projected results.
+    """
+    if fields is not None:
+        fields = tuple(fields)
+    stream = _Stream(chunks)
+    stream.expect("{")
+    while True:
+        char = stream.peek()
+        if char == "}":
+            return
+        if char == ",":
+            stream.pos += 1
+            continue
+        key = stream.value()
+        stream.expect(":")
+        if key != "results" or stream.peek() != "[":
+            meta[key] = stream.value()
+            continue
+        meta[key] = []
+        stream.pos += 1
+        while True:
+            char = stream.peek()
+            if char == "]":
+                stream.pos += 1
+                break
+            if char == ",":
+                stream.pos += 1
+                continue
+            result = stream.value()
+            if fields is not None:
+                result = {field: result.get(field) for field in fields}
+            yield result
+
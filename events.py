@@ -0,0 +1,260 @@
+import json
+import threading
+from renderer import TableView, format_cell, wrap_lines
+import tracing
+
+STATIC_FIELDS = (
+    "name",
+    "date",
+    "description",
+    "url",
+    "duration",
+    "webcast_live",
+    "location",
+    "news_url",
+    "video_url",
+    "feature_image",
+    "slug",
+    "last_updated",
+)
+TABLE_HEADERS = ("id",) + STATIC_FIELDS
+# The columns displayed in the table, the other fields are shown in the detail pane
+ROW_COLUMNS = ("id", "name", "date", "description", "webcast_live", "location")
+DESCRIPTION_WIDTH = 40
+MIN_DESCRIPTION_WIDTH = 20
+MAX_DESCRIPTION_WIDTH = 80
+STREAM_BATCH_SIZE = 10
+
+
+class Event:
+    """
+    A spaceflight event holding only the fields displayed in the table.
+    """
+
+    __slots__ = ("id",) + STATIC_FIELDS
+
+    def __init__(self, id, **fields):
+        """
+        Parameters:
+            id (int): The id of the event.
+            **fields: The displayed fields. Missing fields are set to None.
+        """
+        self.id = id
+        for field in STATIC_FIELDS:
+            setattr(self, field, fields.get(field))
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Creates an event from one entry of the API `results` list, dropping the fields
+        that are not displayed.
+
+        Parameters:
+            data (dict): The event in JSON format.
+
+        Returns:
+            Event: The parsed event.
+        """
+        event = cls.__new__(cls)
+        event.id = data.get("id")
+        for field in STATIC_FIELDS:
+            setattr(event, field, data.get(field))
+        return event
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: The id and displayed fields of the event.
+        """
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def row(self):
+        """
+        Returns the table row of the event. The description is wrapped by the table.
+
+        Returns:
+            tuple: The id followed by the displayed fields.
+        """
+        return (self.id,) + tuple(getattr(self, field) for field in STATIC_FIELDS)
+
+    def __eq__(self, other):
+        if not isinstance(other, Event):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"Event(id={self.id!r}, name={self.name!r})"
+
+
+def description_width(screen_width):
+    """
+    Chooses the width at which descriptions are wrapped for a terminal width, so
+    wider terminals show more of each description per line.
+
+    Parameters:
+        screen_width (int): The number of columns of the terminal.
+
+    Returns:
+        int: A third of the terminal width, between MIN_DESCRIPTION_WIDTH and MAX_DESCRIPTION_WIDTH.
+    """
+    return max(MIN_DESCRIPTION_WIDTH, min(MAX_DESCRIPTION_WIDTH, screen_width // 3))
+
+
+def make_table(rows, width=DESCRIPTION_WIDTH, complete=True):
+    """
+    Creates the table of events, which wraps the descriptions itself so it can be
+    laid out again for another width. Only the ROW_COLUMNS are displayed, the rows
+    keep every field.
+
+    Parameters:
+        rows (list): The unwrapped rows of the events.
+        width (int): The width at which descriptions are wrapped.
+        complete (bool): False if more rows are going to be appended.
+
+    Returns:
+        TableView: The table of the events.
+    """
+    return TableView(
+        TABLE_HEADERS, rows, complete=complete, wrap={"description": width}, columns=ROW_COLUMNS
+    )
+
+
+def format_detail(record, width):
+    """
+    Formats every field of an event as "name: value" lines for the detail pane.
+    Nested values are written as JSON, and long values are wrapped to the width.
+
+    Parameters:
+        record (dict): The event in JSON format.
+        width (int): The width of the pane.
+
+    Returns:
+        list: The lines of the pane.
+    """
+    label = max(map(len, record), default=0)
+    lines = []
+    for field, value in record.items():
+        if isinstance(value, (dict, list)):
+            text = json.dumps(value)
+        else:
+            text = format_cell(value)
+        wrapped = wrap_lines(text, max(MIN_DESCRIPTION_WIDTH, width - label - 2))
+        lines.append(f"{field.rjust(label)}: {wrapped[0]}")
+        lines.extend(" " * (label + 2) + line for line in wrapped[1:])
+    return lines
+
+
+def parse_events(results):
+    """
+    Parses the `results` list of an API response.
+
+    Parameters:
+        results (list): The events in JSON format.
+
+    Returns:
+        list: The parsed Event records.
+    """
+    return [Event.from_json(data) for data in results]
+
+
+def format_events(events, width=DESCRIPTION_WIDTH):
+    """
+    Formats events as a grid table.
+
+    Parameters:
+        events (list): The Event records.
+        width (int): The width at which descriptions are wrapped.
+
+    Returns:
+        TableView: The table of the events.
+    """
+    rows = [event.row() for event in events]
+    # Descriptions are wrapped while the table measures its rows
+    with tracing.span("layout"):
+        return make_table(rows, width)
+
+
+def stream_events(results, width=DESCRIPTION_WIDTH, batch_size=STREAM_BATCH_SIZE):
+    """
+    Formats events into a table in a background thread as they are decoded, so the
+    table can be displayed before the whole page has arrived.
+
+    Parameters:
+        results (iterable): The events in JSON format, e.g. a streaming decoder.
+        width (int): The width at which descriptions are wrapped.
+        batch_size (int): The number of rows added to the table at a time.
+
+    Returns:
+        TableView: The table, marked complete once every event has been added. If
+                   reading the events fails, the error is stored in its error attribute.
+    """
+    view = make_table([], width, complete=False)
+
+    def load():
+        batch = []
+        try:
+            for data in results:
+                batch.append(Event.from_json(data).row())
+                if len(batch) >= batch_size:
+                    view.append(batch)
+                    batch = []
+            view.append(batch, complete=True)
+        except Exception as e:
+            view.fail(e)
+
+    threading.Thread(target=load, daemon=True).start()
+    return view
+
+
+def update_events(table, results, partial=False):
+    """
+    Applies fresh copies of the events of a table, re-formatting only the rows whose
+    last_updated changed.
+
+    Parameters:
+        table (TableView): The table of the events.
+        results (list): The events in JSON format, the whole page in table order, or
+                        only some of its events if `partial` is True.
+        partial (bool): True if `results` only holds the events that may have changed.
+
+    Returns:
+        tuple: The indexes of the rows replaced and True if the other rows kept their
+               lines, or None if events were added, removed or moved and the table
+               must be built again.
+    """
+    id_column = 0
+    updated_column = TABLE_HEADERS.index("last_updated")
+    rows = {row[id_column]: index for index, row in enumerate(table.rows)}
+    if partial:
+        if any(data.get("id") not in rows for data in results):
+            return None
+    elif [data.get("id") for data in results] != [row[id_column] for row in table.rows]:
+        return None
+
+    changed = []
+    in_place = True
+    for data in results:
+        index = rows[data.get("id")]
+        if data.get("last_updated") != table.rows[index][updated_column]:
+            in_place = table.replace(index, Event.from_json(data).row()) and in_place
+            changed.append(index)
+    return changed, in_place
+
+
+def events_to_dataframe(events):
+    """
+    Converts events into a pandas DataFrame indexed by id, for exporting.
+
+    pandas is only imported here, so it is not required for displaying events.
+
+    Parameters:
+        events (list): The Event records.
+
+    Returns:
+        pandas.DataFrame: The events with one column per displayed field.
+    """
+    import pandas as pd
+
+    return pd.DataFrame(
+        [event.to_dict() for event in events], columns=("id",) + STATIC_FIELDS
+    ).set_index("id")
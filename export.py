@@ -0,0 +1,81 @@
+import csv
+import json
+from events import Event, STATIC_FIELDS
+
+FORMATS = ("jsonl", "csv", "tsv")
+COLUMNS = ("id",) + STATIC_FIELDS
+RANGE_COLUMNS = ("range_start", "range_end")
+
+
+def write_pages(pages, fmt, out):
+    """
+    Writes events to a stream page by page, flushing after each page so that
+    downstream readers get the events as soon as they arrive.
+
+    Parameters:
+        pages (iterable): The pages of events, each a list of events in JSON format.
+        fmt (str): The output format, one of 'jsonl', 'csv' or 'tsv'.
+        out (file object): The stream to write to.
+
+    Returns:
+        int: The number of events written.
+    """
+    write = make_writer(fmt, out, COLUMNS)
+    written = 0
+    for results in pages:
+        for data in results:
+            write(Event.from_json(data).to_dict())
+            written += 1
+        out.flush()
+    return written
+
+
+def write_ranges(batches, fmt, out):
+    """
+    Writes the events of several date ranges to a stream, each event preceded by the
+    range it was requested for. Events in overlapping ranges are written once per range.
+
+    Parameters:
+        batches (iterable): The (start, end) date ranges, each paired with its events in JSON format.
+        fmt (str): The output format, one of 'jsonl', 'csv' or 'tsv'.
+        out (file object): The stream to write to.
+
+    Returns:
+        int: The number of events written.
+    """
+    write = make_writer(fmt, out, RANGE_COLUMNS + COLUMNS)
+    written = 0
+    for (start, end), results in batches:
+        for data in results:
+            record = {"range_start": start.isoformat(), "range_end": end.isoformat()}
+            record.update(Event.from_json(data).to_dict())
+            write(record)
+            written += 1
+        out.flush()
+    return written
+
+
+def make_writer(fmt, out, columns):
+    """
+    Creates a function writing one record to a stream, writing the header row first for CSV and TSV.
+
+    Parameters:
+        fmt (str): The output format, one of 'jsonl', 'csv' or 'tsv'.
+        out (file object): The stream to write to.
+        columns (tuple): The keys of the records, in column order.
+
+    Returns:
+        callable: Writes a record given as a dict.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format : {fmt}")
+    if fmt == "jsonl":
+        return lambda record: out.write(json.dumps(record) + "\n")
+    writer = csv.writer(out, delimiter="," if fmt == "csv" else "\t", lineterminator="\n")
+    writer.writerow(columns)
+    return lambda record: writer.writerow(
+        ["" if record[column] is None else record[column] for column in columns]
+    )
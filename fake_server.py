@@ -0,0 +1,290 @@
+"""
+A local stand-in for The Space Devs /event/ endpoint, for load and latency testing.
+
+Usage:
+    python fake_server.py [--port 8000] [--events 2000] [--latency 0.2] [--rate-429 0.05]
+                          [--error-rate 0.01] [--rate-limit 15 --rate-window 3600]
+
+Then point the client at it:
+    SPACEFLIGHT_API_URL=http://127.0.0.1:8000/2.2.0/event/ python project.py
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, UTC
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+EVENT_PATH = "/2.2.0/event/"
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+
+def make_events(count, start=datetime(2022, 1, 1, tzinfo=UTC), spacing=timedelta(hours=6)):
+    """
+    Generates synthetic events in the shape of the API results.
+
+    Parameters:
+        count (int): The number of events.
+        start (datetime.datetime): The date of the first event.
+        spacing (datetime.timedelta): The time between two events.
+
+    Returns:
+        list: The events in JSON format sorted by date.
+    """
+    rng = random.Random(count)
+    events = []
+    for i in range(count):
+        date = start + i * spacing
+        event_id = i + 1
+        events.append(
+            {
+                "id": event_id,
+                "url": f"{EVENT_PATH}{event_id}/",
+                "slug": f"synthetic-event-{event_id}",
+                "name": f"Synthetic Event {event_id}",
+                "type": {"id": event_id % 5, "name": "Synthetic"},
+                "description": " ".join(
+                    rng.choice(("launch", "docking", "spacewalk", "landing", "test", "orbit"))
+                    for _ in range(rng.randint(5, 40))
+                ),
+                "webcast_live": event_id % 7 == 0,
+                "location": rng.choice(("Cape Canaveral", "Baikonur", "Starbase", "ISS")),
+                "news_url": None,
+                "video_url": None,
+                "feature_image": None,
+                "date": date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "duration": None,
+                "last_updated": (date - timedelta(days=30)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "launches": [],
+                "agencies": [],
+            }
+        )
+    return events
+
+
+def filter_events(events, params):
+    """
+    Applies the query filters supported by the API to a list of events.
+
+    Parameters:
+        events (list): The events in JSON format.
+        params (dict): The query parameters, each mapped to its first value.
+
+    Returns:
+        list: The matching events, ordered as requested.
+    """
+
+    def timestamp(value):
+        # Like the API, a bare date is compared as midnight of that day
+        return value + "T00:00:00Z" if len(value) == 10 else value
+
+    selected = events
+    if "date__gte" in params:
+        selected = [e for e in selected if e["date"] >= timestamp(params["date__gte"])]
+    if "date__lte" in params:
+        selected = [e for e in selected if e["date"] <= timestamp(params["date__lte"])]
+    if "date__lt" in params:
+        selected = [e for e in selected if e["date"] < timestamp(params["date__lt"])]
+    if "last_updated__gte" in params:
+        since = timestamp(params["last_updated__gte"])
+        selected = [e for e in selected if e["last_updated"] >= since]
+    for index, part in ((0, "year"), (1, "month"), (2, "day")):
+        if part in params:
+            value = int(params[part])
+            selected = [
+                e for e in selected if int(re.split("[-T]", e["date"])[index]) == value
+            ]
+    ordering = params.get("ordering")
+    if ordering:
+        field = ordering.lstrip("-")
+        selected = sorted(selected, key=lambda e: e[field], reverse=ordering.startswith("-"))
+    return selected
+
+
+class FakeSpaceDevsServer:
+    """
+    Serves synthetic events with the count/next/previous/results shape of the API,
+    with configurable latency, 429 responses, server errors and rate limit headers.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        events=2000,
+        latency=0.0,
+        rate_429=0.0,
+        error_rate=0.0,
+        rate_limit=None,
+        rate_window=3600,
+        seed=None,
+    ):
+        """
+        Parameters:
+            host (str): The interface to listen on.
+            port (int): The port to listen on, 0 picks a free one.
+            events (int): The number of synthetic events.
+            latency (float): The delay added to every response in seconds.
+            rate_429 (float): The probability of answering 429 Too Many Requests.
+            error_rate (float): The probability of answering 500 Internal Server Error.
+            rate_limit (int)(optional): The number of requests allowed per window.
+            rate_window (int): The length of the rate limit window in seconds.
+            seed (int)(optional): The seed of the random fault injection.
+        """
+        self.events = make_events(events)
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._window_used = 0
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self):
+        """
+        Returns:
+            str: The URL of the /event/ endpoint, to use as SPACEFLIGHT_API_URL.
+        """
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{EVENT_PATH}"
+
+    def start(self):
+        """
+        Starts serving in a background thread.
+
+        Returns:
+            FakeSpaceDevsServer: The server itself.
+        """
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops the server and closes its socket.
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def respond(self, path):
+        """
+        Builds the response to a GET request.
+
+        Parameters:
+            path (str): The request path with its query string.
+
+        Returns:
+            tuple: The status code, the headers and the JSON body.
+        """
+        with self._lock:
+            self.requests += 1
+            headers = {}
+            if self.rate_limit is not None:
+                now = time.time()
+                if now - self._window_start >= self.rate_window:
+                    self._window_start, self._window_used = now, 0
+                reset = int(self._window_start + self.rate_window - now)
+                if self._window_used >= self.rate_limit:
+                    return 429, {"Retry-After": str(reset)}, {"detail": "Request was throttled."}
+                self._window_used += 1
+                headers["X-RateLimit-Limit"] = str(self.rate_limit)
+                headers["X-RateLimit-Remaining"] = str(self.rate_limit - self._window_used)
+                headers["X-RateLimit-Reset"] = str(reset)
+            roll = self._random.random()
+        if roll < self.rate_429:
+            return 429, {"Retry-After": "1"}, {"detail": "Request was throttled."}
+        if roll < self.rate_429 + self.error_rate:
+            return 500, headers, {"detail": "Internal server error."}
+
+        url = urlparse(path)
+        if not url.path.startswith(EVENT_PATH):
+            return 404, headers, {"detail": "Not found."}
+        detail = url.path[len(EVENT_PATH) :].strip("/")
+        if detail:
+            if not detail.isdigit() or not 0 < int(detail) <= len(self.events):
+                return 404, headers, {"detail": "Not found."}
+            return 200, headers, self.events[int(detail) - 1]
+
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        selected = filter_events(self.events, query)
+        limit = min(int(query.get("limit", DEFAULT_LIMIT)), MAX_LIMIT)
+        offset = int(query.get("offset", 0))
+
+        def page_url(page_offset):
+            params = dict(query, limit=limit, offset=page_offset)
+            return self.base_url + "?" + urlencode(params)
+
+        body = {
+            "count": len(selected),
+            "next": page_url(offset + limit) if offset + limit < len(selected) else None,
+            "previous": page_url(max(0, offset - limit)) if offset > 0 else None,
+            "results": selected[offset : offset + limit],
+        }
+        return 200, headers, body
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                status, headers, body = server.respond(self.path)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serves synthetic spaceflight events locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Probability of a 429 response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 500 response")
+    parser.add_argument("--rate-limit", type=int, help="Requests allowed per window")
+    parser.add_argument("--rate-window", type=int, default=3600, help="Rate limit window in seconds")
+    args = parser.parse_args()
+
+    server = FakeSpaceDevsServer(
+        args.host,
+        args.port,
+        events=args.events,
+        latency=args.latency,
+        rate_429=args.rate_429,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+    )
+    print(f"Serving {args.events} events on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
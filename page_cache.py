@@ -0,0 +1,76 @@
+from collections import OrderedDict
+import threading
+
+
+class PageCache:
+    """
+    An in-memory LRU cache of parsed and rendered pages keyed by page URL.
+
+    Holds at most `max_pages` pages. Reading or storing a page marks it as the most
+    recently used one, and the least recently used page is evicted when full.
+    """
+
+    def __init__(self, max_pages=50, on_evict=None):
+        """
+        Parameters:
+            max_pages (int): The maximum number of pages kept.
+            on_evict (callable)(optional): Called with the URL and the page of every evicted page.
+        """
+        self.max_pages = max_pages
+        self.on_evict = on_evict
+        self._pages = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """
+        Returns the cached page for a URL and marks it as recently used.
+
+        Parameters:
+            url (str): The URL of the page, None for the first page of the query.
+
+        Returns:
+            tuple: The (count, next, previous, table_lines) tuple, or None if not cached.
+        """
+        with self._lock:
+            page = self._pages.get(url)
+            if page is not None:
+                self._pages.move_to_end(url)
+            return page
+
+    def put(self, url, page):
+        """
+        Stores a page, evicting the least recently used pages beyond max_pages.
+
+        Parameters:
+            url (str): The URL of the page, None for the first page of the query.
+            page (tuple): The (count, next, previous, table_lines) tuple.
+        """
+        evicted = []
+        with self._lock:
+            self._pages[url] = page
+            self._pages.move_to_end(url)
+            while len(self._pages) > self.max_pages:
+                evicted.append(self._pages.popitem(last=False))
+        if self.on_evict:
+            for evicted_url, evicted_page in evicted:
+                self.on_evict(evicted_url, evicted_page)
+
+    def discard(self, url):
+        """
+        Removes the page of a URL if it is cached, e.g. a page that failed to load completely.
+
+        Parameters:
+            url (str): The URL of the page.
+        """
+        with self._lock:
+            page = self._pages.pop(url, None)
+        if page is not None and self.on_evict:
+            self.on_evict(url, page)
+
+    def __contains__(self, url):
+        with self._lock:
+            return url in self._pages
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pages)
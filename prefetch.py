@@ -0,0 +1,126 @@
+from scheduler import PREFETCH, Scheduler
+import threading
+
+NEXT = 1
+PREVIOUS = 2
+
+
+class Prefetcher:
+    """
+    Fetches the pages adjacent to the displayed one in worker threads.
+
+    Pages are followed through their next / previous URLs up to `depth` pages in
+    each direction. Calling schedule() again cancels the prefetches that are no
+    longer reachable from the newly displayed page.
+
+    Fetches are queued at PREFETCH priority on a scheduler, keyed by URL, so a page
+    requested in the foreground while its prefetch is queued is only fetched once.
+    """
+
+    def __init__(self, fetch, depth=1, max_workers=2, scheduler=None, pages=None):
+        """
+        Parameters:
+            fetch (callable): Called with a URL, returns a (count, next, previous, table_lines) tuple.
+            depth (int): The number of pages to prefetch in each direction.
+            max_workers (int): The number of worker threads, if no scheduler is given.
+            scheduler (Scheduler)(optional): The scheduler running the fetches. A private one is used if None.
+            pages (PageCache)(optional): The pages already loaded, which are not fetched again.
+        """
+        self.fetch = fetch
+        self.depth = depth
+        self.pages = pages
+        self._owns_scheduler = scheduler is None
+        self._scheduler = scheduler or Scheduler(max_workers=max_workers)
+        self._futures = {}
+        self._wanted = {}
+        self._lock = threading.RLock()
+
+    def schedule(self, next_url, previous_url):
+        """
+        Prefetches the pages around the displayed page and cancels the ones not needed anymore.
+
+        Parameters:
+            next_url (str): The next URL of the displayed page, or None.
+            previous_url (str): The previous URL of the displayed page, or None.
+        """
+        with self._lock:
+            wanted = {}
+            for url, direction in ((next_url, NEXT), (previous_url, PREVIOUS)):
+                remaining = self.depth
+                while url and remaining > 0 and url not in wanted:
+                    wanted[url] = (direction, remaining)
+                    page = self._cached(url)
+                    if page is None:
+                        future = self._futures.get(url)
+                        if future is None or not future.done() or future.cancelled():
+                            break
+                        if future.exception() is not None:
+                            break
+                        page = future.result()
+                    url = page[direction]
+                    remaining -= 1
+            self._wanted = wanted
+
+            for url in list(self._futures):
+                if url not in wanted:
+                    self._futures.pop(url).cancel()
+            for url, (direction, remaining) in list(wanted.items()):
+                if url not in self._futures and self._cached(url) is None:
+                    self._submit(url, direction, remaining)
+
+    def peek(self, url):
+        """
+        Returns the prefetched page for a URL if its fetch has finished, without waiting.
+
+        Parameters:
+            url (str): The URL of the page.
+
+        Returns:
+            tuple: The (count, next, previous, table_lines) tuple, or None if the page
+                   was not prefetched, is still being fetched or the prefetch failed.
+        """
+        with self._lock:
+            future = self._futures.get(url)
+        if future is None or not future.done() or future.cancelled():
+            return None
+        if future.exception() is not None:
+            return None
+        return future.result()
+
+    def shutdown(self):
+        """
+        Cancels every pending prefetch and stops the worker threads of a private scheduler.
+        """
+        with self._lock:
+            self._wanted = {}
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+        if self._owns_scheduler:
+            self._scheduler.shutdown()
+
+    def _cached(self, url):
+        page = self.pages.get(url) if self.pages is not None else None
+        if page is not None and getattr(page[3], "error", None):
+            return None  # Cut off by a failed stream, fetched again
+        return page
+
+    def _submit(self, url, direction, remaining):
+        future = self._scheduler.submit(url, lambda: self.fetch(url), PREFETCH)
+        self._futures[url] = future
+        if remaining > 1:
+            future.add_done_callback(
+                lambda f: self._extend(url, f, direction, remaining - 1)
+            )
+
+    def _extend(self, url, future, direction, remaining):
+        if future.cancelled() or future.exception() is not None:
+            return
+        following = future.result()[direction]
+        with self._lock:
+            if url not in self._wanted or not following or following in self._futures:
+                return
+            if self._cached(following) is not None:
+                return
+            self._wanted[following] = (direction, remaining)
+            self._submit(following, direction, remaining)
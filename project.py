@@ -1,32 +1,89 @@
-import requests
 from date_validator import get_date
 from tools import *
+from cache import ResponseCache, conditional_headers, is_fresh
+from store import EventStore
+from page_cache import PageCache
+from decoder import iter_results
+from events import (
+    STATIC_FIELDS,
+    TABLE_HEADERS,
+    description_width,
+    format_detail,
+    stream_events,
+    update_events,
+)
+from renderer import TableView
+from search import SearchIndex
+from bisect import bisect_left, bisect_right
+from urllib.parse import parse_qsl, quote, urlsplit, urlunsplit
+from scheduler import BACKGROUND, FOREGROUND, PREFETCH, Scheduler, current_priority, priority
+import client
+import tracing
 import curses
+import json
+import os
 import signal
+import time
+
+EVENT_BASE_URL = os.environ.get(
+    "SPACEFLIGHT_API_URL", "https://lldev.thespacedevs.com/2.2.0/event/"
+)
+BULK_PAGE_SIZE = 100
+OFFLINE_PAGE_SIZE = 10  # The default page size of the API
+PAD_LINES = 500
+SPINNER = "|/-\\"
+SPINNER_DELAY = 0.05  # Loads finishing sooner are shown without the spinner
+DETAIL_CACHE_SIZE = 100
+CHUNK_SIZE = 64 * 1024
+PAGE_FIELDS = ("id",) + STATIC_FIELDS
+response_cache = None
+event_store = None
+offline_snapshot = None
+request_scheduler = None
+needs_redraw = False
 
 
 def main():
     """
-    The main entry point for the program. Initializes the curses interface and starts the CLI loop.
-    Catches exceptions and exits program with an appropriate error message
+    The main entry point for the program. Parses the arguments, initializes the curses interface
+    and starts the CLI loop. Catches exceptions and exits program with an appropriate error message
     """
+    args = get_args()
+    check_args(args)
+    if args.trace_file:
+        tracing.enable()
+    if args.profile:
+        tracing.start_profile()
     try:
-        curses.wrapper(cli_loop)
+        if args.export_snapshot:
+            export_snapshot(args)
+        elif args.batch:
+            export_ranges(args)
+        elif args.format:
+            export_events(args)
+        else:
+            curses.wrapper(cli_loop, args)
     except curses.error:
         sys.exit(f"\nPlease Exapnd the terminal window and try again\n")
     except Exception as e:
         sys.exit(f"Exception : {e}")
+    finally:
+        if args.profile:
+            tracing.write_profile(args.profile)
+        if args.trace_file:
+            tracing.write_trace(args.trace_file)
 
 
-def cli_loop(stdscr_instance):
-    """q
+def cli_loop(stdscr_instance, args=None):
+    """
     The main loop for the curses interface. Handles user input and displays the table of spaceflight events.
 
     Parameters:
         stdscr_instance (curses.window): The standard screen window object provided by curses.wrapper.
+        args (argparse.Namespace)(optional): The parsed arguments. Parsed from the command line if None.
     """
 
-    global stdscr
+    global stdscr, needs_redraw
     stdscr = stdscr_instance
 
     beginning_msg = "\n \n \n\t\t\t\t\t\tYOU'VE REACHED THE BEGINNING\n\n\t\t\t\t\t      Enter 'n' to go to the first page \n\t\t\t\t\tStill can't find the event you're looking for? \n\t\t\t\t\tTry running the  program with different dates.".split(
@@ -36,54 +93,243 @@ def cli_loop(stdscr_instance):
         "\n"
     )
 
-    previous_page = None
-    next_page = None
+    wait_msg = "\n\n\n\t\t\t\t\t\tPLEASE WAIT...".split("\n")
+    no_match_msg = "\n\n\n\t\t\t\t\t\tNO MATCHING EVENTS IN THE LOADED PAGES".split("\n")
 
-    args = get_args()
-    check_args(args)
+    if args is None:
+        args = get_args()
+        check_args(args)
 
-    count, next, previous, table_lines = get_table_data(args)
+    if args.local:
+        start_store_sync(args)
+
+    index = SearchIndex()
+    # The search covers the pages kept in memory
+    pages = PageCache(args.page_cache, on_evict=lambda url, page: index.remove(url))
+    details = PageCache(DETAIL_CACHE_SIZE)  # Detail records by event id
+    current_url = None  # Local and --all queries are a single page without a URL
+    if not (args.local or args.all_pages):
+        # Pages of a few screens, so tall terminals page through a range in fewer requests.
+        # The first page is keyed by the URL its links use, so going back to it is a cache hit
+        page_size = args.page_size or default_page_size(stdscr.getmaxyx()[0])
+        current_url = get_events_url(
+            args.start_date, args.end_date, is_today=args.today, page_size=page_size
+        )
+    # Pages are shown as soon as they fill the screen, the rest streams in behind
+    first_lines = stdscr.getmaxyx()[0]
+    count, next, previous, table_lines = 0, None, None, wait_msg
+
+    prefetcher = None
+    if args.prefetch_depth > 0:
+        from prefetch import Prefetcher
+
+        def prefetch(url):
+            page = get_table_data(args, url=url)
+            index.add(url, page[3])
+            pages.put(url, page)
+            return page
+
+        prefetcher = Prefetcher(
+            prefetch, depth=args.prefetch_depth, scheduler=get_scheduler(), pages=pages
+        )
+
+    def start_load(url):
+        # Pages load in the background so keys are read meanwhile
+        future = request_page(args, url, pages, prefetcher, first_lines=first_lines)
+        try:
+            future.result(SPINNER_DELAY)
+        except Exception:
+            pass  # Still loading, or failed and raised when applied
+        return future, url
+
+    loading = start_load(current_url)  # The future of the page being loaded and its URL
 
     curses.curs_set(0)  # Hide the cursor
-    stdscr.clear()
+    try:
+        curses.set_escdelay(25)  # Esc cancels a search without a noticeable delay
+    except curses.error:
+        pass
     signal.signal(signal.SIGWINCH, resize_handler)
-    max_y, max_x = stdscr.getmaxyx()
-    win = curses.newwin(max_y - 7, max_x - 1, 5, 0)
 
     start_line = 0
     start_col = 0
     run_loop = True
+    screen_size = None
+    pad = None
+    pad_top = 0
+    pad_state = None
+    prompt = None  # "/" or "f" while a query is typed
+    query = ""
+    filtering = False
+    search_origin = 0
+    search_state = None
+    drawn_status = None
+    shown = table_lines
+    matches = []
+    watch = args.watch
+    poll = None  # The future of the running poll and the page it checks
+    next_poll = time.monotonic() + watch if watch else None
+    patched_rows = None
+    detail = None  # The record of the event shown in the detail pane and the future of its details
+    detail_state = None
+    detail_origin = 0
+    selected = ()  # The lines of the row Enter opens, as drawn on the pad
+    load_error = None  # The error of the last page that failed to load
 
     while run_loop:
         try:
-            stdscr.addstr(0, 45, "SPACEFLIGHT EVENTS LIBRARY", curses.A_UNDERLINE)
-            stdscr.addstr(
-                1,
-                0,
-                " Click any arrow key to display the data\n Use arrow keys to navigate\n To exit the program press 'q'",
-            )
-            stdscr.addstr(
-                max_y - 1,
-                0,
-                "For more info about the events visit: https://thespacedevs.com/llapi",
-            )
-            stdscr.addstr(4, 0, " Press 'n' or 'p' to go 'next page' or previous page'")
             max_y, max_x = stdscr.getmaxyx()
-            win.resize(max_y - 7, max_x - 1)
-            win.clear()
-            end_line = min(start_line + max_y - 7, len(table_lines))
-
-            for idx, line in enumerate(table_lines[start_line:end_line]):
+            if (max_y, max_x) != screen_size or needs_redraw:
+                # The static chrome only changes when the terminal is resized
+                screen_size = (max_y, max_x)
+                needs_redraw = False
+                stdscr.clear()
+                draw_chrome(max_y)
+                pad = None
+                drawn_status = None
+            if loading is not None and loading[0] is not None and loading[0].done():
+                future, url = loading
+                loading = None
+                if not future.cancelled():
+                    try:
+                        page = future.result()
+                    except Exception as e:
+                        # The page shown stays, the error goes on the status line
+                        load_error = e
+                    else:
+                        load_error = None
+                        current_url = url
+                        count, next, previous, table_lines = page
+                        if prefetcher:
+                            prefetcher.schedule(next, previous)
+            # Wrap the loaded rows for the terminal width, nothing is fetched again
+            wrap = {"description": description_width(max_x)}
+            for table in {id(table_lines): table_lines, id(shown): shown}.values():
+                if hasattr(table, "relayout") and table.relayout(wrap):
+                    pad = None
+            view_height = max_y - 7
+            if poll is not None and poll[0].done():
+                future, poll_url, poll_lines = poll
+                poll = None
+                next_poll = time.monotonic() + watch
                 try:
-                    win.addstr(idx, 0, line[start_col : start_col + max_x - 1])
-                except curses.error:
-                    pass  # Ignore addstr errors
-            stdscr.refresh()
-            win.refresh()
+                    data, partial = future.result()
+                except Exception:
+                    data = None  # Checked again at the next interval
+                if data is not None and poll_url == current_url and poll_lines is table_lines:
+                    page, patched_rows = refresh_page(
+                        (count, next, previous, table_lines), data, partial
+                    )
+                    count, next, previous, table_lines = page
+                    pages.put(current_url, page)
+                    if patched_rows:
+                        index.refresh(current_url, patched_rows)
+
+            complete = getattr(table_lines, "complete", True)
+            if watch and poll is None and time.monotonic() >= next_poll:
+                if complete and loading is None and table_lines is not end_msg and table_lines is not beginning_msg:
+                    poll = (
+                        get_scheduler().submit(
+                            ("watch", current_url),
+                            lambda url=current_url, lines=table_lines: poll_page(args, url, lines),
+                            PREFETCH,
+                        ),
+                        current_url,
+                        table_lines,
+                    )
+                else:
+                    next_poll = time.monotonic() + watch
+            busy = loading is not None or (
+                detail is not None and detail[1] is not None and not detail[1].done()
+            )
+            # Poll for keys while rows are still streaming in, so they can be drawn
+            if not complete or poll is not None or busy:
+                stdscr.timeout(100)
+            elif watch:
+                stdscr.timeout(max(1, int((next_poll - time.monotonic()) * 1000)))
+            else:
+                stdscr.timeout(-1)
+            version = getattr(table_lines, "version", None)
+
+            if getattr(table_lines, "error", None):
+                # A page cut off by a failed stream is fetched again on the next visit
+                pages.discard(current_url)
+            else:
+                index.add(current_url, table_lines)
+            if detail is None and (query, filtering, current_url, table_lines, version) != search_state:
+                search_state = (query, filtering, current_url, table_lines, version)
+                hits = index.search(query)
+                matches = []
+                if filtering and query:
+                    rows = index.rows(hits)
+                    headers = getattr(table_lines, "headers", TABLE_HEADERS)
+                    columns = getattr(table_lines, "columns", None)
+                    shown = TableView(headers, rows, wrap=wrap, columns=columns) if rows else no_match_msg
+                    start_line = 0
+                else:
+                    shown = table_lines
+                    if hits and hasattr(table_lines, "line_range"):
+                        matches = sorted(
+                            (table_lines.line_range(row) for url, row in hits if url == current_url),
+                            key=lambda lines: lines.start,
+                        )
+                    if prompt == "/" and matches:
+                        # Jump to the first match from where the search started
+                        start_line = find_match(matches, search_origin - 1).start
+            highlight = {line for lines in matches for line in lines}
+            if detail is not None:
+                record, future = detail
+                state = (record, future is None or future.done(), max_x)
+                if state != detail_state:
+                    detail_state = state
+                    detail_lines = detail_pane(record, future, max_x - 1)
+                shown, highlight = detail_lines, set()
+
+            start_line = min(start_line, max(0, len(shown) - view_height))
+            end_line = min(start_line + view_height, len(shown))
+            row = selected_row(shown, start_line)
+            selection = shown.line_range(row) if row is not None else ()
+
+            spinner = SPINNER[int(time.monotonic() * 10) % len(SPINNER)] if busy else None
+            # A page that failed while streaming in keeps the rows it got
+            error = (None if loading else load_error) or getattr(table_lines, "error", None)
+            status = (
+                prompt, query, filtering, len(matches), len(hits), client.budget.remaining(), spinner,
+                " ".join(str(error).split()) if error else None,
+            )
+            if status != drawn_status:
+                draw_status(max_y, max_x, *status)
+                drawn_status = status
+                stdscr.noutrefresh()
+            with tracing.span("paint", start_line=start_line):
+                if patched_rows and pad is not None and pad_state[0] is shown is table_lines:
+                    # Only the rows of the events that changed are drawn again
+                    repaint_rows(pad, table_lines, patched_rows, pad_top, highlight, selected)
+                    pad_state = (shown, search_state)
+                patched_rows = None
+                if (
+                    pad is None
+                    or pad_state != (shown, search_state)
+                    or start_line < pad_top
+                    or end_line > pad_top + PAD_LINES
+                ):
+                    pad_top = max(0, start_line - PAD_LINES // 4)
+                    pad = paint_pad(shown, pad_top, view_height, max_x - 1, highlight, selection)
+                    pad_state = (shown, search_state)
+                    selected = selection
+                elif selection != selected:
+                    # Scrolling moved the selection, only the two rows are drawn again
+                    rows = {shown.row_at(lines.start) for lines in (selected, selection) if lines}
+                    repaint_rows(pad, shown, rows, pad_top, highlight, selection)
+                    selected = selection
+                start_col = min(start_col, pad.getmaxyx()[1] - max_x + 1)
+                pad.noutrefresh(start_line - pad_top, start_col, 5, 0, max_y - 3, max_x - 2)
+                curses.doupdate()
 
         except curses.error:
             stdscr.addstr(6, 0, "\n\t\t\t\t\tPLAESE EXPAND THE WINDOW")
             stdscr.refresh()
+            screen_size = None
             key = stdscr.getch()
             if key == ord("q"):
                 run_loop = False
@@ -92,7 +338,41 @@ def cli_loop(stdscr_instance):
         else:
             key = stdscr.getch()
 
-            if key == curses.KEY_DOWN and end_line < len(table_lines):
+            if detail is not None and key in (10, 13, curses.KEY_ENTER, 27):
+                detail = None
+                search_state = None  # Shows the table again
+                start_line = detail_origin
+            elif detail is not None and key not in (
+                curses.KEY_UP, curses.KEY_DOWN, curses.KEY_LEFT, curses.KEY_RIGHT, ord("q"), ord("Q")
+            ):
+                pass  # Paging and searching are done from the table
+            elif prompt:
+                # Keys edit the query, results are updated on every keystroke
+                if key in (10, 13, curses.KEY_ENTER):
+                    prompt = None
+                elif key == 27:  # Esc
+                    prompt, query, filtering = None, "", False
+                    start_line = search_origin
+                elif key in (curses.KEY_BACKSPACE, 127, 8):
+                    query = query[:-1]
+                elif 32 <= key < 127:
+                    query += chr(key)
+            elif key in (ord("/"), ord("f"), ord("F")):
+                prompt = "/" if key == ord("/") else "f"
+                filtering = prompt == "f"
+                query = ""
+                search_origin = start_line
+            elif key in (10, 13, curses.KEY_ENTER):
+                # Shows every field of the selected event, the one at the top of the view
+                row = selected_row(shown, start_line)
+                if row is not None:
+                    record = dict(zip(shown.headers, shown.rows[row]))
+                    future = None if args.offline else request_event(args, record["id"], details)
+                    detail = (record, future)
+                    detail_origin, start_line = start_line, 0
+            elif key in (ord("]"), ord("[")) and matches:
+                start_line = find_match(matches, start_line, forward=key == ord("]")).start
+            elif key == curses.KEY_DOWN and end_line < len(shown):
                 start_line += 1
             elif key == curses.KEY_UP and start_line > 0:
                 start_line -= 1
@@ -100,88 +380,279 @@ def cli_loop(stdscr_instance):
                 start_col += 1
             elif key == curses.KEY_LEFT and start_col > 0:
                 start_col -= 1
-            elif (key == ord("n") or key == ord('N')):
-                if table_lines == end_msg:
+            elif key in (ord("n"), ord("N"), ord("p"), ord("P")):
+                forward = key in (ord("n"), ord("N"))
+                if filtering:
+                    # Paging leaves the filter, a search keeps highlighting the new page
+                    filtering, query = False, ""
+                if loading is not None:
+                    # Pressed again before the page arrived: move the target page and
+                    # fetch it once the keys stop, skipping the pages in between
+                    url = shift_page(loading[1], 1 if forward else -1, count)
+                    if url is None:
+                        continue
+                    if loading[0] is not None:
+                        loading[0].cancel()
+                    if url == current_url:
+                        loading = None  # Back to the page shown
+                    else:
+                        loading = (None, url)
                     continue
-                elif count and next_page:
-                    table_lines = next_page
-                    next_page = None
-                elif next:
-                    win.clear()
-                    win.addstr("\n\n\n\t\t\t\t\t\tPLEASE WAIT...")
-                    win.refresh()
-                    stdscr.refresh()
-                    count, next, previous, table_lines = get_table_data(args, url=next)
-                else:
-                    if count:
-                        previous_page = table_lines.copy()
-                    table_lines = end_msg
-
-            elif (key == ord("p") or key == ord('P')):
-                if table_lines == beginning_msg:
+                if table_lines is (end_msg if forward else beginning_msg):
                     continue
-                elif count and previous_page:
-                    table_lines = previous_page
-                    previous_page = None
-                elif previous:
-                    win.clear()
-                    win.addstr("\n\n\n\t\t\t\t\t\tPLEASE WAIT...")
-                    win.refresh()
-                    stdscr.refresh()
-                    count, next, previous, table_lines = get_table_data(
-                        args, url=previous
-                    )
+                elif table_lines is end_msg or table_lines is beginning_msg:
+                    # Go back to the page shown before the message
+                    url = current_url
+                elif forward and next:
+                    url = next
+                elif not forward and previous:
+                    url = previous
                 else:
-                    if count:
-                        next_page = table_lines.copy()
-                    table_lines = beginning_msg
+                    table_lines = end_msg if forward else beginning_msg
+                    continue
+
+                loading = start_load(url)
             elif (key == ord("q") or key == ord('Q')):
                 run_loop = False
+            elif key == -1 and loading is not None and loading[0] is None:
+                loading = start_load(loading[1])
+
+    if loading is not None and loading[0] is not None:
+        loading[0].cancel()
+    if prefetcher:
+        prefetcher.shutdown()
 
 
-def get_events_url(start_date, end_date, is_today=False):
+def draw_chrome(max_y):
+    """
+    Draws the title, the help text and the footer around the table.
+
+    Parameters:
+        max_y (int): The height of the terminal.
+    """
+    stdscr.addstr(0, 45, "SPACEFLIGHT EVENTS LIBRARY", curses.A_UNDERLINE)
+    stdscr.addstr(
+        1,
+        0,
+        " Click any arrow key to display the data\n Use arrow keys to navigate\n To exit the program press 'q'",
+    )
+    stdscr.addstr(
+        max_y - 1,
+        0,
+        "For more info about the events visit: https://thespacedevs.com/llapi",
+    )
+    stdscr.addstr(4, 0, " Press 'n' or 'p' to go 'next page' or previous page'")
+
+
+def paint_pad(lines, top, height, width, highlight=(), selected=()):
+    """
+    Draws a band of table lines into a new curses pad. Scrolling within the band only
+    moves the pad viewport, so curses sends just the cells that changed.
+
+    Parameters:
+        lines (list): The table lines.
+        top (int): The index of the first line of the band.
+        height (int): The minimum height of the pad, the height of the viewport.
+        width (int): The minimum width of the pad, the width of the viewport.
+        highlight (set)(optional): The indexes of the lines drawn highlighted.
+        selected (range)(optional): The indexes of the lines of the selected row, drawn bold.
+
+    Returns:
+        curses.window: The pad holding up to PAD_LINES lines from `top`.
+    """
+    band = [line.expandtabs() for line in lines[top : top + PAD_LINES]]
+    widest = max(map(len, band), default=0)
+    pad = curses.newpad(max(len(band), height, 1), widest + width)
+    for idx, line in enumerate(band):
+        try:
+            if top + idx in highlight or top + idx in selected:
+                pad.addstr(idx, 0, line, line_attribute(top + idx, highlight, selected))
+            else:
+                pad.addstr(idx, 0, line)
+        except curses.error:
+            pass  # Ignore addstr errors
+    return pad
+
+
+def line_attribute(index, highlight, selected):
+    """
+    Parameters:
+        index (int): The index of a table line.
+        highlight (set): The indexes of the lines drawn highlighted.
+        selected (range): The indexes of the lines of the selected row.
+
+    Returns:
+        int: The curses attribute the line is drawn with.
+    """
+    attribute = curses.A_REVERSE if index in highlight else curses.A_NORMAL
+    return attribute | curses.A_BOLD if index in selected else attribute
+
+
+def selected_row(lines, line):
+    """
+    Finds the row Enter opens: the first row shown from a line of the table.
+
+    Parameters:
+        lines (TableView): The table lines, or a message without rows.
+        line (int): The index of the top line of the view.
+
+    Returns:
+        int: The index of the row, or None if nothing is shown as rows.
+    """
+    if not hasattr(lines, "row_at"):
+        return None
+    row = lines.row_at(line)
+    if row is not None and line >= lines.line_range(row).stop and row + 1 < len(lines.rows):
+        row += 1  # The border under a row scrolled out of view
+    return row
+
+
+def draw_status(
+    max_y, max_x, prompt, query, filtering, page_matches, loaded_matches, budget=None, spinner=None,
+    error=None,
+):
+    """
+    Draws the status line under the table: the query being typed and the number of matches,
+    or the search keys when no search is active, followed by the API quota left.
+    A spinner is shown first while a page is loading, and the error of a page that
+    failed to load before that.
+
+    Parameters:
+        max_y (int): The height of the terminal.
+        max_x (int): The width of the terminal.
+        prompt (str): "/" or "f" while a query is typed, None otherwise.
+        query (str): The search terms.
+        filtering (bool): True if only the matching events are shown.
+        page_matches (int): The number of matching events on the displayed page.
+        loaded_matches (int): The number of matching events in all the loaded pages.
+        budget (tuple)(optional): The requests left and the size of the API quota, None if unknown.
+        spinner (str)(optional): The frame of the spinner, None if no page is loading.
+        error (str)(optional): The error of the last page load, None if it succeeded.
+    """
+    if query or prompt:
+        status = f"{'Filter: ' if filtering else '/'}{query}{'_' if prompt else ''}"
+        if filtering:
+            status += f"   {loaded_matches} matching events in the loaded pages"
+        else:
+            status += f"   {page_matches} on this page, {loaded_matches} in the loaded pages"
+            status += "   ']' or '[' for the next or previous match"
+        if prompt:
+            status += "   Enter to keep, Esc to clear"
+    else:
+        status = " Press '/' to search or 'f' to filter the loaded events"
+    if spinner:
+        status = f" {spinner} Loading page...  " + status.lstrip()
+    if error:
+        status = f" {error}  " + status.lstrip()
+    if budget:
+        quota = f"API requests left: {budget[0]}/{budget[1]} "
+        status = status[: max(0, max_x - 1 - len(quota) - 1)].ljust(max_x - 1 - len(quota)) + quota
+    stdscr.move(max_y - 2, 0)
+    stdscr.clrtoeol()
+    stdscr.addstr(max_y - 2, 0, status[: max_x - 1])
+
+
+def find_match(matches, line, forward=True):
+    """
+    Finds the next or previous search match from a table line, wrapping around the page.
+
+    Parameters:
+        matches (list): The line ranges of the matching rows, sorted.
+        line (int): The line to search from.
+        forward (bool): True to find the first match after the line, False the last one before it.
+
+    Returns:
+        range: The line range of the match.
+    """
+    starts = [match.start for match in matches]
+    if forward:
+        return matches[bisect_right(starts, line) % len(matches)]
+    return matches[bisect_left(starts, line) - 1]
+
+
+def repaint_rows(pad, lines, rows, top, highlight=(), selected=()):
+    """
+    Draws again the lines of some rows on a pad painted by paint_pad, e.g. after their
+    events were updated in place.
+
+    Parameters:
+        pad (curses.window): The pad holding the band of lines from `top`.
+        lines (TableView): The table lines.
+        rows (list): The indexes of the rows to draw.
+        top (int): The index of the first line of the band.
+        highlight (set)(optional): The indexes of the lines drawn highlighted.
+        selected (range)(optional): The indexes of the lines of the selected row, drawn bold.
+    """
+    for row in rows:
+        for index in lines.line_range(row):
+            if not top <= index < top + PAD_LINES:
+                continue
+            attribute = line_attribute(index, highlight, selected)
+            try:
+                pad.addstr(index - top, 0, lines[index].expandtabs(), attribute)
+            except curses.error:
+                pass
+
+
+def get_events_url(start_date, end_date, is_today=False, page_size=None):
     """
     Constructs the URL for querying spaceflight events based on the provided date range or for today's date.
 
+    The range is made of whole UTC days and the parameters are sorted, so the same
+    query always gets the same URL and is served from the caches.
+
     Parameters:
         start_date (str): The start date in the format 'DD-MM-YYYY'.
         end_date (str): The end date in the format 'DD-MM-YYYY'.
         is_today (bool): If True, fetches events for today only.
+        page_size (int)(optional): The number of events per page, the API's default if None.
 
     Returns:
         str: The constructed query URL.
     """
-    event_base_url = "https://lldev.thespacedevs.com/2.2.0/event/"
-    filters = []
+    if is_today:
+        day, month, year = get_todays_date()
+        params = [("day", day), ("month", month), ("year", year)]
+    else:
+        start_date, end_date = get_date_range(start_date, end_date)
+        # A bare date is compared as midnight, so the range ends before the next day
+        params = [("date__gte", start_date), ("date__lt", end_date + timedelta(days=1))]
+    params.append(("limit", page_size))
+    return EVENT_BASE_URL + "?" + canonical_query(params)
+
+
+def get_date_range(start_date, end_date):
+    """
+    Resolves the date range of a query, defaulting to 15 days before and after today in UTC.
+
+    Parameters:
+        start_date (str): The start date in the format 'DD-MM-YYYY', or None.
+        end_date (str): The end date in the format 'DD-MM-YYYY', or None.
+
+    Returns:
+        tuple: The first and last days of the range as datetime.date objects.
+    """
+    today = datetime.now(UTC).date()
     if not start_date:
-        start_date = datetime.now() - timedelta(days=15)
+        start_date = today - timedelta(days=15)
     else:
         start_date = get_date(start_date)
     if not end_date:
-        end_date = datetime.now() + timedelta(days=15)
+        end_date = today + timedelta(days=15)
     else:
         end_date = get_date(end_date)
-    if is_today:
-        d, m, y = list(map(str, get_todays_date()))
-        day = "day=" + d
-        month = "month=" + m
-        year = "year=" + y
-        date = "&".join((day, month, year))
-        filters.append(date)
-    else:
-        date_filters = add_date_filters(start_date, end_date)
-        filters.append(date_filters)
-    query_url = event_base_url + "?" + "&".join(filters)
-    return query_url
+    return start_date, end_date
 
 
-def get_table_data(args, url=None):
+def get_table_data(args, url=None, first_lines=None):
     """
     Fetches the event data from the API and constructs the table data for display.
 
     Parameters:
         args (object): The arguments object containing start_date, end_date, and today attributes.
         url (str)(optional): The URL to fetch data from. If None, constructs the URL using start_date and end_date from args.
+        first_lines (int)(optional): If set, returns as soon as the table has this many lines,
+                                     and keeps adding the rest of the page in the background.
 
     Returns:
         tuple: A tuple containing the count of events, next URL, previous URL, and the table lines.
@@ -189,17 +660,765 @@ def get_table_data(args, url=None):
     Raises:
         ConnectionError: If the status code of the response is not 200.
     """
+    with tracing.span("get_table_data", url=url):
+        if args.offline:
+            page = create_df(query_snapshot(get_snapshot(args.offline), args, url))
+        elif args.local and not url:
+            page = create_df(query_store(get_store(), args))
+        elif not url and args.all_pages:
+            query_url = get_events_url(args.start_date, args.end_date, is_today=args.today)
+            page = create_df(
+                fetch_all_pages(
+                    query_url, get_cache(args), args.concurrency, args.page_size or BULK_PAGE_SIZE
+                )
+            )
+        else:
+            query_url = url or get_events_url(
+                args.start_date, args.end_date, is_today=args.today, page_size=args.page_size
+            )
+            if first_lines:
+                page = stream_table_data(query_url, get_cache(args), first_lines)
+            else:
+                page = create_df(fetch_json(query_url, cache=get_cache(args)))
+        count, next, previous, table_lines = page
+        # Links in the form of the URLs built here, so a page is cached under one URL
+        return count, canonical_page(next), canonical_page(previous), table_lines
+
+
+def stream_table_data(query_url, cache, first_lines):
+    """
+    Fetches a page and formats its events as they are decoded from the response.
+
+    Parameters:
+        query_url (str): The URL of the page.
+        cache (ResponseCache): The response cache to use, or None.
+        first_lines (int): The number of table lines to wait for before returning.
+
+    Returns:
+        tuple: A tuple containing the count of events, next URL, previous URL, and the
+               table lines, which keep growing until the page is complete.
+    """
+    meta = {}
+    table_lines = stream_events(iter_json(query_url, meta, cache))
+    table_lines.wait_for_lines(first_lines)
+    if table_lines.error:
+        raise table_lines.error
+    if table_lines.complete and not table_lines.rows:
+        return create_df(dict(meta, results=[]))
+    # The API sends count, next and previous before the results
+    return meta.get("count"), meta.get("next"), meta.get("previous"), table_lines
+
+
+def fetch_all_pages(query_url, cache=None, concurrency=4, page_size=BULK_PAGE_SIZE):
+    """
+    Fetches every page of a query concurrently and merges them into a single page.
+
+    The first page is fetched on its own to learn the total count. The remaining
+    pages are then requested by limit/offset with at most `concurrency` requests in
+    flight, and their results are reassembled in order.
+
+    Parameters:
+        query_url (str): The query URL without pagination filters.
+        cache (ResponseCache)(optional): The response cache to use.
+        concurrency (int): The maximum number of parallel requests.
+        page_size (int): The number of events requested per page.
+
+    Returns:
+        dict: The merged data with count, next, previous and results keys.
+    """
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    def page_url(offset):
+        parts = urlsplit(query_url)
+        params = parse_qsl(parts.query) + [("limit", page_size), ("offset", offset)]
+        return urlunsplit(parts._replace(query=canonical_query(params)))
+
+    def fetch_page(offset):
+        # The worker threads send their requests at the priority of the caller
+        with priority(level):
+            return fetch_json(page_url(offset), cache)
+
+    level = current_priority()
+    first = fetch_json(page_url(0), cache=cache)
+    results = list(first["results"])
+    offsets = range(page_size, first["count"], page_size)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        pages = executor.map(fetch_page, offsets)
+        for page in pages:
+            results.extend(page["results"])
+    return {"count": first["count"], "next": None, "previous": None, "results": results}
+
+
+def request_page(args, url, pages, prefetcher=None, first_lines=None):
+    """
+    Starts loading a page from the page cache, the prefetcher or the API, in that order,
+    without waiting for it. Pages are fetched through the request scheduler at
+    FOREGROUND priority and kept in the page cache once loaded.
+
+    Parameters:
+        args (object): The arguments object passed to get_table_data.
+        url (str): The URL of the page, None for the first page of the query.
+        pages (PageCache): The cache of visited pages.
+        prefetcher (Prefetcher)(optional): The prefetcher of adjacent pages.
+        first_lines (int)(optional): The number of lines to wait for when fetching from the API,
+                                     see get_table_data.
+
+    Returns:
+        concurrent.futures.Future: The (count, next, previous, table_lines) tuple of the page.
+                                   Cancelling it before the fetch starts skips the fetch.
+    """
+    from concurrent.futures import Future
+
+    page = pages.get(url)
+    if page is not None and getattr(page[3], "error", None):
+        # The stream of the page failed after it was cached, it is fetched again
+        pages.discard(url)
+        page = None
+    if page is None and prefetcher and url:
+        page = prefetcher.peek(url)
+    if page is not None:
+        pages.put(url, page)
+        future = Future()
+        future.set_result(page)
+        return future
+
+    def fetch():
+        if first_lines:
+            page = get_table_data(args, url=url, first_lines=first_lines)
+        else:
+            page = get_table_data(args, url=url)
+        pages.put(url, page)
+        return page
+
+    # A prefetch of the page that is queued is taken over, one that is running is joined
+    return get_scheduler().start(url, fetch, FOREGROUND)
+
+
+def request_event(args, event_id, details):
+    """
+    Starts loading the detail record of an event from the detail cache or the
+    /event/{id}/ endpoint, without waiting for it.
+
+    Parameters:
+        args (object): The arguments object containing the no_cache and cache_ttl attributes.
+        event_id (int): The id of the event.
+        details (PageCache): The cache of detail records by event id.
+
+    Returns:
+        concurrent.futures.Future: The event with every field returned by the API.
+    """
+    from concurrent.futures import Future
+
+    record = details.get(event_id)
+    if record is not None:
+        future = Future()
+        future.set_result(record)
+        return future
+
+    def fetch():
+        record = fetch_json(f"{EVENT_BASE_URL}{event_id}/", cache=get_cache(args), fields=None)
+        details.put(event_id, record)
+        return record
+
+    return get_scheduler().start(("event", event_id), fetch, FOREGROUND)
+
+
+def detail_pane(record, future, width):
+    """
+    Builds the lines of the detail pane of an event: the fields of its table row, then
+    every field of its detail record once it has been fetched.
+
+    Parameters:
+        record (dict): The fields of the table row of the event.
+        future (Future): The detail record being fetched, None if it is not fetched.
+        width (int): The width of the pane.
+
+    Returns:
+        list: The lines of the pane.
+    """
+    lines = [" Press Enter or Esc to go back to the table", ""]
+    if future is None:
+        return lines + format_detail(record, width)
+    if not future.done():
+        return lines + format_detail(record, width) + ["", " Loading the details..."]
+    try:
+        return lines + format_detail(future.result(), width)
+    except Exception as e:
+        return lines + format_detail(record, width) + ["", f" Couldn't load the details: {e}"]
+
+
+def page_offset(url):
+    """
+    Reads the limit and offset parameters of a page URL.
+
+    Parameters:
+        url (str): The URL of the page.
+
+    Returns:
+        tuple: The limit and offset of the page, or None if the URL has no limit.
+    """
+    params = dict(parse_qsl(urlsplit(url or "").query))
+    try:
+        return int(params["limit"]), int(params.get("offset", 0))
+    except (KeyError, ValueError):
+        return None
+
+
+def shift_page(url, pages, count):
+    """
+    Computes the URL of the page some pages away from a page, from its limit and
+    offset, so pages can be skipped without fetching the ones in between.
+
+    Parameters:
+        url (str): The URL of the page.
+        pages (int): The number of pages to move, negative to move back.
+        count (int): The number of events of the query.
+
+    Returns:
+        str: The URL of the page, or None if it is out of the query or the URL has no limit.
+    """
+    position = page_offset(url)
+    if position is None:
+        return None
+    limit, offset = position
+    offset += pages * limit
+    if offset < 0 or offset >= count:
+        return None
+    return page_at(url, offset)
+
+
+def page_at(url, offset):
+    """
+    Moves a page URL to another offset. The offset is left out for the first page and
+    the parameters are sorted, like in the URLs returned by the API, so the caches are hit.
+
+    Parameters:
+        url (str): The URL of a page of the query.
+        offset (int): The index of the first event of the page.
+
+    Returns:
+        str: The URL of the page at the offset.
+    """
+    parts = urlsplit(url)
+    params = [param for param in parse_qsl(parts.query) if param[0] != "offset"]
+    params.append(("offset", offset or None))
+    return urlunsplit(parts._replace(query=canonical_query(params)))
+
+
+def canonical_page(url):
+    """
+    Puts a page link returned by the API in the form of the URLs built here, with
+    sorted parameters and no offset for the first page.
+
+    Parameters:
+        url (str): The URL of the page, or None.
+
+    Returns:
+        str: The canonical URL of the page, or None if url is None.
+    """
     if not url:
-        query_url = get_events_url(args.start_date, args.end_date, is_today=args.today)
-    else:
-        query_url = url
-    results = requests.get(query_url)
+        return url
+    offset = dict(parse_qsl(urlsplit(url).query)).get("offset", 0)
+    return page_at(url, int(offset))
+
+
+def poll_page(args, url, table_lines):
+    """
+    Checks a displayed page for changes, for watch mode.
+
+    Pages cached with an ETag or Last-Modified validator are revalidated with a
+    conditional request, so an unchanged page costs a 304 without a body. Otherwise
+    only the events of the query updated since the newest event of the page are
+    requested. Updated events of other pages are left out, and the whole page is
+    fetched again only if an update moves an event into or out of its dates.
+
+    Parameters:
+        args (object): The arguments object containing start_date, end_date and today attributes.
+        url (str): The URL of the page, None for the first page of the query.
+        table_lines (TableView): The displayed table of the page.
+
+    Returns:
+        tuple: The data and True if it only holds the events that may have changed.
+    """
+    query_url = url or get_events_url(
+        args.start_date, args.end_date, is_today=args.today, page_size=args.page_size
+    )
+    cache = get_cache(args)
+    entry = cache.lookup(query_url) if cache else None
+    column = TABLE_HEADERS.index("last_updated")
+    updated = [row[column] for row in getattr(table_lines, "rows", ()) if row[column]]
+    if updated and not (entry and (entry.etag or entry.last_modified)):
+        changes = fetch_json(changes_url(query_url, max(updated)))
+        ids = {row[0] for row in table_lines.rows}
+        low, high = page_dates(query_url, table_lines)
+        # An event belongs on the page if its date is within the dates of the page
+        if changes["count"] == len(changes["results"]) and all(
+            (data.get("id") in ids) == (low <= (data.get("date") or "") <= high)
+            for data in changes["results"]
+        ):
+            results = [data for data in changes["results"] if data.get("id") in ids]
+            return dict(changes, count=len(results), results=results), True
+    return fetch_json(query_url, cache, revalidate=True), False
+
+
+def page_dates(query_url, table_lines):
+    """
+    Finds the dates an event must have to be shown on a page: from its first to its
+    last event, open-ended before the first page and after the last one.
+
+    Parameters:
+        query_url (str): The URL of the page.
+        table_lines (TableView): The table of the page.
+
+    Returns:
+        tuple: The lowest and highest dates, as ISO strings.
+    """
+    column = TABLE_HEADERS.index("date")
+    dates = [row[column] for row in table_lines.rows if row[column]]
+    low, high = min(dates, default=""), max(dates, default="\uffff")
+    position = page_offset(query_url)
+    if position is None or position[1] == 0:
+        low = ""
+    if position is None or len(table_lines.rows) < position[0]:
+        high = "\uffff"
+    return low, high
+
+
+def changes_url(query_url, since):
+    """
+    Turns the URL of a page into a query for the events of the same filters updated since a time.
+
+    Parameters:
+        query_url (str): The URL of the page.
+        since (str): The last_updated timestamp to start from, included.
+
+    Returns:
+        str: The URL of the first BULK_PAGE_SIZE updated events.
+    """
+    parts = urlsplit(query_url)
+    params = [
+        (key, value)
+        for key, value in parse_qsl(parts.query)
+        if key not in ("limit", "offset", "last_updated__gte")
+    ]
+    params += [("last_updated__gte", since), ("limit", BULK_PAGE_SIZE)]
+    return urlunsplit(parts._replace(query=canonical_query(params)))
+
+
+def refresh_page(page, data, partial=False):
+    """
+    Applies the result of poll_page to a displayed page. Only the rows of the events
+    whose last_updated changed are formatted again.
+
+    Parameters:
+        page (tuple): The (count, next, previous, table_lines) tuple of the page.
+        data (dict): The data returned by poll_page.
+        partial (bool): True if the data only holds the events that may have changed.
+
+    Returns:
+        tuple: The updated page, and the indexes of the rows replaced without moving
+               the other lines, or None if the table has to be painted again.
+    """
+    count, next, previous, table_lines = page
+    if hasattr(table_lines, "rows"):
+        updated = update_events(table_lines, data["results"], partial=partial)
+        if updated is not None:
+            changed, in_place = updated
+            if not partial:
+                count = data["count"]
+                next, previous = canonical_page(data["next"]), canonical_page(data["previous"])
+            return (count, next, previous, table_lines), changed if in_place else None
+    count, next, previous, table_lines = create_df(data)
+    # Links in the form of the page cache and prefetch keys, like in get_table_data
+    return (count, canonical_page(next), canonical_page(previous), table_lines), None
+
+
+def get_scheduler():
+    """
+    Returns:
+        Scheduler: The shared request scheduler that every page fetch goes through.
+    """
+    global request_scheduler
+    if request_scheduler is None:
+        request_scheduler = Scheduler()
+    return request_scheduler
+
+
+def get_cache(args):
+    """
+    Returns the shared response cache configured by the command-line arguments.
+
+    Parameters:
+        args (object): The arguments object containing the no_cache and cache_ttl attributes.
+
+    Returns:
+        ResponseCache: The response cache, or None if caching is disabled.
+    """
+    global response_cache
+    if args.no_cache:
+        return None
+    if response_cache is None:
+        response_cache = ResponseCache(ttl=args.cache_ttl)
+    return response_cache
+
+
+def fetch_json(query_url, cache=None, fields=PAGE_FIELDS, revalidate=False):
+    """
+    Fetches and decodes the JSON body of a query URL, serving it from the cache when possible.
+
+    Parameters:
+        query_url (str): The URL to fetch.
+        cache (ResponseCache)(optional): The response cache to use.
+        fields (tuple)(optional): The fields kept in each result, all of them if None.
+        revalidate (bool)(optional): If True, fresh cache entries are revalidated too.
+
+    Returns:
+        dict: The decoded JSON body.
+
+    Raises:
+        ConnectionError: If the status code of the response is neither 200 nor 304.
+    """
+    result = {}
+    results = list(iter_json(query_url, result, cache, fields, revalidate))
+    if "results" in result:
+        result["results"] = results
+    return result
+
+
+def iter_json(query_url, meta, cache=None, fields=PAGE_FIELDS, revalidate=False):
+    """
+    Fetches a query URL and yields the entries of its results list as they are decoded.
+
+    Fresh cache entries are returned without a request. Stale entries are revalidated
+    with a conditional request and reused if the server answers 304 Not Modified.
+    The body is gzip-compressed on the wire and decoded incrementally as it streams in,
+    keeping only the given fields of each result. The response is stored in the cache
+    once it has been read completely.
+
+    Parameters:
+        query_url (str): The URL to fetch.
+        meta (dict): Filled with the other top-level keys of the body (count, next, previous).
+        cache (ResponseCache)(optional): The response cache to use.
+        fields (tuple)(optional): The fields kept in each result, all of them if None.
+        revalidate (bool)(optional): If True, fresh cache entries are revalidated too.
+
+    Yields:
+        dict: The results of the page.
+
+    Raises:
+        ConnectionError: If the status code of the response is neither 200 nor 304.
+    """
+    entry = cache.lookup(query_url) if cache else None
+    if entry and is_fresh(entry) and not revalidate:
+        yield from split_body(json.loads(entry.body), meta)
+        return
+
+    with tracing.span("http", url=query_url) as http_span:
+        results = client.get(query_url, headers=conditional_headers(entry), stream=True)
+        if http_span:
+            # Time until the headers arrived: DNS, connect, TLS and server time
+            http_span.args["headers_ms"] = results.elapsed.total_seconds() * 1000
 
     status = results.status_code
+    if status != 200:
+        results.close()
+    if status == 304 and entry:
+        cache.refresh(query_url)
+        yield from split_body(json.loads(entry.body), meta)
+        return
     if status != 200:
         raise ConnectionError("Error : couldn't get the data\n Status code : {status}")
-    result = results.json()
-    return create_df(result)
+
+    received = []
+    with tracing.span("json"):
+        for result in iter_results(results.iter_content(CHUNK_SIZE), meta, fields):
+            if cache:
+                received.append(result)
+            yield result
+    if cache:
+        body = dict(meta, results=received) if "results" in meta else meta
+        cache.store(
+            query_url,
+            json.dumps(body),
+            etag=results.headers.get("ETag"),
+            last_modified=results.headers.get("Last-Modified"),
+        )
+
+
+def split_body(body, meta):
+    """
+    Splits a decoded body into its results and its other top-level keys.
+
+    Parameters:
+        body (dict): The decoded JSON body.
+        meta (dict): Filled with the keys of the body, with results set to an empty list.
+
+    Returns:
+        list: The results of the body, empty if it has none.
+    """
+    meta.update(body)
+    if "results" not in body:
+        return []
+    meta["results"] = []
+    return body["results"]
+
+
+def iter_pages(args):
+    """
+    Yields the events of the query page by page, following the next links so that
+    only one page is held in memory at a time.
+
+    Parameters:
+        args (object): The arguments object containing start_date, end_date, today and local attributes.
+
+    Yields:
+        list: The events of a page in JSON format.
+    """
+    if args.local:
+        # Synced first, an export would be over before a background sync
+        store = get_store()
+        sync_store(store, args.concurrency)
+        yield query_store(store, args)["results"]
+        return
+    if args.offline:
+        snapshot = get_snapshot(args.offline)
+        start, end = query_dates(args)
+        page_size = args.page_size or BULK_PAGE_SIZE
+        for offset in range(0, snapshot.query(start, end, 0, 0)[0], page_size):
+            yield snapshot.query(start, end, offset, page_size)[1]
+        return
+    url = get_events_url(
+        args.start_date, args.end_date, is_today=args.today, page_size=args.page_size or BULK_PAGE_SIZE
+    )
+    cache = get_cache(args)
+    while url:
+        data = fetch_json(url, cache=cache)
+        yield data["results"]
+        url = data["next"]
+
+
+def export_events(args):
+    """
+    Streams the events of the query to stdout in the format chosen with --format,
+    without starting the curses interface.
+
+    Parameters:
+        args (object): The parsed arguments.
+    """
+    from export import write_pages
+
+    try:
+        write_pages(iter_pages(args), args.format, sys.stdout)
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head), nothing left to do
+        sys.stderr.close()
+    except Exception as e:
+        sys.exit(f"Exception : {e}")
+
+
+def export_ranges(args):
+    """
+    Writes the events of every date range of the batch file to stdout, in the format
+    chosen with --format (JSON lines by default), without starting the curses interface.
+
+    Parameters:
+        args (object): The parsed arguments.
+    """
+    from batch import parse_ranges
+    from export import write_ranges
+
+    try:
+        if args.batch == "-":
+            ranges = parse_ranges(sys.stdin)
+        else:
+            with open(args.batch) as file:
+                ranges = parse_ranges(file)
+    except (OSError, ValueError) as e:
+        sys.exit(str(e))
+
+    try:
+        results = fetch_ranges(ranges, cache=get_cache(args), concurrency=args.concurrency)
+        write_ranges(zip(ranges, results), args.format or "jsonl", sys.stdout)
+    except BrokenPipeError:
+        sys.stderr.close()
+    except Exception as e:
+        sys.exit(f"Exception : {e}")
+
+
+def fetch_ranges(ranges, cache=None, concurrency=4):
+    """
+    Fetches the events of several date ranges. Overlapping and adjacent ranges are
+    merged first, so every day is requested once however many ranges cover it.
+
+    Parameters:
+        ranges (list): The (start, end) pairs of datetime.date objects, both days included.
+        cache (ResponseCache)(optional): The response cache to use.
+        concurrency (int): The maximum number of parallel requests per merged range.
+
+    Returns:
+        list: The events in JSON format of each range, in the order of `ranges`.
+    """
+    from batch import coalesce, fan_out
+
+    events = []
+    for start, end in coalesce(ranges):
+        query_url = EVENT_BASE_URL + "?" + add_date_filters(start, end)
+        events.extend(fetch_all_pages(query_url, cache, concurrency)["results"])
+    return fan_out(events, ranges)
+
+
+def get_store():
+    """
+    Returns:
+        EventStore: The shared local event store.
+    """
+    global event_store
+    if event_store is None:
+        event_store = EventStore()
+    return event_store
+
+
+def query_store(store, args):
+    """
+    Answers the date range query of the arguments from the local event store.
+
+    Parameters:
+        store (EventStore): The local event store.
+        args (object): The arguments object containing start_date, end_date, and today attributes.
+
+    Returns:
+        dict: The matching events as a single page with count, next, previous and results keys.
+    """
+    results = store.query(*query_dates(args))
+    return {"count": len(results), "next": None, "previous": None, "results": results}
+
+
+def query_dates(args):
+    """
+    Resolves the days of the date range query of the arguments.
+
+    Parameters:
+        args (object): The arguments object containing start_date, end_date, and today attributes.
+
+    Returns:
+        tuple: The first and last days of the range as datetime.date objects.
+    """
+    if args.today:
+        start = end = datetime(*reversed(get_todays_date())).date()
+    else:
+        start, end = get_date_range(args.start_date, args.end_date)
+    return start, end
+
+
+def get_snapshot(path):
+    """
+    Returns the snapshot opened for --offline, opening it on first use.
+
+    Parameters:
+        path (str): The path of the snapshot file.
+
+    Returns:
+        Snapshot: The memory-mapped snapshot.
+    """
+    global offline_snapshot
+    if offline_snapshot is None or offline_snapshot.path != path:
+        from snapshot import Snapshot
+
+        offline_snapshot = Snapshot(path)
+    return offline_snapshot
+
+
+def query_snapshot(snapshot, args, url=None):
+    """
+    Answers the date range query of the arguments from an offline snapshot, one page at a time.
+
+    The pages have the count, next, previous and results keys of the API, and their
+    URLs the limit and offset parameters of the API, so they are navigated and cached
+    like online pages.
+
+    Parameters:
+        snapshot (Snapshot): The offline snapshot.
+        args (object): The arguments object containing start_date, end_date, and today attributes.
+        url (str)(optional): The URL of the page, None for the first page.
+
+    Returns:
+        dict: The page with count, next, previous and results keys.
+    """
+    # Pages keep the size of the URL they are requested with
+    page_size, offset = page_offset(url) or (args.page_size or OFFLINE_PAGE_SIZE, 0)
+    count, results = snapshot.query(*query_dates(args), offset, page_size)
+    base_url = get_events_url(
+        args.start_date, args.end_date, is_today=args.today, page_size=page_size
+    )
+    return {
+        "count": count,
+        "next": page_at(base_url, offset + page_size) if offset + page_size < count else None,
+        "previous": page_at(base_url, max(0, offset - page_size)) if offset > 0 else None,
+        "results": results,
+    }
+
+
+def export_snapshot(args):
+    """
+    Writes the events of the query to the snapshot file given with --export-snapshot,
+    for use with --offline on machines without network access.
+
+    The events come from the local store with --local, from the API otherwise.
+
+    Parameters:
+        args (object): The parsed arguments.
+    """
+    from snapshot import write_snapshot
+
+    try:
+        if args.local:
+            store = get_store()
+            sync_store(store, args.concurrency)
+            events = query_store(store, args)["results"]
+        else:
+            query_url = get_events_url(args.start_date, args.end_date, is_today=args.today)
+            events = fetch_all_pages(query_url, get_cache(args), args.concurrency)["results"]
+        written = write_snapshot(events, args.export_snapshot)
+    except Exception as e:
+        sys.exit(f"Exception : {e}")
+    print(f"Wrote {written} events to {args.export_snapshot}")
+
+
+def sync_store(store, concurrency=4):
+    """
+    Brings the local event store up to date by fetching only the events updated since
+    its high-water mark, the most recent last_updated timestamp it holds.
+
+    Parameters:
+        store (EventStore): The local event store.
+        concurrency (int): The maximum number of parallel requests.
+
+    Returns:
+        int: The number of events written to the store.
+    """
+    query_url = EVENT_BASE_URL + "?ordering=last_updated"
+    high_water_mark = store.high_water_mark()
+    if high_water_mark:
+        query_url += "&last_updated__gte=" + quote(high_water_mark)
+    data = fetch_all_pages(query_url, concurrency=concurrency)
+    return store.upsert(data["results"])
+
+
+def start_store_sync(args):
+    """
+    Syncs the local event store before the first query if it is empty, and as
+    BACKGROUND work of the request scheduler otherwise, so the first page is answered
+    from the store at once and page fetches are sent before the sync requests.
+
+    Parameters:
+        args (object): The arguments object containing the concurrency attribute.
+    """
+    store = get_store()
+    if len(store) == 0:
+        sync_store(store, args.concurrency)
+    else:
+        get_scheduler().submit("sync", lambda: sync_store(store, args.concurrency), BACKGROUND)
 
 
 def resize_handler(signum, frame):
@@ -210,10 +1429,12 @@ def resize_handler(signum, frame):
         signum (int): The signal number.
         frame (frame object): The current stack frame.
     """
+    global needs_redraw
     curses.endwin()
     curses.initscr()
     curses.resizeterm(*stdscr.getmaxyx())
     stdscr.clear()
+    needs_redraw = True
 
 
 if __name__ == "__main__":
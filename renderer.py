@@ -0,0 +1,373 @@
+from bisect import bisect_right
+from collections.abc import Sequence
+from functools import lru_cache
+from numbers import Number
+import textwrap
+import threading
+
+WRAP_CACHE_SIZE = 4096
+
+
+def format_cell(value):
+    """
+    Converts a table cell into its display text.
+
+    Parameters:
+        value (object): The cell value.
+
+    Returns:
+        str: The text of the cell, empty for missing values.
+    """
+    if value is None or value != value:  # NaN is the only value not equal to itself
+        return ""
+    return str(value)
+
+
+def is_numeric(value):
+    """
+    Checks whether a cell is right-aligned like a number.
+
+    Parameters:
+        value (object): The cell value.
+
+    Returns:
+        bool: True for numbers other than booleans.
+    """
+    return isinstance(value, Number) and not isinstance(value, bool)
+
+
+@lru_cache(maxsize=WRAP_CACHE_SIZE)
+def wrap_lines(text, width):
+    """
+    Wraps a text to the given width. Results are memoized, so laying a table out again
+    at a width it was already shown at costs no wrapping.
+
+    Parameters:
+        text (str): The text to wrap.
+        width (int): The maximum line width.
+
+    Returns:
+        tuple: The lines of the wrapped text, a single empty line for an empty text.
+    """
+    return tuple(textwrap.wrap(text, width=width)) or ("",)
+
+
+class TableView(Sequence):
+    """
+    A grid table that behaves like the list of lines produced by tabulate's "grid"
+    format, but only formats the rows that are actually read.
+
+    Column widths and row heights are computed when rows are added. The lines of a
+    row are formatted the first time one of them is requested and then kept, so
+    scrolling over a large page only costs the rows on screen.
+
+    Rows can be appended while the table is displayed, e.g. as a page streams in.
+    The formatted rows are only thrown away when new rows widen a column.
+
+    Text columns can be wrapped by the table itself. The rows keep the unwrapped
+    cells, so the table can be laid out again for another width without the
+    events being fetched or parsed again.
+
+    Rows can hold more cells than the columns displayed. The hidden cells are never
+    measured nor formatted, but stay available, e.g. for a detail view.
+    """
+
+    def __init__(self, headers, rows, complete=True, wrap=None, columns=None):
+        """
+        Parameters:
+            headers (list): The headers of the cells of the rows.
+            rows (list): The rows of the table, each a sequence of cell values.
+            complete (bool): False if more rows are going to be appended.
+            wrap (dict)(optional): The width at which the text of each wrapped column
+                                   is wrapped, by header.
+            columns (list)(optional): The headers of the columns displayed, in order,
+                                      every column if None.
+        """
+        self.headers = [str(header) for header in headers]
+        if columns is None:
+            self._shown = list(range(len(self.headers)))
+        else:
+            self._shown = [self.headers.index(str(column)) for column in columns]
+        self._wrap = self._wrap_columns(wrap)
+        self.rows = []
+        self.widths = [len(self.headers[col]) for col in self._shown]
+        self.aligns = [True] * len(self._shown)
+        self.heights = []
+        self.complete = complete
+        self.error = None
+        self.version = 0
+        self._row_cache = {}
+        self._offsets = []
+        self._changed = threading.Condition(threading.RLock())
+        self._layout()
+        self._length = len(self._header_lines)
+        self.append(rows, complete=complete)
+
+    def append(self, rows, complete=None):
+        """
+        Adds rows at the end of the table.
+
+        Parameters:
+            rows (list): The new rows.
+            complete (bool)(optional): Marks whether more rows are going to be appended.
+        """
+        with self._changed:
+            widths = list(self.widths)
+            aligns = list(self.aligns)
+            for row in rows:
+                height = self._measure(row, widths, aligns)
+                self.rows.append(row)
+                self.heights.append(height)
+                self._offsets.append(self._length)
+                self._length += height + 1
+            if widths != self.widths or aligns != self.aligns:
+                self.widths, self.aligns = widths, aligns
+                self._layout()
+            if complete is not None:
+                self.complete = complete
+            self.version += 1
+            self._changed.notify_all()
+
+    def replace(self, index, row):
+        """
+        Replaces a row of the table, e.g. when its event was updated.
+
+        Parameters:
+            index (int): The index of the row.
+            row (sequence): The new cell values.
+
+        Returns:
+            bool: True if only the lines of this row changed, False if the rows below
+                  moved or the columns were laid out again.
+        """
+        with self._changed:
+            widths = list(self.widths)
+            aligns = list(self.aligns)
+            height = self._measure(row, widths, aligns)
+            self.rows[index] = row
+            self._row_cache.pop(index, None)
+            in_place = True
+            if height != self.heights[index]:
+                shift = height - self.heights[index]
+                self.heights[index] = height
+                for following in range(index + 1, len(self._offsets)):
+                    self._offsets[following] += shift
+                self._length += shift
+                in_place = False
+            if widths != self.widths or aligns != self.aligns:
+                self.widths, self.aligns = widths, aligns
+                self._layout()
+                in_place = False
+            self.version += 1
+            self._changed.notify_all()
+            return in_place
+
+    @property
+    def columns(self):
+        """
+        Returns:
+            list: The headers of the columns displayed.
+        """
+        return [self.headers[col] for col in self._shown]
+
+    def row_at(self, line):
+        """
+        Finds the row shown on a table line.
+
+        Parameters:
+            line (int): The index of the line.
+
+        Returns:
+            int: The index of the row, of the first row for the header lines, or None if
+                 the table has no rows.
+        """
+        with self._changed:
+            if not self.rows:
+                return None
+            return max(0, bisect_right(self._offsets, line) - 1)
+
+    @property
+    def wrap(self):
+        """
+        Returns:
+            dict: The width at which each wrapped column is wrapped, by header.
+        """
+        return {self.headers[col]: width for col, width in self._wrap.items()}
+
+    def relayout(self, wrap):
+        """
+        Wraps the text columns at new widths, e.g. after the terminal was resized, and
+        computes the column widths and row heights again from the rows kept.
+
+        Parameters:
+            wrap (dict): The width at which the text of each wrapped column is wrapped, by header.
+
+        Returns:
+            bool: True if the layout changed, False if the table already had these widths.
+        """
+        with self._changed:
+            wrap = self._wrap_columns(wrap)
+            if wrap == self._wrap:
+                return False
+            self._wrap = wrap
+            widths = [len(self.headers[col]) for col in self._shown]
+            aligns = [True] * len(self._shown)
+            self.heights = [self._measure(row, widths, aligns) for row in self.rows]
+            self.widths, self.aligns = widths, aligns
+            self._layout()
+            self._offsets = []
+            self._length = len(self._header_lines)
+            for height in self.heights:
+                self._offsets.append(self._length)
+                self._length += height + 1
+            self.version += 1
+            self._changed.notify_all()
+            return True
+
+    def fail(self, error):
+        """
+        Marks the table as complete because loading the rest of its rows failed.
+
+        Parameters:
+            error (Exception): The error that stopped the loading.
+        """
+        with self._changed:
+            self.error = error
+            self.complete = True
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait_for_lines(self, count, timeout=None):
+        """
+        Blocks until the table has at least `count` lines or is complete.
+
+        Parameters:
+            count (int): The number of lines needed, e.g. one screenful.
+            timeout (float)(optional): The maximum number of seconds to wait.
+
+        Returns:
+            bool: True if the lines are available or the table is complete.
+        """
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: self.complete or self._length >= count, timeout
+            )
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.lines(*index.indices(len(self))[:2])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("table line index out of range")
+        return self.lines(index, index + 1)[0]
+
+    def line_range(self, row):
+        """
+        Returns the indexes of the table lines showing a row, without its bottom border.
+
+        Parameters:
+            row (int): The index of the row.
+
+        Returns:
+            range: The line indexes of the row.
+        """
+        with self._changed:
+            return range(self._offsets[row], self._offsets[row] + self.heights[row])
+
+    def copy(self):
+        """
+        Returns:
+            TableView: The view itself, since its lines are only ever added to.
+        """
+        return self
+
+    def _wrap_columns(self, wrap):
+        return {
+            self.headers.index(header): width
+            for header, width in (wrap or {}).items()
+            if header in self.headers and width
+        }
+
+    def _cell_lines(self, col, value):
+        width = self._wrap.get(col)
+        if width and isinstance(value, str):
+            return list(wrap_lines(value, width))
+        return format_cell(value).split("\n")
+
+    def _measure(self, row, widths, aligns):
+        height = 1
+        for i, col in enumerate(self._shown):
+            value = row[col]
+            cell_lines = self._cell_lines(col, value)
+            height = max(height, len(cell_lines))
+            widths[i] = max(widths[i], *map(len, cell_lines))
+            if value is not None and not is_numeric(value):
+                aligns[i] = False
+        return height
+
+    def _layout(self):
+        self._row_cache = {}
+        self._border = self._rule("-")
+        self._header_lines = (
+            [self._border] + self._format_row(self.headers, wrap=False) + [self._rule("=")]
+        )
+
+    def lines(self, start, end):
+        """
+        Returns the table lines between two line indexes, formatting only the rows they cover.
+
+        Parameters:
+            start (int): The index of the first line.
+            end (int): The index after the last line.
+
+        Returns:
+            list: The lines of the table in the given range.
+        """
+        with self._changed:
+            end = min(end, len(self))
+            lines = []
+            index = start
+            while index < end:
+                if index < len(self._header_lines):
+                    block_start = 0
+                    block = self._header_lines
+                else:
+                    row = bisect_right(self._offsets, index) - 1
+                    block_start = self._offsets[row]
+                    block = self._row_lines(row)
+                lines.extend(block[index - block_start : end - block_start])
+                index = block_start + len(block)
+            return lines
+
+    def _row_lines(self, row):
+        lines = self._row_cache.get(row)
+        if lines is None:
+            lines = self._format_row(self.rows[row], height=self.heights[row])
+            lines.append(self._border)
+            self._row_cache[row] = lines
+        return lines
+
+    def _format_row(self, row, height=1, wrap=True):
+        if wrap:
+            cells = [self._cell_lines(col, row[col]) for col in self._shown]
+        else:
+            cells = [format_cell(row[col]).split("\n") for col in self._shown]
+        height = max(height, *map(len, cells)) if cells else height
+        lines = []
+        for i in range(height):
+            parts = []
+            for col, cell_lines in enumerate(cells):
+                text = cell_lines[i] if i < len(cell_lines) else ""
+                if self.aligns[col]:
+                    parts.append(text.rjust(self.widths[col]))
+                else:
+                    parts.append(text.ljust(self.widths[col]))
+            lines.append("| " + " | ".join(parts) + " |")
+        return lines
+
+    def _rule(self, char):
+        return "+" + "+".join(char * (width + 2) for width in self.widths) + "+"
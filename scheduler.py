@@ -0,0 +1,321 @@
+from contextlib import contextmanager
+import heapq
+import itertools
+import threading
+import time
+
+FOREGROUND = 0  # The page the user is waiting for
+PREFETCH = 1  # Pages the user may ask for next
+BACKGROUND = 2  # Work nobody is waiting for, like syncing the local store
+RESERVE_FRACTION = 0.2
+
+_local = threading.local()
+
+
+class BudgetExhausted(Exception):
+    """
+    Raised when a speculative request is dropped to keep the rest of the API quota
+    for the requests the user is waiting for.
+    """
+
+
+def current_priority():
+    """
+    Returns:
+        int: The priority of the work running in the current thread, FOREGROUND by default.
+    """
+    return getattr(_local, "priority", FOREGROUND)
+
+
+@contextmanager
+def priority(level):
+    """
+    Runs a block of code with the given priority, e.g. to mark the requests it sends
+    as background work.
+
+    Parameters:
+        level (int): FOREGROUND, PREFETCH or BACKGROUND.
+    """
+    previous = current_priority()
+    _local.priority = level
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+class TokenBucket:
+    """
+    Tracks the request quota of the API as a token bucket.
+
+    The size of the bucket and the number of tokens are taken from the rate limit
+    headers of the responses, and tokens refill so the bucket is full again when the
+    server's window resets. Until the server reports a limit the bucket is unlimited.
+
+    Requests below FOREGROUND priority can't use the last tokens of the bucket, so
+    speculative and background work never spends the quota the user needs.
+    """
+
+    def __init__(self, capacity=None, reserve_fraction=RESERVE_FRACTION):
+        """
+        Parameters:
+            capacity (int)(optional): The number of requests allowed per window, unlimited if None.
+            reserve_fraction (float): The share of the bucket kept for FOREGROUND requests.
+        """
+        self.capacity = capacity
+        self.reserve_fraction = reserve_fraction
+        self._tokens = float(capacity) if capacity is not None else None
+        self._rate = 0.0
+        self._updated = time.monotonic()
+        self._changed = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        if self._tokens is not None:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    @property
+    def reserve(self):
+        """
+        Returns:
+            int: The number of tokens only FOREGROUND requests can use.
+        """
+        if self.capacity is None:
+            return 0
+        return max(1, int(self.capacity * self.reserve_fraction))
+
+    def sync(self, limit, remaining, reset):
+        """
+        Aligns the bucket with the quota reported by the server.
+
+        Parameters:
+            limit (int): The number of requests allowed per window.
+            remaining (int): The number of requests left in the current window.
+            reset (float): The number of seconds until the window resets.
+        """
+        with self._changed:
+            self._refill()
+            self.capacity = limit
+            self._tokens = float(min(remaining, limit))
+            # Refill so the bucket is full again when the window resets
+            self._rate = (limit - self._tokens) / reset if reset > 0 else float(limit)
+            self._changed.notify_all()
+
+    def acquire(self, level=FOREGROUND):
+        """
+        Takes a token for one request, waiting for it to refill if needed.
+
+        FOREGROUND requests can use every token. BACKGROUND requests wait until there
+        are more tokens than the reserve. PREFETCH requests don't wait: a page fetched
+        an hour later is of no use.
+
+        Parameters:
+            level (int): The priority of the request.
+
+        Raises:
+            BudgetExhausted: If a PREFETCH request would dip into the reserve.
+        """
+        with self._changed:
+            while True:
+                self._refill()
+                if self._tokens is None:
+                    return
+                floor = 1 if level == FOREGROUND else self.reserve + 1
+                if self._tokens >= floor:
+                    self._tokens -= 1
+                    return
+                if level == PREFETCH:
+                    raise BudgetExhausted("The API quota is kept for the displayed pages")
+                wait = (floor - self._tokens) / self._rate if self._rate else None
+                self._changed.wait(wait)
+
+    def remaining(self):
+        """
+        Returns:
+            tuple: The whole number of tokens left and the capacity of the bucket,
+                   or None if the server has not reported a limit.
+        """
+        with self._changed:
+            self._refill()
+            if self._tokens is None:
+                return None
+            return int(self._tokens), self.capacity
+
+
+class _Job:
+    __slots__ = ("key", "fn", "future", "priority", "started")
+
+    def __init__(self, key, fn, future, level):
+        self.key = key
+        self.fn = fn
+        self.future = future
+        self.priority = level
+        self.started = False
+
+
+class Scheduler:
+    """
+    Runs fetches by priority, sharing the result of identical fetches in flight.
+
+    FOREGROUND fetches run at once in the calling thread. Other fetches are queued
+    and run by worker threads in priority order, so prefetches wait behind nothing
+    but each other, and background work waits for both. A fetch for a key that is
+    already queued or running joins it instead of being sent again.
+    """
+
+    def __init__(self, max_workers=2):
+        """
+        Parameters:
+            max_workers (int): The number of worker threads for queued fetches.
+        """
+        self.max_workers = max_workers
+        self._queue = []
+        self._jobs = {}
+        self._order = itertools.count()
+        self._workers = []
+        self._closed = False
+        self._lock = threading.Condition()
+
+    def submit(self, key, fn, level=PREFETCH):
+        """
+        Queues a fetch, or joins the fetch already queued or running for the same key.
+
+        Parameters:
+            key (str): The identity of the fetch, e.g. its URL.
+            fn (callable): Called without arguments to do the fetch.
+            level (int): The priority of the fetch.
+
+        Returns:
+            concurrent.futures.Future: The result of the fetch.
+        """
+        from concurrent.futures import Future
+
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.future.cancelled():
+                if not job.started and level < job.priority:
+                    job.priority = level
+                    heapq.heappush(self._queue, (level, next(self._order), job))
+                return job.future
+            job = _Job(key, fn, Future(), level)
+            job.future.add_done_callback(lambda future: self._forget(job))
+            self._jobs[key] = job
+            heapq.heappush(self._queue, (level, next(self._order), job))
+            if len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, name="scheduler", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            self._lock.notify()
+            return job.future
+
+    def run(self, key, fn, level=FOREGROUND):
+        """
+        Does a fetch now in the calling thread and returns its result. If the same fetch
+        is queued, it is taken over; if it is already running, its result is awaited.
+
+        Parameters:
+            key (str): The identity of the fetch, e.g. its URL.
+            fn (callable): Called without arguments to do the fetch.
+            level (int): The priority of the requests sent by the fetch.
+
+        Returns:
+            object: The result of the fetch.
+        """
+        from concurrent.futures import Future
+
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.started and not job.future.cancelled():
+                future = job.future
+            else:
+                if job is None or not job.future.set_running_or_notify_cancel():
+                    job = _Job(key, fn, Future(), level)
+                    job.future.set_running_or_notify_cancel()
+                    job.future.add_done_callback(lambda future: self._forget(job))
+                    self._jobs[key] = job
+                job.fn = fn
+                job.started = True
+                future = None
+        if future is not None:
+            return future.result()
+        self._execute(job, level)
+        return job.future.result()
+
+    def start(self, key, fn, level=FOREGROUND):
+        """
+        Does a fetch now like run(), but in a new thread, so the caller can go on while
+        it is sent. The fetch is skipped if its future is cancelled before it starts.
+
+        Parameters:
+            key (str): The identity of the fetch, e.g. its URL.
+            fn (callable): Called without arguments to do the fetch.
+            level (int): The priority of the requests sent by the fetch.
+
+        Returns:
+            concurrent.futures.Future: The result of the fetch.
+        """
+        from concurrent.futures import Future
+
+        future = Future()
+
+        def work():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = self.run(key, fn, level)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+        threading.Thread(target=work, name="scheduler", daemon=True).start()
+        return future
+
+    def pending(self):
+        """
+        Returns:
+            int: The number of fetches queued or running.
+        """
+        with self._lock:
+            return len(self._jobs)
+
+    def shutdown(self):
+        """
+        Cancels the queued fetches and stops the worker threads once the running ones finish.
+        """
+        with self._lock:
+            self._closed = True
+            queued = [job for _, _, job in self._queue if not job.started]
+            self._queue.clear()
+            self._lock.notify_all()
+        for job in queued:
+            job.future.cancel()
+
+    def _execute(self, job, level):
+        with priority(level):
+            try:
+                result = job.fn()
+            except BaseException as e:
+                job.future.set_exception(e)
+            else:
+                job.future.set_result(result)
+
+    def _forget(self, job):
+        with self._lock:
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+
+    def _work(self):
+        while True:
+            with self._lock:
+                while not self._queue and not self._closed:
+                    self._lock.wait()
+                if self._closed:
+                    return
+                level, _, job = heapq.heappop(self._queue)
+                if job.started or job.priority != level:
+                    continue  # Taken over, or queued again with a higher priority
+                job.started = True
+            if job.future.set_running_or_notify_cancel():
+                self._execute(job, level)
@@ -0,0 +1,165 @@
+from bisect import bisect_left, insort
+import re
+import threading
+
+SEARCH_FIELDS = ("name", "description", "location")
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """
+    Splits a text into lowercase word tokens.
+
+    Parameters:
+        text (str): The text to split, None is treated as empty.
+
+    Returns:
+        list: The tokens in order of appearance.
+    """
+    if not isinstance(text, str):
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    """
+    An inverted index from word tokens to the rows of the loaded pages.
+
+    Pages are indexed incrementally: adding a page that is still streaming in only
+    indexes the rows that arrived since the last call. Tokens are kept sorted, so a
+    query term matches every token it is a prefix of with a binary search, and
+    results can be updated on every keystroke.
+    """
+
+    def __init__(self, fields=SEARCH_FIELDS):
+        """
+        Parameters:
+            fields (tuple): The table columns that are searched.
+        """
+        self.fields = fields
+        self.pages = {}  # page key -> (table, number of rows indexed)
+        self.order = []  # page keys in the order they were first indexed
+        self._postings = {}  # token -> set of (page key, row)
+        self._tokens = []
+        self._lock = threading.Lock()
+
+    def add(self, key, table):
+        """
+        Indexes the rows of a page that are not indexed yet.
+
+        Parameters:
+            key (str): The key of the page, e.g. its URL.
+            table (TableView): The table of the page. Anything without rows, like the
+                               "no events" message, is ignored.
+        """
+        if not hasattr(table, "rows"):
+            return
+        with self._lock:
+            indexed_table, indexed = self.pages.get(key, (None, 0))
+            if indexed_table is not table:
+                if indexed_table is not None:
+                    self._remove(key)
+                else:
+                    self.order.append(key)
+                indexed = 0
+            count = len(table.rows)
+            self._index_rows(key, table, range(indexed, count))
+            self.pages[key] = (table, count)
+
+    def refresh(self, key, rows):
+        """
+        Indexes again rows of a page that were replaced.
+
+        Parameters:
+            key (str): The key of the page.
+            rows (list): The indexes of the replaced rows.
+        """
+        with self._lock:
+            if key not in self.pages or not rows:
+                return
+            table, indexed = self.pages[key]
+            rows = [row for row in rows if row < indexed]
+            self._remove(key, set(rows))
+            self._index_rows(key, table, rows)
+
+    def remove(self, key):
+        """
+        Drops a page from the index, e.g. when it is evicted from the page cache.
+
+        Parameters:
+            key (str): The key of the page.
+        """
+        with self._lock:
+            if self.pages.pop(key, None) is None:
+                return
+            self.order.remove(key)
+            self._remove(key)
+
+    def _index_rows(self, key, table, rows):
+        columns = [table.headers.index(field) for field in self.fields if field in table.headers]
+        for offset in rows:
+            for column in columns:
+                for token in tokenize(table.rows[offset][column]):
+                    posting = self._postings.get(token)
+                    if posting is None:
+                        posting = self._postings[token] = set()
+                        insort(self._tokens, token)
+                    posting.add((key, offset))
+
+    def _remove(self, key, rows=None):
+        for token in list(self._postings):
+            posting = self._postings[token]
+            posting.difference_update(
+                [hit for hit in posting if hit[0] == key and (rows is None or hit[1] in rows)]
+            )
+            if not posting:
+                del self._postings[token]
+                self._tokens.pop(bisect_left(self._tokens, token))
+
+    def search(self, query):
+        """
+        Finds the rows matching every term of a query. The last term is matched as a
+        prefix, so results can be shown while it is being typed.
+
+        Parameters:
+            query (str): The search terms.
+
+        Returns:
+            set: The (page key, row) pairs of the matching rows.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return set()
+        with self._lock:
+            hits = None
+            for i, term in enumerate(terms):
+                if i == len(terms) - 1:
+                    term_hits = set()
+                    start = bisect_left(self._tokens, term)
+                    for token in self._tokens[start:]:
+                        if not token.startswith(term):
+                            break
+                        term_hits |= self._postings[token]
+                else:
+                    term_hits = self._postings.get(term, set())
+                hits = set(term_hits) if hits is None else hits & term_hits
+                if not hits:
+                    break
+            return hits
+
+    def rows(self, hits):
+        """
+        Returns the rows of search results in the order their pages were loaded.
+
+        Parameters:
+            hits (set): The (page key, row) pairs returned by search.
+
+        Returns:
+            list: The matching table rows.
+        """
+        with self._lock:
+            position = {key: i for i, key in enumerate(self.order)}
+            return [
+                self.pages[key][0].rows[row]
+                for key, row in sorted(hits, key=lambda hit: (position[hit[0]], hit[1]))
+            ]
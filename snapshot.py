@@ -0,0 +1,205 @@
+"""
+A compact, read-only file of events for offline use.
+
+Layout:
+    header   MAGIC, format version, number of blocks, number of events, index offset
+    blocks   the events sorted by date, in blocks of BLOCK_SIZE events, each block
+             a zlib-compressed JSON list
+    index    one fixed-size entry per block: the dates of its first and last events,
+             its offset and length in the file, and its number of events
+
+The file is memory-mapped and the index is binary searched in place, so a query
+only decompresses the blocks overlapping its date range.
+"""
+
+import json
+import mmap
+import struct
+import threading
+import zlib
+from bisect import bisect_left, bisect_right
+
+MAGIC = b"SFSNAP\x00\x01"
+VERSION = 1
+BLOCK_SIZE = 256
+HEADER = struct.Struct("<8sHIQQ")  # magic, version, blocks, events, index offset
+INDEX_ENTRY = struct.Struct("<20s20sQII")  # first date, last date, offset, length, events
+DATE_WIDTH = 20  # "YYYY-MM-DDTHH:MM:SSZ"
+
+
+class SnapshotError(Exception):
+    """
+    Raised when a file is not a snapshot or was written by an unknown format version.
+    """
+
+
+def write_snapshot(events, path, block_size=BLOCK_SIZE):
+    """
+    Writes events to a snapshot file.
+
+    Parameters:
+        events (iterable): The events in JSON format. Events without a date are skipped.
+        path (str): The path of the snapshot file.
+        block_size (int): The number of events per compressed block.
+
+    Returns:
+        int: The number of events written.
+    """
+    events = sorted(
+        (event for event in events if event.get("date")), key=lambda event: (event["date"], event.get("id") or 0)
+    )
+    index = []
+    with open(path, "wb") as file:
+        file.write(b"\0" * HEADER.size)
+        for start in range(0, len(events), block_size):
+            block = events[start : start + block_size]
+            data = zlib.compress(json.dumps(block, separators=(",", ":")).encode(), 9)
+            index.append(
+                INDEX_ENTRY.pack(
+                    date_key(block[0]["date"]),
+                    date_key(block[-1]["date"]),
+                    file.tell(),
+                    len(data),
+                    len(block),
+                )
+            )
+            file.write(data)
+        index_offset = file.tell()
+        file.write(b"".join(index))
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, VERSION, len(index), len(events), index_offset))
+    return len(events)
+
+
+def date_key(date):
+    """
+    Converts an event date into the fixed-width key stored in the index.
+
+    Parameters:
+        date (str): The ISO 8601 date, e.g. "2023-01-01T00:00:00Z", or a bare day.
+
+    Returns:
+        bytes: The date padded or cut to DATE_WIDTH bytes, which sort like the dates.
+    """
+    return date.encode()[:DATE_WIDTH].ljust(DATE_WIDTH, b"\0")
+
+
+class _IndexColumn:
+    """
+    A sequence view of one field of the index entries, read from the memory map, for bisect.
+    """
+
+    def __init__(self, snapshot, field):
+        self._snapshot = snapshot
+        self._field = field
+
+    def __len__(self):
+        return self._snapshot.blocks
+
+    def __getitem__(self, block):
+        return self._snapshot.entry(block)[self._field]
+
+
+class Snapshot:
+    """
+    Reads events by date range from a memory-mapped snapshot file.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters:
+            path (str): The path of the snapshot file.
+
+        Raises:
+            SnapshotError: If the file is not a snapshot.
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SnapshotError(f"{path} is empty")
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise SnapshotError(f"{path} is not a snapshot")
+        magic, version, self.blocks, self.count, self._index_offset = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise SnapshotError(f"{path} is not a snapshot of format version {VERSION}")
+        self._lock = threading.Lock()
+        self._block_cache = {}
+
+    def entry(self, block):
+        """
+        Reads an entry of the index.
+
+        Parameters:
+            block (int): The index of the block.
+
+        Returns:
+            tuple: The first and last date keys, the offset, the length and the number of events of the block.
+        """
+        return INDEX_ENTRY.unpack_from(self._map, self._index_offset + block * INDEX_ENTRY.size)
+
+    def read_block(self, block):
+        """
+        Decompresses a block. The last block read is kept, as consecutive pages mostly read the same one.
+
+        Parameters:
+            block (int): The index of the block.
+
+        Returns:
+            list: The events of the block in JSON format.
+        """
+        with self._lock:
+            events = self._block_cache.get(block)
+            if events is None:
+                _, _, offset, length, _ = self.entry(block)
+                events = json.loads(zlib.decompress(self._map[offset : offset + length]))
+                self._block_cache = {block: events}
+            return events
+
+    def query(self, start, end, offset=0, limit=None):
+        """
+        Returns a page of the events whose day falls between two days, both included.
+
+        Only the blocks holding the page and the two blocks at the ends of the range
+        are decompressed; the events of the other blocks are counted from the index.
+
+        Parameters:
+            start (datetime.date): The first day of the range.
+            end (datetime.date): The last day of the range.
+            offset (int): The number of matching events to skip.
+            limit (int)(optional): The maximum number of events returned, all of them if None.
+
+        Returns:
+            tuple: The number of matching events and the events of the page ordered by date.
+        """
+        low = date_key(start.isoformat())
+        high = date_key(end.isoformat() + "\x7f")  # After every time of the last day
+        first = bisect_left(_IndexColumn(self, 1), low)
+        last = bisect_right(_IndexColumn(self, 0), high)
+
+        count = 0
+        page = []
+        for block in range(first, last):
+            first_key, last_key, _, _, events = self.entry(block)
+            whole = first_key >= low and last_key <= high
+            wanted = limit is None or len(page) < limit
+            if whole and (not wanted or count + events <= offset):
+                count += events  # Counted from the index without decompressing
+                continue
+            for event in self.read_block(block):
+                if whole or low <= date_key(event["date"]) <= high:
+                    if count >= offset and (limit is None or len(page) < limit):
+                        page.append(event)
+                    count += 1
+        return count, page
+
+    def close(self):
+        """
+        Unmaps and closes the snapshot file.
+        """
+        self._map.close()
+        self._file.close()
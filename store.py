@@ -0,0 +1,93 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import timedelta
+from cache import CACHE_DIR
+
+
+class EventStore:
+    """
+    A local SQLite copy of the API `results` payloads, indexed on date, id and
+    last_updated so that date range queries can be answered without the network.
+    """
+
+    def __init__(self, path=None):
+        """
+        Parameters:
+            path (str)(optional): The SQLite database file. Defaults to events.sqlite in CACHE_DIR.
+        """
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "events.sqlite")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY,
+                date TEXT,
+                last_updated TEXT,
+                payload TEXT NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS events_date ON events (date)")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS events_last_updated ON events (last_updated)"
+        )
+        self._db.commit()
+
+    def upsert(self, results):
+        """
+        Inserts new events and replaces the stored copy of updated ones.
+
+        Parameters:
+            results (list): The events in JSON format.
+
+        Returns:
+            int: The number of events written.
+        """
+        rows = [
+            (event["id"], event.get("date"), event.get("last_updated"), json.dumps(event))
+            for event in results
+        ]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?)", rows)
+            self._db.commit()
+        return len(rows)
+
+    def high_water_mark(self):
+        """
+        Returns:
+            str: The most recent last_updated timestamp in the store, or None if it is empty.
+        """
+        with self._lock:
+            return self._db.execute("SELECT MAX(last_updated) FROM events").fetchone()[0]
+
+    def query(self, start, end):
+        """
+        Returns the stored events whose date falls between two days, both included.
+
+        Parameters:
+            start (datetime.date): The first day of the range.
+            end (datetime.date): The last day of the range.
+
+        Returns:
+            list: The events in JSON format ordered by date.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT payload FROM events WHERE date >= ? AND date < ? ORDER BY date, id",
+                (start.isoformat(), (end + timedelta(days=1)).isoformat()),
+            ).fetchall()
+        return [json.loads(payload) for payload, in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def close(self):
+        """
+        Closes the underlying database connection.
+        """
+        with self._lock:
+            self._db.close()
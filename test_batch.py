@@ -0,0 +1,47 @@
+from batch import *
+from datetime import date
+import pytest
+
+
+def test_parse_ranges():
+    lines = ["# windows\n", "01-01-2023 31-01-2023\n", "\n", "15-01-2023,15-02-2023"]
+    assert parse_ranges(lines) == [
+        (date(2023, 1, 1), date(2023, 1, 31)),
+        (date(2023, 1, 15), date(2023, 2, 15)),
+    ]
+
+
+def test_parse_ranges_reports_every_error():
+    with pytest.raises(ValueError) as error:
+        parse_ranges(["31-02-2023 01-03-2023", "01-01-2023 31-01-2023", "10-01-2023 01-01-2023", "01-01-2023"])
+    message = str(error.value)
+    assert "line 1" in message and "line 3" in message and "line 4" in message
+    assert "line 2" not in message
+
+
+def test_coalesce():
+    ranges = [
+        (date(2023, 3, 1), date(2023, 3, 10)),
+        (date(2023, 1, 1), date(2023, 1, 31)),
+        (date(2023, 1, 10), date(2023, 1, 20)),
+        (date(2023, 2, 1), date(2023, 2, 5)),
+        (date(2023, 3, 5), date(2023, 3, 20)),
+    ]
+    assert coalesce(ranges) == [
+        (date(2023, 1, 1), date(2023, 2, 5)),
+        (date(2023, 3, 1), date(2023, 3, 20)),
+    ]
+    assert coalesce([]) == []
+
+
+def test_fan_out():
+    events = [
+        {"id": 2, "date": "2023-01-20T23:59:00Z"},
+        {"id": 1, "date": "2023-01-01T00:00:00Z"},
+        {"id": 3, "date": "2023-01-21T00:00:00Z"},
+    ]
+    ranges = [(date(2023, 1, 1), date(2023, 1, 20)), (date(2023, 1, 20), date(2023, 1, 31))]
+    assert [[event["id"] for event in events] for events in fan_out(events, ranges)] == [
+        [1, 2],
+        [2, 3],
+    ]
@@ -0,0 +1,21 @@
+import json
+from benchmark import *
+
+
+def test_load_payload():
+    payload = load_payload(7)
+    assert payload["count"] == 7
+    assert [event["id"] for event in payload["results"]] == list(range(1, 8))
+
+
+def test_run_benchmarks(tmp_path):
+    results = run_benchmarks(sizes=[10], repeat=1)
+    for name in ("validate_date", "get_date", "get_events_url", "create_df[10]", "cli_loop[10]"):
+        assert results[name]["best_ms"] >= 0
+    json.dumps(results)
+
+
+def test_compare():
+    previous = {"a": {"best_ms": 10.0}, "b": {"best_ms": 10.0}}
+    results = {"a": {"best_ms": 11.0}, "b": {"best_ms": 15.0}, "c": {"best_ms": 1.0}}
+    assert compare(results, previous, 0.2) == [("b", 10.0, 15.0)]
@@ -0,0 +1,44 @@
+import time
+from cache import *
+
+
+def test_store_and_lookup(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), ttl=60)
+    assert cache.lookup("http://example.com/a") is None
+
+    cache.store("http://example.com/a", '{"count": 1}', etag='"v1"')
+    entry = cache.lookup("http://example.com/a")
+    assert entry.body == '{"count": 1}'
+    assert entry.etag == '"v1"'
+    assert is_fresh(entry)
+
+
+def test_ttl_and_refresh(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), ttl=60)
+    cache.store("http://example.com/a", "{}", last_modified="Mon, 01 Jan 2024", ttl=-1)
+    entry = cache.lookup("http://example.com/a")
+    assert not is_fresh(entry)
+    assert conditional_headers(entry) == {"If-Modified-Since": "Mon, 01 Jan 2024"}
+
+    cache.refresh("http://example.com/a")
+    assert is_fresh(cache.lookup("http://example.com/a"))
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), max_bytes=20)
+    cache.store("http://example.com/a", "a" * 8)
+    time.sleep(0.01)
+    cache.store("http://example.com/b", "b" * 8)
+    time.sleep(0.01)
+    cache.lookup("http://example.com/a")
+    time.sleep(0.01)
+    cache.store("http://example.com/c", "c" * 8)
+
+    assert cache.lookup("http://example.com/b") is None
+    assert cache.lookup("http://example.com/a") is not None
+    assert cache.lookup("http://example.com/c") is not None
+    assert cache.size() <= 20
+
+
+def test_conditional_headers_without_entry():
+    assert conditional_headers(None) == {}
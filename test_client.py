@@ -0,0 +1,96 @@
+import pytest
+import requests
+from client import *
+import client
+from unittest import mock
+
+
+def response(status, headers=None):
+    return mock.Mock(status_code=status, headers=headers or {})
+
+
+@pytest.fixture(autouse=True)
+def reset_throttle(monkeypatch):
+    monkeypatch.setattr(client, "_throttle_until", 0.0)
+    monkeypatch.setattr(client, "budget", client.TokenBucket())
+
+
+def test_get_session_is_shared():
+    assert get_session() is get_session()
+
+
+def test_backoff_delay():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt) <= BACKOFF_MAX
+
+
+def test_retry_after():
+    assert retry_after(response(429, {"Retry-After": "3"})) == 3.0
+    assert retry_after(response(429, {"Retry-After": "Mon, 01 Jan 2001 00:00:00 GMT"})) == 0.0
+    assert retry_after(response(429, {"Retry-After": "soon"})) is None
+    assert retry_after(response(429)) is None
+
+
+def test_throttle_delay():
+    assert throttle_delay(response(200)) == 0.0
+    assert throttle_delay(response(200, {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "60"})) == 0.0
+    assert throttle_delay(response(200, {"RateLimit-Remaining": "1", "RateLimit-Reset": "60"})) == 30.0
+
+
+@mock.patch("client.time.sleep")
+@mock.patch("client.get_session")
+def test_get_retries(mock_get_session, mock_sleep):
+    http = mock_get_session.return_value
+    http.get.side_effect = [
+        response(503),
+        requests.ConnectionError("reset"),
+        response(200),
+    ]
+    assert get("http://example.com").status_code == 200
+    assert http.get.call_count == 3
+    assert mock_sleep.call_count == 2
+
+
+@mock.patch("client.time.sleep")
+@mock.patch("client.get_session")
+def test_get_honors_retry_after(mock_get_session, mock_sleep):
+    http = mock_get_session.return_value
+    http.get.side_effect = [response(429, {"Retry-After": "5"}), response(200)]
+    assert get("http://example.com").status_code == 200
+    assert 4 < mock_sleep.call_args[0][0] <= 5
+
+
+@mock.patch("client.time.sleep")
+@mock.patch("client.get_session")
+def test_get_gives_up(mock_get_session, mock_sleep):
+    http = mock_get_session.return_value
+    http.get.side_effect = requests.ConnectionError("down")
+    with pytest.raises(ConnectionError, match="couldn't reach the API"):
+        get("http://example.com")
+    assert http.get.call_count == MAX_RETRIES + 1
+
+    http.get.side_effect = None
+    http.get.return_value = response(500)
+    assert get("http://example.com").status_code == 500
+
+
+def test_rate_limit():
+    headers = {"X-RateLimit-Limit": "15", "X-RateLimit-Remaining": "4", "X-RateLimit-Reset": "60"}
+    assert rate_limit(response(200, headers)) == (15, 4, 60.0)
+    assert rate_limit(response(200, {"RateLimit-Remaining": "1", "RateLimit-Reset": "5"})) == (None, 1, 5.0)
+    assert rate_limit(response(200)) is None
+
+
+@mock.patch("client.get_session")
+def test_get_spends_budget(mock_get_session):
+    from scheduler import PREFETCH, BudgetExhausted, priority
+
+    headers = {"X-RateLimit-Limit": "10", "X-RateLimit-Remaining": "2", "X-RateLimit-Reset": "3600"}
+    mock_get_session.return_value.get.return_value = response(200, headers)
+    get("http://example.com")
+    assert client.budget.remaining() == (2, 10)
+
+    # Prefetches leave the last requests of the quota to the foreground
+    with priority(PREFETCH), pytest.raises(BudgetExhausted):
+        get("http://example.com/?page=2")
+    assert mock_get_session.return_value.get.call_count == 1
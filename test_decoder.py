@@ -0,0 +1,64 @@
+import json
+import pytest
+from decoder import *
+
+page = {
+    "count": 12345,
+    "next": "http://example.com/?offset=10",
+    "previous": None,
+    "results": [
+        {"id": i, "name": f"Event {i} é", "launches": [{"id": "x", "n": [1, 2.5]}], "date": None}
+        for i in range(5)
+    ],
+}
+body = json.dumps(page)
+
+
+def chunked(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def decode(chunks, fields=None):
+    # Puts the results back into the page, like fetch_json
+    meta = {}
+    results = list(iter_results(chunks, meta, fields))
+    if "results" in meta:
+        meta["results"] = results
+    return meta
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64, len(body)])
+def test_any_chunking(size):
+    assert decode(chunked(body, size)) == page
+
+
+def test_bytes_split_inside_characters():
+    data = body.encode()
+    assert decode(chunked(data, 5)) == page
+
+
+def test_projection():
+    decoded = decode(chunked(body, 16), fields=("id", "name", "slug"))
+    assert decoded["count"] == 12345
+    assert decoded["results"][0] == {"id": 0, "name": "Event 0 é", "slug": None}
+
+
+def test_iter_results_is_incremental():
+    def chunks():
+        yield body[: body.index('{"id": 1')]
+        raise RuntimeError("more data requested")
+
+    meta = {}
+    results = iter_results(chunks(), meta)
+    assert next(results)["id"] == 0
+    assert meta["count"] == 12345
+
+
+def test_truncated_body():
+    with pytest.raises(IncompleteJSON):
+        decode([body[:-20]])
+
+
+def test_decode_object_without_results():
+    detail = {"id": 3, "name": "Event 3", "launches": []}
+    assert decode(chunked(json.dumps(detail), 4), fields=("id",)) == detail
@@ -0,0 +1,102 @@
+import pytest
+from events import *
+
+event_json = {
+    "id": 1,
+    "name": "Event 1",
+    "date": "2023-01-01T00:00:00Z",
+    "description": "Description of Event 1 " * 5,
+    "url": "http://example.com",
+    "location": "Location 1",
+    "webcast_live": True,
+    "launches": [{"id": "launch"}],
+}
+
+
+def test_from_json_keeps_displayed_fields():
+    event = Event.from_json(event_json)
+    assert event.id == 1
+    assert event.name == "Event 1"
+    assert event.slug is None
+    assert not hasattr(event, "launches")
+    assert event == Event(**{k: v for k, v in event_json.items() if k != "launches"})
+
+
+def test_row():
+    row = Event.from_json(event_json).row()
+    assert row[0] == 1
+    assert row[1 + STATIC_FIELDS.index("description")] == event_json["description"]
+
+
+def test_format_events():
+    table = format_events(parse_events([event_json, dict(event_json, id=2)]))
+    assert "name" in table[1]
+    assert "Event 1" in table[3]
+    assert table.headers == ["id"] + list(STATIC_FIELDS)
+
+
+def test_events_to_dataframe():
+    pytest.importorskip("pandas")
+    df = events_to_dataframe(parse_events([event_json]))
+    assert list(df.columns) == list(STATIC_FIELDS)
+    assert df.loc[1, "name"] == "Event 1"
+
+
+def test_stream_events():
+    table = stream_events(iter([dict(event_json, id=i) for i in range(25)]), batch_size=10)
+    assert table.wait_for_lines(float("inf"), timeout=5)
+    assert table.complete and table.error is None
+    assert len(table.rows) == 25
+    assert table[:] == format_events(parse_events([dict(event_json, id=i) for i in range(25)]))[:]
+
+    def broken():
+        yield event_json
+        raise ConnectionError("reset")
+
+    table = stream_events(broken())
+    table.wait_for_lines(float("inf"), timeout=5)
+    assert isinstance(table.error, ConnectionError)
+
+
+def test_update_events():
+    results = [dict(event_json, id=1, last_updated="a"), dict(event_json, id=2, last_updated="a")]
+    table = format_events(parse_events(results))
+    assert update_events(table, results) == ([], True)
+
+    changed = [results[0], dict(results[1], name="Event 2", last_updated="b")]
+    assert update_events(table, changed) == ([1], True)
+    assert "Event 2" in table[table.line_range(1).start]
+
+    # Partial updates only carry the events that may have changed
+    longer = dict(results[0], name="A much longer event name", last_updated="c")
+    assert update_events(table, [longer], partial=True) == ([0], False)
+    assert update_events(table, [dict(longer, id=3)], partial=True) is None
+    assert update_events(table, changed[::-1]) is None
+
+
+def test_description_width():
+    assert description_width(120) == DESCRIPTION_WIDTH
+    assert description_width(30) == MIN_DESCRIPTION_WIDTH
+    assert description_width(400) == MAX_DESCRIPTION_WIDTH
+
+
+def test_format_events_keeps_descriptions_unwrapped():
+    table = format_events(parse_events([event_json]))
+    assert table.rows[0][1 + STATIC_FIELDS.index("description")] == event_json["description"]
+    assert table.relayout({"description": 60})
+    assert table[:] == format_events(parse_events([event_json]), width=60)[:]
+
+
+def test_make_table_shows_row_columns():
+    table = format_events(parse_events([event_json]))
+    assert table.columns == list(ROW_COLUMNS)
+    assert "url" not in table[1].split() and "location" in table[1].split()
+    assert table.rows[0][1 + STATIC_FIELDS.index("url")] == "http://example.com"
+
+
+def test_format_detail():
+    lines = format_detail({"id": 1, "description": "word " * 20, "launches": [{"id": "launch"}]}, 40)
+    assert lines[0] == "         id: 1"
+    assert lines[1].startswith("description: word")
+    assert all(len(line) <= 40 for line in lines)
+    assert lines[-1] == '   launches: [{"id": "launch"}]'
@@ -0,0 +1,57 @@
+import io
+import json
+import pytest
+from export import *
+
+pages = [
+    [{"id": 1, "name": "Event 1", "date": "2023-01-01T00:00:00Z", "launches": []}],
+    [{"id": 2, "name": "Event\t2", "description": "a, b", "webcast_live": False}],
+]
+
+
+def test_write_jsonl():
+    out = io.StringIO()
+    assert write_pages(iter(pages), "jsonl", out) == 2
+    lines = out.getvalue().splitlines()
+    assert json.loads(lines[0])["name"] == "Event 1"
+    assert "launches" not in json.loads(lines[0])
+    assert json.loads(lines[1])["webcast_live"] is False
+
+
+@pytest.mark.parametrize("fmt, delimiter", [("csv", ","), ("tsv", "\t")])
+def test_write_delimited(fmt, delimiter):
+    out = io.StringIO()
+    write_pages(iter(pages), fmt, out)
+    rows = list(csv.reader(io.StringIO(out.getvalue()), delimiter=delimiter))
+    assert rows[0] == list(COLUMNS)
+    assert rows[2][1] == "Event\t2"
+    assert rows[2][3] == "a, b"
+    assert len(rows) == 3
+
+
+def test_write_pages_is_lazy():
+    def generate():
+        yield pages[0]
+        raise RuntimeError("second page requested")
+
+    out = io.StringIO()
+    with pytest.raises(RuntimeError):
+        write_pages(generate(), "jsonl", out)
+    assert "Event 1" in out.getvalue()
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        write_pages([], "xml", io.StringIO())
+
+
+def test_write_ranges():
+    from datetime import date
+
+    out = io.StringIO()
+    batches = [((date(2023, 1, 1), date(2023, 1, 31)), pages[0]), ((date(2023, 1, 1), date(2023, 1, 2)), pages[0])]
+    assert write_ranges(batches, "csv", out) == 2
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert rows[0] == list(RANGE_COLUMNS + COLUMNS)
+    assert rows[1][:3] == ["2023-01-01", "2023-01-31", "1"]
+    assert rows[2][:3] == ["2023-01-01", "2023-01-02", "1"]
@@ -0,0 +1,86 @@
+import pytest
+import client
+import project
+from fake_server import *
+from unittest import mock
+from datetime import date
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeSpaceDevsServer(events=250).start()
+    monkeypatch.setattr(project, "EVENT_BASE_URL", server.base_url)
+    # Patched before any request, so a throttle set by a rate-limited response is undone
+    monkeypatch.setattr(client, "_throttle_until", 0.0)
+    yield server
+    server.stop()
+
+
+def test_filter_events():
+    events = make_events(40, spacing=timedelta(days=1))
+    assert len(filter_events(events, {"date__gte": "2022-01-05", "date__lte": "2022-01-10"})) == 6
+    assert [e["id"] for e in filter_events(events, {"year": "2022", "month": "2", "day": "1"})] == [32]
+    ordered = filter_events(events, {"ordering": "-last_updated"})
+    assert ordered[0]["id"] == 40
+
+
+def test_pagination(server):
+    url = project.get_events_url("01-01-2022", "31-01-2022")
+    data = project.fetch_json(url)
+    # Every event of January, the last day included, 4 a day
+    assert data["count"] == 124
+    assert len(data["results"]) == DEFAULT_LIMIT
+    assert data["previous"] is None
+
+    pages = list(project.iter_pages(mock.Mock(
+        start_date="01-01-2022", end_date="31-01-2022", today=False, local=False, no_cache=True, offline=None, page_size=None
+    )))
+    assert sum(map(len, pages)) == 124
+
+
+def test_offline_and_store_match_online_range(server, tmp_path):
+    from snapshot import Snapshot, write_snapshot
+    from store import EventStore
+
+    start, end = date(2022, 1, 1), date(2022, 1, 31)
+    online = project.fetch_json(project.get_events_url("01-01-2022", "31-01-2022"))["count"]
+    write_snapshot(server.events, str(tmp_path / "events.snap"))
+    snapshot = Snapshot(str(tmp_path / "events.snap"))
+    offline = snapshot.query(start, end)[0]
+    snapshot.close()
+    store = EventStore(str(tmp_path / "events.sqlite"))
+    store.upsert(server.events)
+    assert online == offline == len(store.query(start, end))
+
+
+def test_fetch_all_pages(server):
+    url = project.get_events_url("01-01-2022", "31-03-2022")
+    data = project.fetch_all_pages(url, concurrency=4, page_size=20)
+    assert [e["id"] for e in data["results"]] == list(range(1, 251))
+    assert server.requests == 13
+
+
+def test_detail_endpoint(server):
+    assert project.fetch_json(server.base_url + "3/")["id"] == 3
+
+
+@mock.patch("client.time.sleep")
+def test_fault_injection(mock_sleep, server):
+    server.error_rate = 1.0
+    with pytest.raises(ConnectionError):
+        project.fetch_json(server.base_url)
+    assert server.requests == client.MAX_RETRIES + 1
+
+
+def test_rate_limit_headers(server, monkeypatch):
+    server.rate_limit = 2
+    monkeypatch.setattr(client, "budget", client.TokenBucket())
+    response = client.get(server.base_url)
+    assert response.headers["X-RateLimit-Remaining"] == "1"
+    # The client now spaces out requests to make the last one last the window
+    assert client._throttle_until > time.monotonic() + 1000
+    assert client.budget.remaining() == (1, 2)
+
+    server.respond(EVENT_PATH)
+    status, headers, _ = server.respond(EVENT_PATH)
+    assert status == 429 and "Retry-After" in headers
@@ -0,0 +1,46 @@
+from page_cache import *
+
+
+def test_get_and_put():
+    pages = PageCache(max_pages=2)
+    assert pages.get("a") is None
+    pages.put("a", (1, None, None, ["a"]))
+    assert pages.get("a") == (1, None, None, ["a"])
+    assert "a" in pages
+
+
+def test_lru_eviction():
+    pages = PageCache(max_pages=2)
+    pages.put("a", 1)
+    pages.put("b", 2)
+    pages.get("a")
+    pages.put("c", 3)
+    assert "b" not in pages
+    assert pages.get("a") == 1
+    assert pages.get("c") == 3
+    assert len(pages) == 2
+
+
+def test_on_evict():
+    evicted = []
+    pages = PageCache(max_pages=1, on_evict=lambda url, page: evicted.append((url, page)))
+    pages.put("a", 1)
+    pages.put("a", 2)
+    pages.put("b", 3)
+    assert evicted == [("a", 2)]
+
+
+def test_discard():
+    evicted = []
+    pages = PageCache(on_evict=lambda url, page: evicted.append(url))
+    pages.put("a", 1)
+    pages.discard("a")
+    pages.discard("b")
+    assert "a" not in pages
+    assert evicted == ["a"]
+
+
+def test_first_page_key():
+    pages = PageCache()
+    pages.put(None, "first")
+    assert pages.get(None) == "first"
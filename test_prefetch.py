@@ -0,0 +1,127 @@
+import threading
+import time
+from unittest import mock
+from prefetch import *
+
+pages = {
+    "page1": (30, "page2", None, ["page 1"]),
+    "page2": (30, "page3", "page1", ["page 2"]),
+    "page3": (30, None, "page2", ["page 3"]),
+}
+
+
+def wait_for_page(prefetcher, url, timeout=5):
+    deadline = time.monotonic() + timeout
+    while prefetcher.peek(url) is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return prefetcher.peek(url)
+
+
+def test_prefetched_page():
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        return pages[url]
+
+    prefetcher = Prefetcher(fetch, depth=1)
+    prefetcher.schedule("page2", None)
+    assert wait_for_page(prefetcher, "page2") == pages["page2"]
+    assert prefetcher.peek("page3") is None
+    assert fetched == ["page2"]
+    prefetcher.shutdown()
+
+
+def test_depth_follows_next_links():
+    done = threading.Event()
+
+    def fetch(url):
+        if url == "page3":
+            done.set()
+        return pages[url]
+
+    prefetcher = Prefetcher(fetch, depth=2)
+    prefetcher.schedule("page2", None)
+    assert done.wait(timeout=5)
+    assert wait_for_page(prefetcher, "page3") == pages["page3"]
+    prefetcher.shutdown()
+
+
+def test_unneeded_prefetch_is_cancelled():
+    release = threading.Event()
+
+    def fetch(url):
+        release.wait(timeout=5)
+        return pages[url]
+
+    prefetcher = Prefetcher(fetch, depth=1, max_workers=1)
+    prefetcher.schedule("page2", "page1")
+    prefetcher.schedule("page3", None)
+    release.set()
+    assert wait_for_page(prefetcher, "page3") == pages["page3"]
+    assert prefetcher.peek("page1") is None
+    prefetcher.shutdown()
+
+
+def test_failed_prefetch_returns_none():
+    fetched = threading.Event()
+
+    def fetch(url):
+        fetched.set()
+        raise ConnectionError("Error : couldn't get the data")
+
+    prefetcher = Prefetcher(fetch, depth=1)
+    prefetcher.schedule("page2", None)
+    assert fetched.wait(timeout=5)
+    assert wait_for_page(prefetcher, "page2", timeout=0.1) is None
+    prefetcher.shutdown()
+
+
+def test_peek_only_returns_finished_prefetches():
+    release = threading.Event()
+
+    def fetch(url):
+        release.wait(timeout=5)
+        return pages[url]
+
+    prefetcher = Prefetcher(fetch, depth=1)
+    prefetcher.schedule("page2", None)
+    assert prefetcher.peek("page2") is None
+    release.set()
+    assert wait_for_page(prefetcher, "page2") == pages["page2"]
+    assert prefetcher.peek("page3") is None
+    prefetcher.shutdown()
+
+
+def test_loaded_pages_are_not_prefetched():
+    done = threading.Event()
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        done.set()
+        return pages[url]
+
+    # page2 is already loaded, page1 beyond it is fetched
+    prefetcher = Prefetcher(fetch, depth=2, pages={"page2": pages["page2"]})
+    prefetcher.schedule(None, "page2")
+    assert done.wait(timeout=5)
+    prefetcher.shutdown()
+    assert fetched == ["page1"]
+
+
+def test_failed_stream_is_prefetched_again():
+    done = threading.Event()
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        done.set()
+        return pages[url]
+
+    failed = mock.Mock(error=ConnectionError("Error : couldn't get the data"))
+    prefetcher = Prefetcher(fetch, depth=1, pages={"page2": (30, "page3", "page1", failed)})
+    prefetcher.schedule("page2", None)
+    assert done.wait(timeout=5)
+    prefetcher.shutdown()
+    assert fetched == ["page2"]
@@ -1,20 +1,47 @@
 from project import *
 from datetime import datetime, timedelta, UTC
 import pytest
+import textwrap
+import threading
+import time
 import warnings
 from unittest import mock
 
 
+def json_response(body, status=200, headers=None):
+    """
+    Builds a mock streamed response whose body arrives in small gzip-decoded chunks.
+    """
+    data = json.dumps(body).encode()
+    return mock.Mock(
+        status_code=status,
+        headers=headers or {},
+        **{"iter_content.return_value": [data[i : i + 7] for i in range(0, len(data), 7)]},
+    )
+
+
 @mock.patch("project.get_args")
 @mock.patch("project.check_args")
 @mock.patch("project.get_table_data")
 @mock.patch("curses.curs_set")
-@mock.patch("curses.newwin")
+@mock.patch("curses.newpad")
+@mock.patch("curses.doupdate")
 def test_cli_loop(
-    mock_newwin, mock_curs_set, mock_get_table_data, mock_check_args, mock_get_args
+    mock_doupdate,
+    mock_newpad,
+    mock_curs_set,
+    mock_get_table_data,
+    mock_check_args,
+    mock_get_args,
 ):
     mock_get_args.return_value = mock.Mock(
-        start_date="01-01-2023", end_date="31-01-2023", today=False
+        start_date="01-01-2023",
+        end_date="31-01-2023",
+        today=False,
+        prefetch_depth=0,
+        watch=None,
+        local=False,
+        page_cache=50,
     )
     mock_check_args.return_value = None
     mock_get_table_data.return_value = (1, None, None, ["name", "Event 1"])
@@ -24,8 +51,9 @@ def test_cli_loop(
     mock_stdscr_instance.getch.side_effect = [ord("q")]
     mock_stdscr_instance.clear.return_value = mock.Mock()
 
-    mock_window_instance = mock.Mock()
-    mock_newwin.return_value = mock_window_instance
+    mock_pad_instance = mock.Mock()
+    mock_pad_instance.getmaxyx.return_value = (17, 86)
+    mock_newpad.return_value = mock_pad_instance
 
     # Simulate a global stdscr
     global stdscr
@@ -51,10 +79,468 @@ def test_cli_loop(
         4, 0, " Press 'n' or 'p' to go 'next page' or previous page'"
     )
 
-    mock_window_instance.resize.assert_called_once_with(17, 79)
-    mock_window_instance.clear.assert_called_once()
-    mock_stdscr_instance.refresh.assert_called()
-    mock_window_instance.refresh.assert_called()
+    mock_newpad.assert_called_once_with(17, 86)
+    mock_pad_instance.addstr.assert_any_call(1, 0, "Event 1")
+    mock_pad_instance.noutrefresh.assert_called_once_with(0, 0, 5, 0, 21, 78)
+    mock_stdscr_instance.noutrefresh.assert_called_once()
+    mock_doupdate.assert_called_once()
+
+
+@mock.patch("curses.curs_set")
+@mock.patch("curses.newpad")
+@mock.patch("curses.doupdate")
+def test_cli_loop_scrolls_pad(mock_doupdate, mock_newpad, mock_curs_set):
+    args = mock.Mock(prefetch_depth=0, local=False, page_cache=50, watch=None)
+    table_lines = [f"line {i}" for i in range(40)]
+    mock_newpad.return_value.getmaxyx.return_value = (40, 86)
+    mock_stdscr_instance = mock.Mock()
+    mock_stdscr_instance.getmaxyx.return_value = (24, 80)
+    mock_stdscr_instance.getch.side_effect = [curses.KEY_DOWN, curses.KEY_DOWN, ord("q")]
+
+    with mock.patch("project.get_table_data", return_value=(1, None, None, table_lines)):
+        cli_loop(mock_stdscr_instance, args)
+
+    # The table is painted once, scrolling only moves the pad viewport
+    mock_newpad.assert_called_once()
+    assert mock_newpad.return_value.noutrefresh.call_args_list[-1] == mock.call(
+        2, 0, 5, 0, 21, 78
+    )
+    mock_stdscr_instance.clear.assert_called_once()
+    assert mock_doupdate.call_count == 3
+
+
+@mock.patch("curses.curs_set")
+@mock.patch("curses.newpad")
+@mock.patch("curses.doupdate")
+def test_cli_loop_default_page_size(mock_doupdate, mock_newpad, mock_curs_set):
+    args = mock.Mock(
+        prefetch_depth=0, local=False, all_pages=False, offline=None, page_cache=50, watch=None,
+        start_date="01-01-2023", end_date="31-01-2023", today=False, page_size=None,
+    )
+    mock_newpad.return_value.getmaxyx.return_value = (17, 86)
+    mock_stdscr_instance = mock.Mock()
+    mock_stdscr_instance.getmaxyx.return_value = (47, 80)
+    mock_stdscr_instance.getch.side_effect = [ord("q")]
+
+    with mock.patch(
+        "project.get_table_data", return_value=(1, None, None, ["page 1"])
+    ) as mock_get_table_data:
+        cli_loop(mock_stdscr_instance, args)
+
+    # Three screens of 20 two-line rows, without changing the page size of --all and exports
+    assert page_offset(mock_get_table_data.call_args.kwargs["url"]) == (60, 0)
+    assert args.page_size is None
+
+
+@mock.patch("curses.curs_set")
+@mock.patch("curses.newpad")
+@mock.patch("curses.doupdate")
+def test_cli_loop_navigation_history(mock_doupdate, mock_newpad, mock_curs_set):
+    args = mock.Mock(prefetch_depth=0, local=False, page_cache=50, watch=None)
+    pages = {
+        None: (3, "page2", None, ["page 1"]),
+        "page2": (3, "page3", "page1", ["page 2"]),
+        "page3": (3, None, "page2", ["page 3"]),
+    }
+    mock_newpad.return_value.getmaxyx.return_value = (17, 86)
+    mock_stdscr_instance = mock.Mock()
+    mock_stdscr_instance.getmaxyx.return_value = (24, 80)
+    keys = "nnnppnn" + "q"
+    mock_stdscr_instance.getch.side_effect = [ord(key) for key in keys]
+
+    with mock.patch(
+        "project.get_table_data", side_effect=lambda args, url=None, **kwargs: pages[url]
+    ) as mock_get_table_data:
+        cli_loop(mock_stdscr_instance, args)
+
+    # Every page is fetched once, revisits come from the page cache
+    fetched = [c.kwargs["url"] for c in mock_get_table_data.call_args_list]
+    assert fetched == [None, "page2", "page3"]
+
+
+@mock.patch("curses.curs_set")
+@mock.patch("curses.newpad")
+@mock.patch("curses.doupdate")
+def test_cli_loop_back_to_first_page(mock_doupdate, mock_newpad, mock_curs_set):
+    args = mock.Mock(
+        prefetch_depth=0, local=False, all_pages=False, offline=None, page_cache=50, watch=None,
+        start_date="01-01-2023", end_date="31-01-2023", today=False, page_size=10,
+    )
+    first = get_events_url("01-01-2023", "31-01-2023", page_size=10)
+
+    def get_table_data(args, url=None, **kwargs):
+        return (30, shift_page(url, 1, 30), shift_page(url, -1, 30), [f"page {url}"])
+
+    mock_newpad.return_value.getmaxyx.return_value = (17, 86)
+    mock_stdscr_instance = mock.Mock()
+    mock_stdscr_instance.getmaxyx.return_value = (24, 80)
+    keys = iter("np")
+
+    def getch():
+        time.sleep(0.01)  # Lets the page load before the next key
+        return ord(next(keys, "q"))
+
+    mock_stdscr_instance.getch.side_effect = getch
+    with mock.patch("project.get_table_data", side_effect=get_table_data) as mock_get_table_data:
+        cli_loop(mock_stdscr_instance, args)
+
+    # The previous link of page 2 is the URL the first page was cached under
+    fetched = [c.kwargs["url"] for c in mock_get_table_data.call_args_list]
+    assert fetched == [first, page_at(first, 10)]
+    shown = [c.args[2] for c in mock_newpad.return_value.addstr.call_args_list]
+    assert shown[-1] == f"page {first}"
+
+
+@mock.patch("curses.curs_set")
+@mock.patch("curses.newpad")
+@mock.patch("curses.doupdate")
+def test_cli_loop_keeps_page_when_load_fails(mock_doupdate, mock_newpad, mock_curs_set):
+    args = mock.Mock(prefetch_depth=0, local=False, page_cache=50, watch=None, offline=None)
+
+    def get_table_data(args, url=None, **kwargs):
+        if url == "page2":
+            raise ConnectionError("Error : couldn't get the data")
+        return (20, "page2", None, ["page 1"])
+
+    mock_newpad.return_value.getmaxyx.return_value = (17, 86)
+    mock_stdscr_instance = mock.Mock()
+    mock_stdscr_instance.getmaxyx.return_value = (24, 80)
+    keys = iter("n")
+
+    def getch():
+        time.sleep(0.01)  # Lets the page load before the next key
+        return ord(next(keys, "q"))
+
+    mock_stdscr_instance.getch.side_effect = getch
+    with mock.patch("project.get_table_data", side_effect=get_table_data):
+        cli_loop(mock_stdscr_instance, args)
+
+    shown = [c.args[2] for c in mock_newpad.return_value.addstr.call_args_list]
+    assert shown[-1] == "page 1"
+    status = mock_stdscr_instance.addstr.call_args_list[-1].args[2]
+    assert status.startswith(" Error : couldn't get the data")
+
+
+@mock.patch("curses.curs_set")
+@mock.patch("curses.newpad")
+@mock.patch("curses.doupdate")
+def test_cli_loop_collapses_repeated_paging(mock_doupdate, mock_newpad, mock_curs_set):
+    args = mock.Mock(prefetch_depth=0, local=False, page_cache=50, watch=None)
+    base = "http://example.com/event/?limit=10"
+    release = threading.Event()
+
+    def get_table_data(args, url=None, **kwargs):
+        if url == base + "&offset=10":
+            release.wait(5)  # A slow page
+        return (50, shift_page(url or base, 1, 50), None, [f"page {url}"])
+
+    mock_newpad.return_value.getmaxyx.return_value = (17, 86)
+    mock_stdscr_instance = mock.Mock()
+    mock_stdscr_instance.getmaxyx.return_value = (24, 80)
+    keys = iter([ord("n")] * 3)
+
+    def getch():
+        key = next(keys, None)
+        if key is not None:
+            return key
+        release.set()
+        time.sleep(0.01)
+        shown = [c.args[2] for c in mock_newpad.return_value.addstr.call_args_list]
+        return ord("q") if f"page {base}&offset=30" in shown else -1
+
+    mock_stdscr_instance.getch.side_effect = getch
+    with mock.patch("project.get_table_data", side_effect=get_table_data) as mock_get_table_data:
+        cli_loop(mock_stdscr_instance, args)
+
+    # Keys are read while the page loads, and the page in between is never fetched
+    fetched = [c.kwargs["url"] for c in mock_get_table_data.call_args_list]
+    assert fetched == [None, base + "&offset=10", base + "&offset=30"]
+    assert any("Loading page" in c.args[2] for c in mock_stdscr_instance.addstr.call_args_list)
+
+
+@mock.patch("curses.curs_set")
+@mock.patch("curses.newpad")
+@mock.patch("curses.doupdate")
+def test_cli_loop_detail_pane(mock_doupdate, mock_newpad, mock_curs_set):
+    args = mock.Mock(prefetch_depth=0, local=False, page_cache=50, watch=None, offline=None)
+    results = [{"id": i, "name": f"Event {i}", "news_url": f"http://news/{i}"} for i in (1, 2)]
+    table = create_df({"count": 2, "next": None, "previous": None, "results": results})[3]
+    detail = dict(results[0], launches=[{"id": "launch-1"}])
+    mock_newpad.return_value.getmaxyx.return_value = (100, 200)
+    mock_stdscr_instance = mock.Mock()
+    mock_stdscr_instance.getmaxyx.return_value = (24, 80)
+    painted = []
+    mock_newpad.return_value.addstr.side_effect = lambda y, x, line, *attr: painted.append(line)
+    keys = iter([10, 27, 10, 27, ord("q")])
+
+    def getch():
+        # Waits for the details before going on
+        if painted and "Loading the details..." in painted[-1]:
+            time.sleep(0.01)
+            return -1
+        return next(keys)
+
+    mock_stdscr_instance.getch.side_effect = getch
+    with mock.patch("project.get_table_data", return_value=(2, None, None, table)), mock.patch(
+        "project.fetch_json", return_value=detail
+    ) as mock_fetch_json:
+        cli_loop(mock_stdscr_instance, args)
+
+    # The slim table hides news_url, the pane shows the full record fetched once
+    assert not any("http://news/1" in line for line in table[:])
+    assert any("http://news/1" in line for line in painted)
+    assert any('[{"id": "launch-1"}]' in line for line in painted)
+    mock_fetch_json.assert_called_once_with(EVENT_BASE_URL + "1/", cache=mock.ANY, fields=None)
+    assert painted[-1] == table[-1]
+
+
+@mock.patch("curses.curs_set")
+@mock.patch("curses.newpad")
+@mock.patch("curses.doupdate")
+def test_cli_loop_marks_selected_row(mock_doupdate, mock_newpad, mock_curs_set):
+    args = mock.Mock(prefetch_depth=0, local=False, page_cache=50, watch=None, offline=None)
+    results = [{"id": i, "name": f"Event {i}"} for i in range(1, 13)]
+    table = create_df({"count": 12, "next": None, "previous": None, "results": results})[3]
+    mock_newpad.return_value.getmaxyx.return_value = (100, 200)
+    mock_stdscr_instance = mock.Mock()
+    mock_stdscr_instance.getmaxyx.return_value = (24, 80)
+    bold = []
+    mock_newpad.return_value.addstr.side_effect = lambda y, x, line, attr=0: bold.append(
+        (line, bool(attr & curses.A_BOLD))
+    )
+    # Scrolls the first row out of view, opens the selected event and quits
+    scroll = [curses.KEY_DOWN] * table.line_range(0).stop
+    mock_stdscr_instance.getch.side_effect = scroll + [10, ord("q")]
+
+    with mock.patch("project.get_table_data", return_value=(12, None, None, table)), mock.patch(
+        "project.fetch_json", return_value=results[1]
+    ) as mock_fetch_json:
+        cli_loop(mock_stdscr_instance, args)
+
+    first, second = (table[table.line_range(row).start] for row in (0, 1))
+    assert (first, True) in bold and (second, False) in bold
+    # Only the rows leaving and entering the selection are drawn again
+    assert bold.count((first, False)) == 1 and (second, True) in bold
+    mock_fetch_json.assert_called_once_with(EVENT_BASE_URL + "2/", cache=mock.ANY, fields=None)
+
+
+@mock.patch("curses.curs_set")
+@mock.patch("curses.newpad")
+@mock.patch("curses.doupdate")
+def test_cli_loop_search_and_filter(mock_doupdate, mock_newpad, mock_curs_set):
+    args = mock.Mock(prefetch_depth=0, local=False, page_cache=50, watch=None)
+    table = TableView(
+        ["id", "name", "description", "location"],
+        [(i, f"Event {i}", "Docking" if i % 10 == 0 else "Launch", None) for i in range(30)],
+    )
+    mock_newpad.return_value.getmaxyx.return_value = (100, 86)
+    mock_stdscr_instance = mock.Mock()
+    mock_stdscr_instance.getmaxyx.return_value = (24, 80)
+    keys = [ord(key) for key in "/dock"] + [10, ord("]"), ord("]"), ord("[")]
+    keys += [ord(key) for key in "fdock"] + [27, ord("q")]
+    mock_stdscr_instance.getch.side_effect = keys
+    offsets = []
+    mock_newpad.return_value.noutrefresh.side_effect = lambda *a: offsets.append(a[0])
+
+    with mock.patch("project.get_table_data", return_value=(30, None, None, table)):
+        cli_loop(mock_stdscr_instance, args)
+
+    # Typing jumps to the first match, ']' and '[' move between the matches
+    matches = [table.line_range(row).start for row in (0, 10, 20)]
+    assert offsets[:7] == [0, 0] + [matches[0]] * 5
+    assert offsets[7:10] == matches[1:] + matches[1:2]
+    # Matching rows are highlighted
+    mock_newpad.return_value.addstr.assert_any_call(matches[1], 0, table[matches[1]], curses.A_REVERSE)
+    # The filter shows only the matching events, Esc brings back the page
+    mock_stdscr_instance.addstr.assert_any_call(
+        22, 0, "Filter: dock_   3 matching events in the loaded pages   Enter to keep, Esc to clear"[:79]
+    )
+    filtered = TableView(table.headers, [table.rows[row] for row in (0, 10, 20)])
+    mock_newpad.return_value.addstr.assert_any_call(7, 0, filtered[7])
+    assert "Event 20" in filtered[7]
+    assert offsets[-1] == matches[1]
+
+
+@mock.patch("curses.curs_set")
+@mock.patch("curses.newpad")
+@mock.patch("curses.doupdate")
+def test_cli_loop_relayouts_on_resize(mock_doupdate, mock_newpad, mock_curs_set):
+    args = mock.Mock(prefetch_depth=0, local=False, page_cache=50, watch=None)
+    results = [{"id": 1, "name": "Event 1", "description": "word " * 60}]
+    table = create_df({"count": 1, "next": None, "previous": None, "results": results})[3]
+    mock_newpad.return_value.getmaxyx.return_value = (100, 400)
+    mock_stdscr_instance = mock.Mock()
+    size = [(24, 90)]
+    mock_stdscr_instance.getmaxyx.side_effect = lambda: size[-1]
+    mock_stdscr_instance.getch.side_effect = lambda: size.append((24, 180)) or (ord("q") if len(size) > 2 else -1)
+
+    with mock.patch(
+        "project.get_table_data", return_value=(1, None, None, table)
+    ) as mock_get_table_data:
+        cli_loop(mock_stdscr_instance, args)
+
+    # The page is wrapped again for the wider terminal without being fetched again
+    mock_get_table_data.assert_called_once()
+    assert table.wrap == {"description": 60}
+    assert table.heights == [len(textwrap.wrap(results[0]["description"], 60))]
+    assert mock_newpad.call_count == 2
+
+
+@mock.patch("curses.curs_set")
+@mock.patch("curses.newpad")
+@mock.patch("curses.doupdate")
+def test_cli_loop_watch_repaints_changed_rows(mock_doupdate, mock_newpad, mock_curs_set):
+    args = mock.Mock(prefetch_depth=0, local=False, page_cache=50, watch=0.01)
+    results = [
+        {"id": i, "name": f"Event {i}", "last_updated": "2023-01-01T00:00:00Z"} for i in range(3)
+    ]
+    table = create_df({"count": 3, "next": None, "previous": None, "results": results})[3]
+    updated = dict(results[1], name="Event 9", last_updated="2023-01-02T00:00:00Z")
+    mock_newpad.return_value.getmaxyx.return_value = (100, 200)
+    mock_stdscr_instance = mock.Mock()
+    mock_stdscr_instance.getmaxyx.return_value = (24, 80)
+    polled = threading.Event()
+    keys = iter([-1] * 50)
+
+    def getch():
+        # Keeps timing out until the poll result has been applied
+        if polled.is_set() and "Event 9" in table[table.line_range(1).start]:
+            return ord("q")
+        time.sleep(0.01)
+        return next(keys, ord("q"))
+
+    def poll(args, url, lines):
+        polled.set()
+        return {"count": 1, "next": None, "previous": None, "results": [updated]}, True
+
+    mock_stdscr_instance.getch.side_effect = getch
+    with mock.patch("project.get_table_data", return_value=(3, None, None, table)), mock.patch(
+        "project.poll_page", side_effect=poll
+    ):
+        cli_loop(mock_stdscr_instance, args)
+
+    # The pad is painted once, then only the changed row is drawn again
+    mock_newpad.assert_called_once()
+    row_line = table.line_range(1).start
+    mock_newpad.return_value.addstr.assert_any_call(row_line, 0, table[row_line], curses.A_NORMAL)
+    # Keys are read with a timeout ending at the next poll
+    assert 1 <= mock_stdscr_instance.timeout.call_args_list[0].args[0] <= 10
+
+
+def test_changes_url():
+    url = "http://example.com/event/?date__gte=2023-01-01&limit=10&offset=20"
+    assert changes_url(url, "2023-01-02T00:00:00Z") == (
+        "http://example.com/event/?date__gte=2023-01-01"
+        "&last_updated__gte=2023-01-02T00%3A00%3A00Z&limit=100"
+    )
+
+
+@mock.patch("project.fetch_json")
+def test_poll_page(mock_fetch_json, tmp_path):
+    args = mock.Mock(start_date="01-01-2023", end_date="31-01-2023", today=False, no_cache=False)
+    results = [
+        {"id": 1, "name": "A", "date": "2023-01-10T00:00:00Z", "last_updated": "2023-01-01T00:00:00Z"},
+        {"id": 2, "name": "B", "date": "2023-01-12T00:00:00Z", "last_updated": "2023-01-05T00:00:00Z"},
+    ]
+    table = create_df({"count": 6, "next": None, "previous": None, "results": results})[3]
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), ttl=60)
+    url = "http://example.com/event/?date__gte=2023-01-01&limit=2&offset=2"
+    changes = {"count": 1, "next": None, "previous": None, "results": results[1:]}
+
+    with mock.patch("project.get_cache", return_value=cache):
+        # Without validators, only the events updated since the newest one are asked for
+        mock_fetch_json.return_value = changes
+        assert poll_page(args, url, table) == (changes, True)
+        assert "last_updated__gte=2023-01-05" in mock_fetch_json.call_args[0][0]
+
+        # Updated events of other pages are left out
+        other = dict(results[1], id=3, date="2023-01-20T00:00:00Z")
+        mock_fetch_json.return_value = dict(changes, count=2, results=[results[1], other])
+        assert poll_page(args, url, table) == (changes, True)
+
+        # Updates moving an event into the dates of the page need the whole page
+        moved = dict(other, date="2023-01-11T00:00:00Z")
+        mock_fetch_json.side_effect = [dict(changes, results=[moved]), "page"]
+        assert poll_page(args, url, table) == ("page", False)
+        mock_fetch_json.assert_called_with(url, cache, revalidate=True)
+
+        # With a validator, the page is revalidated with a conditional request
+        mock_fetch_json.side_effect = None
+        mock_fetch_json.return_value = "page"
+        cache.store(url, "{}", etag='"abc"')
+        assert poll_page(args, url, table) == ("page", False)
+        mock_fetch_json.assert_called_with(url, cache, revalidate=True)
+
+
+def test_page_dates():
+    results = [{"id": i, "date": f"2023-01-1{i}T00:00:00Z"} for i in (1, 2)]
+    table = create_df({"count": 2, "next": None, "previous": None, "results": results})[3]
+    url = "http://example.com/event/?limit=2"
+    # The first page is open-ended before its first event, a short last page after its last
+    assert page_dates(url, table) == ("", "2023-01-12T00:00:00Z")
+    assert page_dates(url + "&offset=2", table) == ("2023-01-11T00:00:00Z", "2023-01-12T00:00:00Z")
+    assert page_dates("http://example.com/event/?limit=3&offset=3", table) == (
+        "2023-01-11T00:00:00Z", "\uffff"
+    )
+
+
+def test_refresh_page():
+    results = [{"id": i, "name": f"Event {i}", "last_updated": "a"} for i in range(3)]
+    data = {"count": 3, "next": None, "previous": None, "results": results}
+    page = create_df(data)
+
+    assert refresh_page(page, data) == (page, [])
+    changed = dict(data, results=[results[0], dict(results[1], last_updated="b"), results[2]])
+    assert refresh_page(page, changed) == (page, [1])
+
+    moved = dict(data, count=2, results=results[1:])
+    new_page, patched = refresh_page(page, moved)
+    assert patched is None and new_page[0] == 2 and new_page[3] is not page[3]
+
+    # Links are put in the canonical form of the page cache keys
+    linked = dict(data, next="http://example.com/event/?offset=10&limit=10",
+                  previous="http://example.com/event/?offset=0&limit=10")
+    for result in (data, moved):
+        (count, next, previous, _), _ = refresh_page(page, dict(linked, results=result["results"]))
+        assert next == "http://example.com/event/?limit=10&offset=10"
+        assert previous == "http://example.com/event/?limit=10"
+
+
+def test_request_page():
+    pages = PageCache(max_pages=1)
+    with mock.patch("project.get_table_data", return_value="page") as mock_get_table_data:
+        assert request_page(mock.Mock(), "url", pages).result(timeout=5) == "page"
+        assert request_page(mock.Mock(), "url", pages).result(timeout=5) == "page"
+        mock_get_table_data.assert_called_once()
+
+    prefetcher = mock.Mock(**{"peek.return_value": "prefetched"})
+    assert request_page(mock.Mock(), "other", pages, prefetcher).result() == "prefetched"
+    assert "url" not in pages
+
+
+def test_request_page_fetches_failed_stream_again():
+    evicted = []
+    pages = PageCache(on_evict=lambda url, page: evicted.append(url))
+    table = TableView(["id"], [(1,)], complete=False)
+    with mock.patch("project.get_table_data", return_value=(2, None, None, table)) as mock_get_table_data:
+        assert request_page(mock.Mock(), "url", pages).result(timeout=5)[3] is table
+        table.fail(ConnectionError("Error : couldn't get the data"))
+        request_page(mock.Mock(), "url", pages).result(timeout=5)
+    assert mock_get_table_data.call_count == 2
+    assert evicted == ["url"]
+
+
+def test_shift_page():
+    url = "http://example.com/event/?date__gte=2023-01-01&limit=10&offset=10"
+    assert page_offset(url) == (10, 10)
+    assert shift_page(url, 2, 50) == "http://example.com/event/?date__gte=2023-01-01&limit=10&offset=30"
+    assert shift_page(url, -1, 50) == "http://example.com/event/?date__gte=2023-01-01&limit=10"
+    assert shift_page(url, -2, 50) is None
+    assert shift_page(url, 4, 50) is None
+    assert shift_page("http://example.com/event/?date__gte=2023-01-01", 1, 50) is None
+    assert shift_page("http://example.com/event/?day=1&limit=10&year=2023", 1, 50) == (
+        "http://example.com/event/?day=1&limit=10&offset=10&year=2023"
+    )
 
 
 def test_get_events_url():
@@ -63,46 +549,66 @@ def test_get_events_url():
     # Test case 1: Test with specific start and end dates
     start_date = "01-01-2023"
     end_date = "31-01-2023"
-    expected_url = "https://lldev.thespacedevs.com/2.2.0/event/?date__gte=2023-01-01&date__lte=2023-01-31"
+    expected_url = "https://lldev.thespacedevs.com/2.2.0/event/?date__gte=2023-01-01&date__lt=2023-02-01"
     assert get_events_url(start_date, end_date) == expected_url
 
     # Test case 2: Test with today's date
-    today = datetime.now(UTC).strftime("%d-%m-%Y")
-    expected_today_url = f"https://lldev.thespacedevs.com/2.2.0/event/?day={today.split('-')[0]}&month={today.split('-')[1][1]}&year={today.split('-')[2]}"
+    today = datetime.now(UTC)
+    expected_today_url = f"https://lldev.thespacedevs.com/2.2.0/event/?day={today.day}&month={today.month}&year={today.year}"
     assert get_events_url(None, None, is_today=True) == expected_today_url
 
+    # Test case 3: The default range is made of whole UTC days, so the URL is stable
+    first, last = today.date() - timedelta(days=15), today.date() + timedelta(days=16)
+    assert get_events_url(None, None) == (
+        f"https://lldev.thespacedevs.com/2.2.0/event/?date__gte={first}&date__lt={last}"
+    )
 
-@mock.patch("project.requests.get")
+    # Test case 4: The page size is kept in order among the parameters
+    assert get_events_url(start_date, end_date, page_size=25) == (
+        "https://lldev.thespacedevs.com/2.2.0/event/?date__gte=2023-01-01&date__lt=2023-02-01&limit=25"
+    )
+    assert get_events_url(None, None, is_today=True, page_size=25) == (
+        f"https://lldev.thespacedevs.com/2.2.0/event/?day={today.day}&limit=25&month={today.month}&year={today.year}"
+    )
+
+
+@mock.patch("project.client.get")
 def test_get_table_data(mock_requests_get):
-    mock_args = mock.Mock(start_date="01-01-2023", end_date="31-01-2023", today=False)
-    mock_requests_get.return_value = mock.Mock(
-        **{
-            "status_code": 200,
-            "json.return_value": {
-                "count": 1,
-                "next": None,
-                "previous": None,
-                "results": [
-                    {
-                        "id": 1,
-                        "name": "Event 1",
-                        "date": "2023-01-01T00:00:00Z",
-                        "description": "Description of Event 1",
-                        "url": "http://example.com",
-                        "duration": "1 hour",
-                        "webcast_live": True,
-                        "location": "Location 1",
-                        "news_url": "http://example.com/news",
-                        "video_url": "http://example.com/video",
-                        "feature_image": "http://example.com/image",
-                        "slug": "event-1",
-                        "last_updated": "2023-01-01T00:00:00Z",
-                    }
-                ],
-            },
+    mock_args = mock.Mock(
+        start_date="01-01-2023",
+        end_date="31-01-2023",
+        today=False,
+        no_cache=True,
+        offline=None,
+        page_size=None,
+        all_pages=False,
+        local=False,
+    )
+    mock_requests_get.return_value = json_response(
+        {
+            "count": 1,
+            "next": None,
+            "previous": None,
+            "results": [
+                {
+                    "id": 1,
+                    "name": "Event 1",
+                    "date": "2023-01-01T00:00:00Z",
+                    "description": "Description of Event 1",
+                    "url": "http://example.com",
+                    "duration": "1 hour",
+                    "webcast_live": True,
+                    "location": "Location 1",
+                    "news_url": "http://example.com/news",
+                    "video_url": "http://example.com/video",
+                    "feature_image": "http://example.com/image",
+                    "slug": "event-1",
+                    "last_updated": "2023-01-01T00:00:00Z",
+                    "launches": [{"id": "launch-1"}],
+                }
+            ],
         }
     )
-    requests.get = mock_requests_get
     count, next_url, previous_url, table_lines = get_table_data(mock_args)
 
     assert count == 1
@@ -110,14 +616,265 @@ def test_get_table_data(mock_requests_get):
     assert previous_url is None
     assert "name" in table_lines[1]
 
-    mock_requests_get = mock.Mock(status_code=404)
-    requests.get = mock_requests_get
+    mock_requests_get.return_value = mock.Mock(status_code=404)
     with pytest.raises(
         ConnectionError, match="Error : couldn't get the data\n Status code : {status}"
     ):
         get_table_data(mock_args)
 
 
+@mock.patch("project.client.get")
+def test_get_table_data_progressive(mock_requests_get, tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), ttl=60)
+    url = "http://example.com/event/"
+    results = [{"id": i, "name": f"Event {i}"} for i in range(1, 31)]
+    body = {"count": 30, "next": "http://example.com/event/?offset=30", "previous": None, "results": results}
+    mock_requests_get.return_value = json_response(body)
+    args = mock.Mock(today=False, no_cache=False, all_pages=False, local=False, offline=None, page_size=None)
+
+    with mock.patch("project.get_cache", return_value=cache):
+        count, next_url, previous_url, table_lines = get_table_data(args, url=url, first_lines=10)
+        assert (count, next_url, previous_url) == (30, body["next"], None)
+        assert len(table_lines) >= 10
+        assert table_lines.wait_for_lines(float("inf"), timeout=5)
+        assert table_lines.complete
+        assert len(table_lines.rows) == 30
+
+        # The streamed page was cached once read completely
+        assert fetch_json(url, cache=cache)["results"][-1]["name"] == "Event 30"
+        mock_requests_get.assert_called_once()
+
+    mock_requests_get.return_value = json_response(dict(body, count=0, next=None, results=[]))
+    args.no_cache = True
+    count, _, _, table_lines = get_table_data(args, url=url, first_lines=10)
+    assert count == 0
+    assert "NO EVENTS" in "".join(table_lines)
+
+    mock_requests_get.return_value = mock.Mock(status_code=500)
+    with pytest.raises(ConnectionError):
+        get_table_data(args, url=url, first_lines=10)
+
+
+@mock.patch("project.client.get")
+def test_fetch_json_cache(mock_requests_get, tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), ttl=60)
+    url = "https://lldev.thespacedevs.com/2.2.0/event/?date__gte=2023-01-01"
+    body = {"count": 0, "next": None, "previous": None, "results": []}
+    mock_requests_get.return_value = json_response(body, headers={"ETag": '"abc"'})
+
+    assert fetch_json(url, cache=cache) == body
+    assert fetch_json(url, cache=cache) == body
+    mock_requests_get.assert_called_once_with(url, headers={}, stream=True)
+
+    # Expired entries are revalidated and reused on 304
+    cache.store(url, json.dumps(body), etag='"abc"', ttl=-1)
+    mock_requests_get.return_value = mock.Mock(status_code=304, headers={})
+    assert fetch_json(url, cache=cache) == body
+    mock_requests_get.assert_called_with(
+        url, headers={"If-None-Match": '"abc"'}, stream=True
+    )
+    assert is_fresh(cache.lookup(url))
+
+
+@mock.patch("project.client.get")
+def test_fetch_json_projects_fields(mock_requests_get):
+    body = {
+        "count": 1,
+        "next": None,
+        "previous": None,
+        "results": [{"id": 1, "name": "A", "launches": [{"id": "x"}], "program": []}],
+    }
+    mock_requests_get.return_value = json_response(body)
+    result = fetch_json("http://example.com/event/")
+    assert set(result["results"][0]) == set(PAGE_FIELDS)
+    assert result["count"] == 1
+
+    mock_requests_get.return_value = json_response(body["results"][0])
+    assert fetch_json("http://example.com/event/1/", fields=None) == body["results"][0]
+
+
+@mock.patch("project.client.get")
+def test_get_table_data_traces_stages(mock_requests_get, monkeypatch):
+    monkeypatch.setattr(tracing, "enabled", True)
+    monkeypatch.setattr(tracing, "_events", [])
+    body = {"count": 1, "next": None, "previous": None, "results": [{"id": 1, "name": "A"}]}
+    mock_requests_get.return_value = json_response(body)
+    mock_requests_get.return_value.elapsed = timedelta(milliseconds=120)
+    args = mock.Mock(today=False, no_cache=True, all_pages=False, local=False, offline=None, page_size=None)
+    get_table_data(args, url="http://example.com/event/")
+
+    names = [event["name"] for event in tracing.events()]
+    for name in ("http", "json", "layout", "create_df", "get_table_data"):
+        assert name in names
+    http = next(event for event in tracing.events() if event["name"] == "http")
+    assert http["args"]["headers_ms"] == 120
+
+
+@mock.patch("project.fetch_json")
+def test_fetch_all_pages(mock_fetch_json):
+    def fake_page(url, cache=None):
+        offset = int(url.split("offset=")[1])
+        events = [{"id": i} for i in range(offset, min(offset + 10, 25))]
+        return {"count": 25, "next": None, "previous": None, "results": events}
+
+    mock_fetch_json.side_effect = fake_page
+    data = fetch_all_pages("http://example.com/event/?day=1", concurrency=3, page_size=10)
+
+    assert data["count"] == 25
+    assert [event["id"] for event in data["results"]] == list(range(25))
+    assert mock_fetch_json.call_count == 3
+    mock_fetch_json.assert_any_call(
+        "http://example.com/event/?day=1&limit=10&offset=20", None
+    )
+
+
+def test_fetch_ranges(monkeypatch):
+    from datetime import date
+    from fake_server import FakeSpaceDevsServer
+
+    server = FakeSpaceDevsServer(events=400).start()
+    monkeypatch.setattr("project.EVENT_BASE_URL", server.base_url)
+    ranges = [
+        (date(2022, 1, 1), date(2022, 1, 10)),
+        (date(2022, 1, 5), date(2022, 1, 20)),
+        (date(2022, 1, 21), date(2022, 1, 25)),
+        (date(2022, 3, 1), date(2022, 3, 1)),
+    ]
+    try:
+        results = fetch_ranges(ranges)
+    finally:
+        server.stop()
+
+    # Events are generated every 6 hours from 2022-01-01
+    assert [len(events) for events in results] == [40, 64, 20, 4]
+    assert results[1][0]["date"] == "2022-01-05T00:00:00Z"
+    assert results[1][-1]["date"] == "2022-01-20T18:00:00Z"
+    # The three overlapping or adjacent ranges are fetched as one: 100 events in a
+    # page of 100, and the last range takes a second request
+    assert server.requests == 2
+
+
+def test_query_store(tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite"))
+    store.upsert(
+        [
+            {"id": 1, "date": "2023-01-01T10:00:00Z", "last_updated": "2023-01-02T00:00:00Z"},
+            {"id": 2, "date": "2023-01-31T23:00:00Z", "last_updated": "2023-01-03T00:00:00Z"},
+            {"id": 3, "date": "2023-02-01T00:00:00Z", "last_updated": "2023-01-01T00:00:00Z"},
+        ]
+    )
+    args = mock.Mock(start_date="01-01-2023", end_date="31-01-2023", today=False)
+    data = query_store(store, args)
+    assert data["count"] == 2
+    assert [event["id"] for event in data["results"]] == [1, 2]
+    assert data["next"] is None
+
+
+def test_query_snapshot_pages(tmp_path):
+    from snapshot import Snapshot, write_snapshot
+
+    path = str(tmp_path / "events.snap")
+    events = [{"id": i, "date": f"2023-01-{i:02d}T10:00:00Z"} for i in range(1, 26)]
+    events.append({"id": 99, "date": "2023-02-01T00:00:00Z"})
+    write_snapshot(events, path)
+    snapshot = Snapshot(path)
+    args = mock.Mock(start_date="01-01-2023", end_date="31-01-2023", today=False, page_size=None)
+
+    data = query_snapshot(snapshot, args)
+    assert data["count"] == 25
+    assert [event["id"] for event in data["results"]] == list(range(1, 11))
+    assert data["previous"] is None
+    assert data["next"].endswith("&limit=10&offset=10")
+
+    data = query_snapshot(snapshot, args, data["next"])
+    data = query_snapshot(snapshot, args, data["next"])
+    assert [event["id"] for event in data["results"]] == list(range(21, 26))
+    assert data["next"] is None
+    assert data["previous"].endswith("&limit=10&offset=10")
+    snapshot.close()
+
+
+@mock.patch("project.client.get")
+def test_get_table_data_offline(mock_requests_get, tmp_path):
+    from snapshot import write_snapshot
+
+    path = str(tmp_path / "events.snap")
+    write_snapshot([{"id": 1, "name": "Launch", "date": "2023-01-05T10:00:00Z"}], path)
+    args = mock.Mock(start_date="01-01-2023", end_date="31-01-2023", today=False, offline=path, page_size=None)
+    count, next_url, previous_url, table_lines = get_table_data(args)
+    mock_requests_get.assert_not_called()
+    assert count == 1
+    assert next_url is None and previous_url is None
+    assert any("Launch" in line for line in table_lines)
+
+
+@mock.patch("project.fetch_all_pages")
+def test_sync_store(mock_fetch_all_pages, tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite"))
+    event = {"id": 1, "date": "2023-01-01T10:00:00Z", "last_updated": "2023-01-02T00:00:00Z"}
+    mock_fetch_all_pages.return_value = {"count": 1, "results": [event]}
+
+    assert sync_store(store) == 1
+    mock_fetch_all_pages.assert_called_with(
+        EVENT_BASE_URL + "?ordering=last_updated", concurrency=4
+    )
+    sync_store(store)
+    mock_fetch_all_pages.assert_called_with(
+        EVENT_BASE_URL
+        + "?ordering=last_updated&last_updated__gte=2023-01-02T00%3A00%3A00Z",
+        concurrency=4,
+    )
+
+
+@mock.patch("project.fetch_json")
+def test_iter_pages(mock_fetch_json):
+    mock_fetch_json.side_effect = [
+        {"count": 2, "next": "http://example.com/page2", "results": [{"id": 1}]},
+        {"count": 2, "next": None, "results": [{"id": 2}]},
+    ]
+    args = mock.Mock(
+        start_date="01-01-2023", end_date="31-01-2023", today=False, local=False, no_cache=True, offline=None, page_size=None
+    )
+    pages = iter_pages(args)
+    assert next(pages) == [{"id": 1}]
+    assert mock_fetch_json.call_count == 1
+    assert list(pages) == [[{"id": 2}]]
+    mock_fetch_json.assert_called_with("http://example.com/page2", cache=None)
+
+
+@mock.patch("project.sync_store")
+def test_iter_pages_local_syncs_store(mock_sync_store, tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite"))
+    event = {"id": 1, "date": "2023-01-05T10:00:00Z", "last_updated": "2023-01-06T00:00:00Z"}
+    mock_sync_store.side_effect = lambda store, concurrency: store.upsert([event])
+    args = mock.Mock(start_date="01-01-2023", end_date="31-01-2023", today=False, local=True, concurrency=4)
+
+    with mock.patch("project.get_store", return_value=store):
+        assert list(iter_pages(args)) == [[event]]
+    mock_sync_store.assert_called_once_with(store, 4)
+
+
+@mock.patch("project.sync_store")
+def test_export_snapshot_local_syncs_store(mock_sync_store, tmp_path, capsys):
+    from snapshot import Snapshot
+
+    store = EventStore(str(tmp_path / "events.sqlite"))
+    event = {"id": 1, "date": "2023-01-05T10:00:00Z", "last_updated": "2023-01-06T00:00:00Z"}
+    mock_sync_store.side_effect = lambda store, concurrency: store.upsert([event])
+    path = str(tmp_path / "events.snap")
+    args = mock.Mock(
+        start_date="01-01-2023", end_date="31-01-2023", today=False, local=True, concurrency=4,
+        export_snapshot=path,
+    )
+
+    with mock.patch("project.get_store", return_value=store):
+        export_snapshot(args)
+    assert capsys.readouterr().out == f"Wrote 1 events to {path}\n"
+    snapshot = Snapshot(path)
+    assert snapshot.count == 1
+    snapshot.close()
+
+
 @mock.patch("curses.endwin")
 @mock.patch("curses.initscr")
 @mock.patch("curses.resizeterm")
@@ -127,7 +884,8 @@ def test_resize_handler(mock_globals, mock_resizeterm, mock_initscr, mock_endwin
     stdscr.getmaxyx.return_value = (24, 80)
     mock_globals.return_value = {"stdscr": stdscr}
 
-    resize_handler(signal.SIGWINCH, mock.Mock())
+    with mock.patch("project.stdscr", stdscr, create=True):
+        resize_handler(signal.SIGWINCH, mock.Mock())
 
     mock_endwin.assert_called_once()
     mock_initscr.assert_called_once()
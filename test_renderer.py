@@ -0,0 +1,113 @@
+from renderer import *
+
+headers = ["id", "name", "description"]
+rows = [(1, "Event 1", "first line\nsecond line"), (22, "Event 2", None)]
+
+
+def test_table_view_lines():
+    view = TableView(headers, rows)
+    assert view[:] == [
+        "+----+---------+-------------+",
+        "| id | name    | description |",
+        "+====+=========+=============+",
+        "|  1 | Event 1 | first line  |",
+        "|    |         | second line |",
+        "+----+---------+-------------+",
+        "| 22 | Event 2 |             |",
+        "+----+---------+-------------+",
+    ]
+    assert len(view) == 8
+    assert view[-2] == "| 22 | Event 2 |             |"
+    assert view[4:6] == view[:][4:6]
+
+
+def test_table_view_formats_only_requested_rows():
+    view = TableView(headers, [(i, f"Event {i}", "text") for i in range(1000)])
+    assert len(view) == 3 + 2 * 1000
+    view[10:14]
+    assert sorted(view._row_cache) == [3, 4, 5]
+
+
+def test_format_cell():
+    assert format_cell(None) == ""
+    assert format_cell(float("nan")) == ""
+    assert format_cell(True) == "True"
+    assert is_numeric(3) and not is_numeric(True) and not is_numeric("3")
+
+
+def test_table_view_append():
+    view = TableView(headers, rows[:1], complete=False)
+    first = view[:]
+    version = view.version
+    assert not view.wait_for_lines(10, timeout=0.01)
+
+    view.append(rows[1:], complete=True)
+    assert view.complete and view.version > version
+    assert view[:] == TableView(headers, rows)[:]
+    assert view[:][: len(first) - 1] == first[:-1]
+    assert view.wait_for_lines(10, timeout=0.01)
+
+    view.fail(ValueError("broken"))
+    assert isinstance(view.error, ValueError)
+
+
+def test_line_range():
+    view = TableView(headers, rows)
+    assert view.line_range(0) == range(3, 5)
+    assert view.line_range(1) == range(6, 7)
+
+
+def test_table_view_replace():
+    view = TableView(headers, rows)
+    before = view[:]
+    version = view.version
+
+    assert view.replace(1, (22, "Event 3", "short"))
+    assert view.version > version
+    assert view[6] == "| 22 | Event 3 | short       |"
+    assert view[:6] == before[:6]
+
+    # A taller row moves the rows below, a wider one changes the columns
+    assert not view.replace(0, (1, "Event 1", "one\ntwo\nthree"))
+    assert len(view) == len(before) + 1
+    assert view.line_range(1) == range(7, 8)
+    assert not view.replace(1, (22, "A much longer name", None))
+    assert view[:] == TableView(headers, [(1, "Event 1", "one\ntwo\nthree"), (22, "A much longer name", None)])[:]
+
+
+def test_table_view_relayout():
+    text = "a fairly long description that needs to be wrapped"
+    view = TableView(headers, [(1, "Event 1", text), (2, "Event 2", None)], wrap={"description": 20})
+    assert view.wrap == {"description": 20}
+    assert view.heights == [3, 1]
+    version = view.version
+
+    assert view.relayout({"description": 30})
+    assert not view.relayout({"description": 30})
+    assert view.version == version + 1
+    assert view.rows[0][2] == text
+    assert view[:] == TableView(headers, [(1, "Event 1", text), (2, "Event 2", None)], wrap={"description": 30})[:]
+    assert view.line_range(1) == range(6, 7)
+
+
+def test_wrap_lines_is_memoized():
+    wrap_lines.cache_clear()
+    assert wrap_lines("one two three", 7) == ("one two", "three")
+    assert wrap_lines("", 7) == ("",)
+    wrap_lines("one two three", 7)
+    assert wrap_lines.cache_info().hits == 1
+
+
+def test_table_view_columns():
+    view = TableView(headers, rows, columns=["name", "id"])
+    assert view.columns == ["name", "id"]
+    assert view[:3] == ["+---------+----+", "| name    | id |", "+=========+====+"]
+    assert view[3] == "| Event 1 |  1 |"
+    assert len(view) == 3 + 2 * 2
+    assert view.rows[0] == rows[0]
+
+
+def test_row_at():
+    view = TableView(headers, rows)
+    assert [view.row_at(line) for line in (0, 3, 4, 5, 6, 7)] == [0, 0, 0, 0, 1, 1]
+    assert TableView(headers, []).row_at(0) is None
@@ -0,0 +1,137 @@
+import threading
+import time
+import pytest
+from unittest import mock
+from scheduler import *
+
+
+def test_token_bucket_is_unlimited_until_synced():
+    bucket = TokenBucket()
+    for _ in range(100):
+        bucket.acquire(PREFETCH)
+    assert bucket.remaining() is None
+
+
+def test_token_bucket_reserve():
+    bucket = TokenBucket()
+    bucket.sync(limit=10, remaining=4, reset=3600)
+    assert bucket.reserve == 2
+    bucket.acquire(PREFETCH)
+    bucket.acquire(BACKGROUND)
+    assert bucket.remaining() == (2, 10)
+    with pytest.raises(BudgetExhausted):
+        bucket.acquire(PREFETCH)
+    bucket.acquire(FOREGROUND)
+    bucket.acquire(FOREGROUND)
+    assert bucket.remaining() == (0, 10)
+
+
+def test_token_bucket_refills_by_reset():
+    bucket = TokenBucket()
+    bucket.sync(limit=10, remaining=0, reset=0.05)
+    start = time.monotonic()
+    bucket.acquire(FOREGROUND)
+    assert 0.003 < time.monotonic() - start < 1
+    time.sleep(0.06)
+    assert bucket.remaining() == (10, 10)
+
+
+def test_priority_context():
+    assert current_priority() == FOREGROUND
+    with priority(BACKGROUND):
+        assert current_priority() == BACKGROUND
+    assert current_priority() == FOREGROUND
+
+
+def test_queued_fetches_run_by_priority():
+    scheduler = Scheduler(max_workers=1)
+    release = threading.Event()
+    ran = []
+
+    def fetch(name):
+        def run():
+            if name == "blocker":
+                release.wait(timeout=5)
+            ran.append((name, current_priority()))
+            return name
+
+        return run
+
+    scheduler.submit("blocker", fetch("blocker"), BACKGROUND)
+    time.sleep(0.05)
+    background = scheduler.submit("sync", fetch("sync"), BACKGROUND)
+    prefetch = scheduler.submit("page2", fetch("page2"), PREFETCH)
+    release.set()
+    assert background.result(timeout=5) == "sync" and prefetch.result(timeout=5) == "page2"
+    assert ran == [("blocker", BACKGROUND), ("page2", PREFETCH), ("sync", BACKGROUND)]
+    assert scheduler.pending() == 0
+    scheduler.shutdown()
+
+
+def test_identical_fetches_are_shared():
+    scheduler = Scheduler(max_workers=1)
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(timeout=5)
+        return "page"
+
+    future = scheduler.submit("url", fetch)
+    assert scheduler.submit("url", fetch) is future
+    time.sleep(0.05)
+    threading.Timer(0.05, release.set).start()
+    # The foreground waits for the running fetch instead of sending it again
+    assert scheduler.run("url", fetch) == "page"
+    assert len(calls) == 1
+    scheduler.shutdown()
+
+
+def test_run_takes_over_queued_fetch():
+    scheduler = Scheduler(max_workers=1)
+    release = threading.Event()
+    scheduler.submit("blocker", lambda: release.wait(timeout=5))
+    time.sleep(0.05)
+    queued = scheduler.submit("url", lambda: ("page", current_priority()))
+
+    # Runs at once in this thread although the only worker is busy
+    assert scheduler.run("url", lambda: ("page", current_priority())) == ("page", FOREGROUND)
+    assert queued.result(timeout=0) == ("page", FOREGROUND)
+    release.set()
+    scheduler.shutdown()
+
+
+def test_run_raises_and_shutdown_cancels():
+    scheduler = Scheduler(max_workers=1)
+
+    def fail():
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        scheduler.run("url", fail)
+
+    release = threading.Event()
+    scheduler.submit("blocker", lambda: release.wait(timeout=5))
+    time.sleep(0.05)
+    queued = scheduler.submit("url", lambda: "page")
+    scheduler.shutdown()
+    assert queued.cancelled()
+    release.set()
+
+
+def test_start_runs_without_blocking():
+    scheduler = Scheduler(max_workers=1)
+    release = threading.Event()
+    future = scheduler.start("url", lambda: release.wait(timeout=5) and ("page", current_priority()))
+    assert not future.done()
+    release.set()
+    assert future.result(timeout=5) == ("page", FOREGROUND)
+
+    # A start cancelled before its thread runs never fetches
+    fetched = []
+    with mock.patch("threading.Thread.start"):
+        skipped = scheduler.start("other", lambda: fetched.append("other"))
+    assert skipped.cancel()
+    scheduler.shutdown()
+    assert fetched == []
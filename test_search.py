@@ -0,0 +1,92 @@
+from search import *
+from renderer import TableView
+from page_cache import PageCache
+import time
+
+headers = ["id", "name", "description", "location"]
+
+
+def make_table(start, count):
+    return TableView(
+        headers,
+        [
+            (i, f"Event {i}", f"Docking test number {i}", "Starbase" if i % 2 else "Baikonur")
+            for i in range(start, start + count)
+        ],
+    )
+
+
+def test_tokenize():
+    assert tokenize("Crew-7 Docking\nat the ISS") == ["crew", "7", "docking", "at", "the", "iss"]
+    assert tokenize(None) == []
+
+
+def test_search_prefix_and_terms():
+    index = SearchIndex()
+    index.add("page1", make_table(0, 4))
+    assert index.search("") == set()
+    assert len(index.search("dock")) == 4
+    assert index.search("star") == {("page1", 1), ("page1", 3)}
+    assert index.search("starbase event 3") == {("page1", 3)}
+    assert index.search("venus") == set()
+
+
+def test_add_is_incremental():
+    index = SearchIndex()
+    table = TableView(headers, [], complete=False)
+    index.add(None, table)
+    table.append([(1, "Crew Flight", None, "ISS")])
+    index.add(None, table)
+    index.add(None, table)
+    assert index.search("crew") == {(None, 0)}
+    assert index.pages[None][1] == 1
+
+    # A page fetched again replaces the rows indexed before
+    index.add(None, TableView(headers, [(2, "Moon Landing", None, None)]))
+    assert index.search("crew") == set()
+    assert index.search("moon") == {(None, 0)}
+    assert index.order == [None]
+
+    index.add("message", ["NO EVENTS"])
+    assert "message" not in index.pages
+
+
+def test_rows_follow_page_order():
+    index = SearchIndex()
+    index.add("page2", make_table(10, 2))
+    index.add("page1", make_table(0, 2))
+    assert [row[0] for row in index.rows(index.search("event"))] == [10, 11, 0, 1]
+
+
+def test_remove_evicted_page():
+    index = SearchIndex()
+    pages = PageCache(max_pages=1, on_evict=lambda url, page: index.remove(url))
+    for url, start in (("page1", 0), ("page2", 10)):
+        table = make_table(start, 2)
+        index.add(url, table)
+        pages.put(url, table)
+    assert [row[0] for row in index.rows(index.search("event"))] == [10, 11]
+    assert index.order == ["page2"]
+    index.remove("page1")
+
+
+def test_search_is_fast():
+    index = SearchIndex()
+    for page in range(100):
+        index.add(page, make_table(page * 50, 50))
+    start = time.perf_counter()
+    for query in ("d", "do", "doc", "dock", "docking t", "docking test 1234"):
+        index.search(query)
+    assert (time.perf_counter() - start) / 6 < 0.016
+    assert len(index.search("docking test 1234")) == 1
+
+
+def test_refresh_replaced_rows():
+    index = SearchIndex()
+    table = make_table(0, 3)
+    index.add("page1", table)
+    table.replace(1, (1, "Crew Launch", None, "Starbase"))
+    index.refresh("page1", [1])
+    assert index.search("crew") == {("page1", 1)}
+    assert ("page1", 1) not in index.search("docking")
+    assert len(index.search("docking")) == 2
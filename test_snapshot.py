@@ -0,0 +1,71 @@
+from snapshot import *
+from datetime import date
+from unittest import mock
+import pytest
+
+
+def make_events(days):
+    return [
+        {"id": i, "name": f"Event {i}", "date": f"2023-01-{day:02d}T12:00:00Z"}
+        for i, day in enumerate(days, start=1)
+    ]
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = str(tmp_path / "events.snap")
+    write_snapshot(make_events([5, 1, 3, 3, 2, 4, 3, 6, 7, 8]), path, block_size=3)
+    snapshot = Snapshot(path)
+    yield snapshot
+    snapshot.close()
+
+
+def test_write_snapshot_skips_events_without_date(tmp_path):
+    path = str(tmp_path / "events.snap")
+    events = make_events([2, 1]) + [{"id": 3, "name": "Undated", "date": None}]
+    assert write_snapshot(events, path) == 2
+
+    snapshot = Snapshot(path)
+    assert snapshot.count == 2
+    assert snapshot.blocks == 1
+    count, page = snapshot.query(date(2023, 1, 1), date(2023, 1, 31))
+    snapshot.close()
+    assert count == 2
+    assert [event["id"] for event in page] == [2, 1]
+
+
+def test_query_range_across_blocks(snapshot):
+    count, page = snapshot.query(date(2023, 1, 3), date(2023, 1, 6))
+    assert count == 6
+    assert [event["date"][:10] for event in page] == [
+        "2023-01-03", "2023-01-03", "2023-01-03", "2023-01-04", "2023-01-05", "2023-01-06"
+    ]
+
+
+def test_query_pages(snapshot):
+    count, page = snapshot.query(date(2023, 1, 2), date(2023, 1, 8), offset=4, limit=3)
+    assert count == 9
+    assert [event["date"][:10] for event in page] == ["2023-01-04", "2023-01-05", "2023-01-06"]
+
+    count, page = snapshot.query(date(2023, 1, 9), date(2023, 1, 31))
+    assert (count, page) == (0, [])
+
+
+def test_query_counts_whole_blocks_from_index(snapshot):
+    with mock.patch.object(snapshot, "read_block", wraps=snapshot.read_block) as read_block:
+        count, page = snapshot.query(date(2023, 1, 1), date(2023, 1, 31), limit=2)
+    assert count == 10
+    assert len(page) == 2
+    assert [call.args[0] for call in read_block.call_args_list] == [0]
+
+
+def test_snapshot_rejects_other_files(tmp_path):
+    path = tmp_path / "events.json"
+    path.write_text('{"results": []}' * 4)
+    with pytest.raises(SnapshotError):
+        Snapshot(str(path))
+
+    empty = tmp_path / "empty.snap"
+    empty.write_bytes(b"")
+    with pytest.raises(SnapshotError):
+        Snapshot(str(empty))
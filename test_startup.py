@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+import time
+
+STARTUP_BUDGET = 0.5
+HEAVY_MODULES = ["pandas", "requests", "tabulate", "concurrent.futures"]
+here = os.path.dirname(os.path.abspath(__file__))
+
+
+def run(*args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=here, capture_output=True, text=True, timeout=30
+    )
+
+
+def test_heavy_modules_are_imported_lazily():
+    code = f"import project, sys; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    result = run("-c", code)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+
+def test_help_cold_start_budget():
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        result = run("project.py", "-h")
+        timings.append(time.perf_counter() - start)
+        assert result.returncode == 0, result.stderr
+        assert "usage:" in result.stdout
+    assert min(timings) < STARTUP_BUDGET, f"project.py -h took {min(timings):.3f}s"
@@ -0,0 +1,33 @@
+import datetime
+from store import *
+
+events = [
+    {"id": 1, "name": "A", "date": "2023-01-01T10:00:00Z", "last_updated": "2023-01-05T00:00:00Z"},
+    {"id": 2, "name": "B", "date": "2023-01-15T00:00:00Z", "last_updated": "2023-01-06T00:00:00Z"},
+    {"id": 3, "name": "C", "date": "2023-02-01T00:00:00Z", "last_updated": "2023-01-04T00:00:00Z"},
+]
+
+
+def test_upsert_and_query(tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite"))
+    assert store.upsert(events) == 3
+    assert len(store) == 3
+
+    results = store.query(datetime.date(2023, 1, 1), datetime.date(2023, 1, 15))
+    assert [event["name"] for event in results] == ["A", "B"]
+    assert store.query(datetime.date(2024, 1, 1), datetime.date(2024, 1, 2)) == []
+
+
+def test_upsert_replaces_updated_events(tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite"))
+    store.upsert(events)
+    store.upsert([dict(events[0], name="A2", last_updated="2023-01-07T00:00:00Z")])
+    assert len(store) == 3
+    assert store.query(datetime.date(2023, 1, 1), datetime.date(2023, 1, 1))[0]["name"] == "A2"
+
+
+def test_high_water_mark(tmp_path):
+    store = EventStore(str(tmp_path / "events.sqlite"))
+    assert store.high_water_mark() is None
+    store.upsert(events)
+    assert store.high_water_mark() == "2023-01-06T00:00:00Z"
@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta
-import pandas as pd
 import pytest
 from tools import *
+from renderer import TableView
 from unittest.mock import patch, Mock
 
 mock_data = {
@@ -33,8 +33,10 @@ def test_create_df():
     assert count == 1
     assert next_url == "http://example.com/next"
     assert prev_url == "http://example.com/previous"
-    assert isinstance(tabulated_data, list)
+    assert isinstance(tabulated_data, TableView)
     assert len(tabulated_data) > 0
+    assert "name" in tabulated_data[1]
+    assert "Event 1" in tabulated_data[3]
 
 
 def test_add_date_filters():
@@ -42,8 +44,20 @@ def test_add_date_filters():
     end_date = start_date + timedelta(days=10)
     date_filters = add_date_filters(start_date, end_date)
     assert isinstance(date_filters, str)
-    assert "date__gte=" in date_filters
-    assert "date__lte=" in date_filters
+    assert f"date__gte={start_date}" in date_filters
+    assert f"date__lt={end_date + timedelta(days=1)}" in date_filters
+
+
+def test_canonical_query():
+    params = [("year", 2023), ("limit", 25), ("day", 1), ("offset", None), ("month", 1)]
+    assert canonical_query(params) == "day=1&limit=25&month=1&year=2023"
+    assert canonical_query(params[::-1]) == canonical_query(params)
+
+
+def test_default_page_size():
+    assert default_page_size(24) == 24
+    assert default_page_size(10) == MIN_PAGE_SIZE
+    assert default_page_size(200) == MAX_PAGE_SIZE
 
 
 def test_get_todays_date():
@@ -54,18 +68,11 @@ def test_get_todays_date():
     assert year == today.year
 
 
-def test_tabulate_data():
-    df = pd.DataFrame(mock_data["results"])
-    tabulated_data = tabulate_data(df)
-    assert isinstance(tabulated_data, list)
-    assert len(tabulated_data) > 0
-
-
 @patch("tools.sys.exit")
 @patch("tools.validate_date")
 def test_check_args(mock_validate_date, mock_sys_exit):
     # Test case 1: Today option is used with start_date or end_date
-    args = Mock()
+    args = Mock(batch=None, watch=None, offline=None, page_size=None)
     args.today = True
     args.start_date = "01-01-2022"
     args.end_date = None
@@ -93,6 +100,23 @@ def test_check_args(mock_validate_date, mock_sys_exit):
         "Please enter a valid end date in the format DD-MM-YYYY"
     )
 
+    # Test case 4: Watch mode with a non-positive interval or an export
+    args.end_date = None
+    args.watch = 0
+    check_args(args)
+    mock_sys_exit.assert_called_with("Please enter a watch interval greater than 0 seconds")
+    args.watch = 5
+    args.format = "csv"
+    check_args(args)
+    mock_sys_exit.assert_called_with(
+        "Can't use watch with format, batch, all, local or offline at the same time"
+    )
+    args.watch = None
+    args.format = None
+    args.page_size = 0
+    check_args(args)
+    mock_sys_exit.assert_called_with(f"Please enter a page size between 1 and {MAX_PAGE_SIZE}")
+
 
 @patch("tools.argparse.ArgumentParser.parse_args")
 def test_get_args(mock_parse_args):
@@ -0,0 +1,58 @@
+import json
+import pstats
+import pytest
+import threading
+import tracing
+
+
+@pytest.fixture
+def traced(monkeypatch):
+    monkeypatch.setattr(tracing, "enabled", False)
+    monkeypatch.setattr(tracing, "_events", [])
+    tracing.enable()
+
+
+def test_disabled_span_is_shared_noop(monkeypatch):
+    monkeypatch.setattr(tracing, "enabled", False)
+    monkeypatch.setattr(tracing, "_events", [])
+    with tracing.span("http") as span:
+        assert span is None
+    assert tracing.span("a") is tracing.span("b")
+    assert tracing.events() == []
+
+
+def test_span_records_event(traced):
+    with tracing.span("http", url="http://example.com"):
+        pass
+    (event,) = tracing.events()
+    assert event["name"] == "http"
+    assert event["ph"] == "X"
+    assert event["dur"] >= 0
+    assert event["args"] == {"url": "http://example.com"}
+
+
+def test_write_trace(traced, tmp_path):
+    with tracing.span("paint"):
+        pass
+    path = tmp_path / "trace.json"
+    tracing.write_trace(str(path))
+    trace = json.loads(path.read_text())
+    assert [event["name"] for event in trace["traceEvents"]] == ["paint"]
+
+
+def test_profile_covers_threads(monkeypatch, tmp_path):
+    monkeypatch.setattr(tracing, "_profilers", [])
+
+    def decode_in_worker():
+        return sum(range(1000))
+
+    tracing.start_profile()
+    worker = threading.Thread(target=decode_in_worker)
+    worker.start()
+    worker.join()
+    path = str(tmp_path / "run.prof")
+    tracing.write_profile(path)
+
+    functions = {function for _, _, function in pstats.Stats(path).stats}
+    # The main thread joins the worker, the worker decodes
+    assert {"join", "decode_in_worker"} <= functions
@@ -1,23 +1,27 @@
 from datetime import datetime, timedelta, UTC
 from date_validator import validate_date
-from tabulate import tabulate
-import pandas as pd
+from events import format_events, parse_events
+from urllib.parse import urlencode
+import tracing
 import sys
-import textwrap
 import argparse
 
+MIN_PAGE_SIZE = 10  # The default page size of the API
+MAX_PAGE_SIZE = 100  # The largest page the API returns
+SCREENS_PER_PAGE = 3
+
 
 def create_df(data):
     """
-    Converts the event data into a pandas DataFrame, wraps text in the description column,
-    and formats the DataFrame as a table string.
+    Parses the event data into Event records, wraps text in the description column,
+    and formats the events as a lazily rendered grid table.
 
     Parameters:
         data (dict): The event data in JSON format.
 
     Returns:
         tuple: A tuple containing the count of events, the next URL, the previous URL, and
-               the tabulated data as a list of strings.
+               the table lines as a TableView.
     """
     count = data["count"]
     next = data["next"]
@@ -29,36 +33,15 @@ def create_df(data):
             previous,
             "\n \n \n\t\t\t\t\t\t NO EVENTS\n \n \n".split("\n"),
         )
-    df = pd.DataFrame(data["results"]).set_index("id")
-
-    def wrap_text(text, width=40):
-        return "\n".join(textwrap.wrap(text, width=width))
-
-    df["description"] = df["description"].apply(
-        lambda x: wrap_text(x) if isinstance(x, str) else x
-    )
-
-    static_fields = [
-        "name",
-        "date",
-        "description",
-        "url",
-        "duration",
-        "webcast_live",
-        "location",
-        "news_url",
-        "video_url",
-        "feature_image",
-        "slug",
-        "last_updated",
-    ]
-    df = df[static_fields]
-    return count, next, previous, tabulate_data(df)
+    with tracing.span("create_df", events=len(data["results"])):
+        return count, next, previous, format_events(parse_events(data["results"]))
 
 
 def add_date_filters(start, end):
     """
     Creates date filters for API query based on the given start and end dates.
+    Both days are included whole: the API compares a bare date as midnight, so the
+    range ends before the day after the end date.
 
     Parameters:
         start (datetime.date): The start date for the filter.
@@ -68,35 +51,51 @@ def add_date_filters(start, end):
         str: A string representing the date filters in query format.
     """
     from_date = f"date__gte={start}"
-    to_date = f"date__lte={end}"
+    to_date = f"date__lt={end + timedelta(days=1)}"
     return "&".join((from_date, to_date))
 
 
-def get_todays_date():
+def canonical_query(params):
     """
-    Retrieves today's date.
+    Encodes query parameters in a canonical order, so the same query always gets the
+    same URL and hits the response and page caches.
+
+    Parameters:
+        params (iterable): The (name, value) pairs. Pairs with a None value are left out.
 
     Returns:
-        tuple: A tuple containing the day, month, and year of today's date.
+        str: The query string with the parameters sorted by name.
     """
-    now = datetime.now(UTC)
-    day = now.day
-    month = now.month
-    year = now.year
-    return day, month, year
+    return urlencode(sorted((name, str(value)) for name, value in params if value is not None))
 
 
-def tabulate_data(df):
+def default_page_size(screen_height):
     """
-    Converts the given DataFrame into a tabulated string format.
+    Chooses the number of events per page for a terminal height, so a page fills a
+    few screens and scrolling through a range takes fewer requests on tall terminals.
 
     Parameters:
-        df (pandas.DataFrame): The DataFrame to be tabulated.
+        screen_height (int): The number of lines of the terminal.
 
     Returns:
-        list: A list of strings representing the tabulated data.
+        int: SCREENS_PER_PAGE screens of the shortest rows, between MIN_PAGE_SIZE and MAX_PAGE_SIZE.
     """
-    return tabulate(df, headers="keys", tablefmt="grid").split("\n")
+    rows_per_screen = max(1, (screen_height - 7) // 2)  # A row takes at least two lines
+    return max(MIN_PAGE_SIZE, min(MAX_PAGE_SIZE, rows_per_screen * SCREENS_PER_PAGE))
+
+
+def get_todays_date():
+    """
+    Retrieves today's date.
+
+    Returns:
+        tuple: A tuple containing the day, month, and year of today's date.
+    """
+    now = datetime.now(UTC)
+    day = now.day
+    month = now.month
+    year = now.year
+    return day, month, year
 
 
 def get_args():
@@ -125,6 +124,97 @@ def get_args():
     parser.add_argument(
         "-t", "--today", action="store_true", help="Displays the events of today"
     )
+    parser.add_argument(
+        "-a",
+        "--all",
+        dest="all_pages",
+        action="store_true",
+        help="Fetches every page of the date range at once and displays them as a single page",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of pages fetched in parallel with --all\n(default: 4)",
+    )
+    parser.add_argument(
+        "-l",
+        "--local",
+        action="store_true",
+        help="Answers the query from the local event store, which is kept in sync in the background",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=("jsonl", "csv", "tsv"),
+        help="Writes the events to stdout in the given format instead of displaying them",
+    )
+    parser.add_argument(
+        "-b",
+        "--batch",
+        metavar="FILE",
+        help="Writes the events of every 'START END' date range listed in this file ('-' for stdin) to stdout.\nOverlapping ranges are fetched once",
+    )
+    parser.add_argument(
+        "--offline",
+        metavar="SNAPSHOT",
+        help="Answers the queries from a snapshot file instead of the API, without network access",
+    )
+    parser.add_argument(
+        "--export-snapshot",
+        dest="export_snapshot",
+        metavar="FILE",
+        help="Writes the events of the date range to a snapshot file for use with --offline",
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        metavar="INTERVAL",
+        type=float,
+        help="Checks the displayed page for updated events every INTERVAL seconds",
+    )
+    parser.add_argument(
+        "--page-size",
+        dest="page_size",
+        type=int,
+        help=f"Number of events per page, at most {MAX_PAGE_SIZE}\n(default: a few screens of events, {MAX_PAGE_SIZE} when exporting)",
+    )
+    parser.add_argument(
+        "--page-cache",
+        dest="page_cache",
+        type=int,
+        default=50,
+        help="Number of visited pages kept in memory for instant navigation\n(default: 50)",
+    )
+    parser.add_argument(
+        "--trace-file",
+        dest="trace_file",
+        help="Writes the timings of each fetch, parse and paint stage to this file as a Chrome trace",
+    )
+    parser.add_argument(
+        "--profile",
+        help="Writes a cProfile dump of the whole run, every thread included, to this file",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        dest="cache_ttl",
+        type=int,
+        default=300,
+        help="Number of seconds a cached response is served without revalidation\n(default: 300)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="no_cache",
+        action="store_true",
+        help="Always fetch the data from the API instead of the on-disk cache",
+    )
+    parser.add_argument(
+        "--prefetch-depth",
+        dest="prefetch_depth",
+        type=int,
+        default=1,
+        help="Number of pages fetched in the background in each direction\n(default: 1, 0 disables prefetching)",
+    )
 
     return parser.parse_args()
 
@@ -141,6 +231,21 @@ def check_args(args):
     """
     start_date = args.start_date
     end_date = args.end_date
+    if getattr(args, "batch", None) and (args.today or start_date or end_date or args.local):
+        sys.exit("Can't use batch with today, start, end or local at the same time")
+    if getattr(args, "offline", None) and (
+        args.local or args.all_pages or args.batch or args.export_snapshot
+    ):
+        sys.exit("Can't use offline with local, all, batch or export-snapshot at the same time")
+    watch = getattr(args, "watch", None)
+    if watch is not None:
+        if watch <= 0:
+            sys.exit("Please enter a watch interval greater than 0 seconds")
+        elif args.format or args.batch or args.all_pages or args.local or args.offline:
+            sys.exit("Can't use watch with format, batch, all, local or offline at the same time")
+    page_size = getattr(args, "page_size", None)
+    if page_size is not None and not 1 <= page_size <= MAX_PAGE_SIZE:
+        sys.exit(f"Please enter a page size between 1 and {MAX_PAGE_SIZE}")
     if args.today:
         if start_date or end_date:
             sys.exit("Can't use both today and (start or end) at the same time")
@@ -0,0 +1,135 @@
+from contextlib import nullcontext
+import json
+import os
+import sys
+import threading
+import time
+
+enabled = False
+_events = []
+_profilers = []
+_lock = threading.Lock()
+_null_span = nullcontext()
+
+
+class Span:
+    """
+    Records the duration of a block of code as a Chrome trace "complete" event.
+    """
+
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        event = {
+            "name": self.name,
+            "ph": "X",
+            "ts": self.start * 1e6,
+            "dur": (end - self.start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if self.args:
+            event["args"] = self.args
+        with _lock:
+            _events.append(event)
+        return False
+
+
+def span(name, **args):
+    """
+    Times a block of code when tracing is enabled.
+
+    When tracing is disabled a shared no-op context manager is returned, so
+    instrumented code only pays for one function call.
+
+    Parameters:
+        name (str): The name of the traced stage.
+        **args: Extra values recorded with the span, e.g. the page URL.
+
+    Returns:
+        context manager: The span to use in a with statement.
+    """
+    if not enabled:
+        return _null_span
+    return Span(name, args)
+
+
+def enable():
+    """
+    Starts recording spans.
+    """
+    global enabled
+    enabled = True
+
+
+def events():
+    """
+    Returns:
+        list: The recorded spans as Chrome trace events.
+    """
+    with _lock:
+        return list(_events)
+
+
+def write_trace(path):
+    """
+    Writes the recorded spans as a Chrome trace JSON file, which can be opened in
+    chrome://tracing or https://ui.perfetto.dev.
+
+    Parameters:
+        path (str): The path of the trace file.
+    """
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events(), "displayTimeUnit": "ms"}, f)
+
+
+def start_profile():
+    """
+    Starts a cProfile run of the calling thread and of every thread started after it,
+    like the scheduler workers and the page stream loaders.
+    """
+    import cProfile
+
+    profiler = cProfile.Profile()
+    _profilers.append(profiler)
+    if sys.version_info < (3, 12):
+        # A profiler only sees its own thread, so each new thread gets one
+        threading.setprofile(_profile_thread)
+    # From Python 3.12 a profiler sees every thread
+    profiler.enable()
+
+
+def _profile_thread(frame, event, arg):
+    import cProfile
+
+    profiler = cProfile.Profile()
+    _profilers.append(profiler)
+    profiler.enable()  # Replaces this hook for the thread
+
+
+def write_profile(path):
+    """
+    Stops the cProfile run and writes the merged statistics of every thread as a
+    cProfile dump, which can be read with pstats or snakeviz.
+
+    Parameters:
+        path (str): The path of the dump.
+    """
+    import pstats
+
+    threading.setprofile(None)
+    _profilers[0].disable()
+    stats = pstats.Stats(_profilers[0])
+    for profiler in _profilers[1:]:
+        stats.add(profiler)
+    _profilers.clear()
+    stats.dump_stats(path)